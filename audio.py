@@ -0,0 +1,60 @@
+import hashlib
+import os
+import numpy as np
+from PySide6.QtCore import QUrl, QEventLoop
+from PySide6.QtMultimedia import QAudioDecoder, QAudioFormat
+
+SAMPLE_FORMATS = {
+    QAudioFormat.UInt8: (np.uint8, 128.0, 128.0),
+    QAudioFormat.Int16: (np.int16, 0.0, 32768.0),
+    QAudioFormat.Int32: (np.int32, 0.0, 2147483648.0),
+    QAudioFormat.Float: (np.float32, 0.0, 1.0),
+}
+
+
+def fileKey(path: str, blockSize: int = 64 * 1024):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        digest.update(str(size).encode())
+        digest.update(f.read(blockSize))
+        if size > blockSize:
+            f.seek(max(size - blockSize, blockSize))
+            digest.update(f.read(blockSize))
+    return digest.hexdigest()
+
+
+def bufferToArray(buffer):
+    audioFormat = buffer.format()
+    dtype, offset, scale = SAMPLE_FORMATS[audioFormat.sampleFormat()]
+    samples = np.frombuffer(buffer.constData(), dtype=dtype).astype(np.float32)
+    if offset:
+        samples -= offset
+    if scale != 1.0:
+        samples /= scale
+    return samples.reshape(-1, audioFormat.channelCount())
+
+
+def decodePcm(path: str, isCanceled=None):
+    decoder = QAudioDecoder()
+    loop = QEventLoop()
+    errors = []
+    decoder.bufferReady.connect(loop.quit)
+    decoder.finished.connect(loop.quit)
+    decoder.error.connect(errors.append)
+    decoder.error.connect(loop.quit)
+    decoder.setSource(QUrl.fromLocalFile(path))
+    decoder.start()
+    try:
+        while True:
+            while decoder.bufferAvailable():
+                buffer = decoder.read()
+                if buffer.isValid() and buffer.format().sampleFormat() in SAMPLE_FORMATS:
+                    yield bufferToArray(buffer), buffer.format().sampleRate()
+            if not decoder.isDecoding() or errors:
+                return
+            if isCanceled is not None and isCanceled():
+                return
+            loop.exec()
+    finally:
+        decoder.stop()
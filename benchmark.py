@@ -0,0 +1,605 @@
+import os
+import gc
+import sys
+import json
+import time
+import wave
+import shutil
+import platform
+import tempfile
+import argparse
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PySide6 import __version__ as PYSIDE_VERSION
+from PySide6.QtCore import QObject, QEvent, QBuffer, QByteArray, QIODevice, QEventLoop, QTimer
+from PySide6.QtGui import QImage, QColor
+from PySide6.QtWidgets import QApplication, QWidget, QVBoxLayout
+
+BENCHMARKS = {}
+
+
+def benchmark(func):
+    BENCHMARKS[func.__name__] = func
+    return func
+
+
+def residentMemory():
+    if sys.platform == 'win32':
+        import ctypes
+        from ctypes import wintypes
+
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [('cb', wintypes.DWORD), ('PageFaultCount', wintypes.DWORD),
+                        ('PeakWorkingSetSize', ctypes.c_size_t), ('WorkingSetSize', ctypes.c_size_t),
+                        ('QuotaPeakPagedPoolUsage', ctypes.c_size_t), ('QuotaPagedPoolUsage', ctypes.c_size_t),
+                        ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t), ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+                        ('PagefileUsage', ctypes.c_size_t), ('PeakPagefileUsage', ctypes.c_size_t)]
+
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+        ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb)
+        return counters.WorkingSetSize
+    if os.path.exists('/proc/self/statm'):
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def liveObjects(root: QObject):
+    return len(root.findChildren(QObject))
+
+
+def settle(app: QApplication, rounds: int = 3):
+    for _ in range(rounds):
+        app.processEvents()
+        app.sendPostedEvents(None, QEvent.DeferredDelete)
+    gc.collect()
+    app.processEvents()
+
+
+def coverBytes(color: QColor, size: int = 1000):
+    image = QImage(size, size, QImage.Format_RGB32)
+    image.fill(color)
+    data = QByteArray()
+    buffer = QBuffer(data)
+    buffer.open(QIODevice.WriteOnly)
+    image.save(buffer, 'JPG', 90)
+    return bytes(data)
+
+
+def waitFor(app: QApplication, signal, timeout: int = 10000):
+    loop = QEventLoop()
+    timer = QTimer()
+    timer.setSingleShot(True)
+    timer.timeout.connect(loop.quit)
+    signal.connect(loop.quit)
+    timer.start(timeout)
+    loop.exec()
+    signal.disconnect(loop.quit)
+    isTimedOut = not timer.isActive()
+    timer.stop()
+    return not isTimedOut
+
+
+def percentile(values, fraction: float):
+    values = sorted(values)
+    return values[min(int(len(values) * fraction), len(values) - 1)] if values else 0.0
+
+
+def makeCorpus(folder: str, count: int, seconds: float = 1.0, albums: int = 10):
+    from mutagen.wave import WAVE
+    from mutagen.id3 import TIT2, TPE1, TALB, APIC
+
+    covers = [coverBytes(QColor.fromHsv(i * 360 // albums, 160, 200)) for i in range(albums)]
+    frames = int(44100 * seconds)
+    silence = bytes(frames * 4)
+    paths = []
+    for i in range(count):
+        album = i % albums
+        path = os.path.join(folder, f'album{album:02}', f'track{i:05}.wav')
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with wave.open(path, 'wb') as f:
+            f.setnchannels(2)
+            f.setsampwidth(2)
+            f.setframerate(44100)
+            f.writeframes(silence)
+        audio = WAVE(path)
+        audio.add_tags()
+        audio.tags.add(TIT2(encoding=3, text=f'Track {i}'))
+        audio.tags.add(TPE1(encoding=3, text=f'Artist {album % 3}'))
+        audio.tags.add(TALB(encoding=3, text=f'Album {album}'))
+        audio.tags.add(APIC(encoding=3, mime='image/jpeg', type=3, desc='', data=covers[album]))
+        audio.save()
+        paths.append(path.replace('\\', '/'))
+    return paths
+
+
+class Context:
+    def __init__(self, app: QApplication, folder: str, args):
+        self.app = app
+        self.folder = folder
+        self.args = args
+        self._corpus = None
+        self._scanCorpus = None
+
+    @property
+    def corpus(self):
+        if self._corpus is None:
+            self._corpus = makeCorpus(os.path.join(self.folder, 'corpus'), self.args.corpus)
+        return self._corpus
+
+    @property
+    def scanCorpus(self):
+        if self._scanCorpus is None:
+            self._scanCorpus = makeCorpus(os.path.join(self.folder, 'library'), self.args.scan_files, 0.1)
+        return self._scanCorpus
+
+    def playInterface(self, name: str):
+        from cover import CoverCache
+        from waveform import PeakCache
+        from window import PlayInterface
+
+        return PlayInterface(CoverCache(os.path.join(self.folder, f'{name}-covers')),
+                             PeakCache(os.path.join(self.folder, f'{name}-peaks')),
+                             playlistPath=os.path.join(self.folder, f'{name}-playlist.json'))
+
+
+def disposePlayInterface(app: QApplication, interface):
+    interface.player.stop()
+    interface.waveformLoader.cancel()
+    interface.waveformLoader.wait()
+    interface.coverLoader.cancel()
+    interface.coverLoader.wait()
+    interface.deleteLater()
+    settle(app)
+
+
+@benchmark
+def playBarConstruction(context: Context):
+    from window import GaplessMediaPlayer, StandardMediaPlayBar
+
+    app, count = context.app, context.args.constructions
+    parent = QWidget()
+    player = GaplessMediaPlayer(parent)
+    for _ in range(5):
+        StandardMediaPlayBar(parent, player).deleteLater()
+    settle(app)
+    objects = liveObjects(parent)
+
+    times = []
+    for _ in range(count):
+        start = time.perf_counter()
+        bar = StandardMediaPlayBar(parent, player)
+        times.append((time.perf_counter() - start) * 1000)
+        bar.deleteLater()
+        app.processEvents()
+    settle(app)
+
+    result = {
+        'constructions': count,
+        'meanMs': sum(times) / count,
+        'p90Ms': percentile(times, 0.9),
+        'objectGrowth': liveObjects(parent) - objects,
+    }
+    regressions = []
+    if result['objectGrowth'] > 0:
+        regressions.append(f"{result['objectGrowth']} QObjects left behind by {count} play bars")
+    parent.deleteLater()
+    settle(app)
+    return result, regressions
+
+
+@benchmark
+def positionUpdates(context: Context):
+    from window import GaplessMediaPlayer, StandardMediaPlayBar
+
+    app, count = context.app, context.args.positions
+    player = GaplessMediaPlayer()
+    bar = StandardMediaPlayBar(None, player)
+    bar.resize(800, 102)
+    bar.show()
+    bar._onDurationChanged(count * 10)
+    settle(app)
+
+    start = time.perf_counter()
+    for position in range(0, count * 10, 10):
+        bar._onPositionChanged(position)
+    elapsed = time.perf_counter() - start
+    app.processEvents()
+
+    result = {
+        'updates': count,
+        'updatesPerSecond': count / elapsed,
+        'meanUs': elapsed / count * 1000000,
+    }
+    bar.deleteLater()
+    player.deleteLater()
+    settle(app)
+    return result, []
+
+
+@benchmark
+def openFiles(context: Context):
+    app, files, count = context.app, context.corpus, context.args.opens
+    interface = context.playInterface('open')
+    interface.show()
+    for path in files:
+        interface.openFile(path)
+        settle(app, 1)
+    for i in range(count // 4):
+        interface.openFile(files[i % len(files)])
+        app.processEvents()
+    interface.coverLoader.wait()
+    settle(app)
+    memory, objects = residentMemory(), liveObjects(interface)
+
+    start = time.perf_counter()
+    for i in range(count):
+        interface.openFile(files[i % len(files)])
+        app.processEvents()
+    elapsed = time.perf_counter() - start
+    settle(app)
+
+    result = {
+        'opens': count,
+        'meanMs': elapsed / count * 1000,
+        'rssGrowth': residentMemory() - memory,
+        'objectGrowth': liveObjects(interface) - objects,
+    }
+    regressions = []
+    if result['objectGrowth'] > 0:
+        regressions.append(f"{result['objectGrowth']} QObjects leaked over {count} opens")
+    if result['rssGrowth'] > context.args.rss_limit * 1024 * 1024:
+        regressions.append(f"resident memory grew by {result['rssGrowth'] / 1048576:.1f} MiB")
+    disposePlayInterface(app, interface)
+    return result, regressions
+
+
+@benchmark
+def filePick(context: Context):
+    app, files = context.app, context.corpus
+    interface = context.playInterface('pick')
+    interface.show()
+    settle(app)
+
+    result, timeouts = {'files': len(files)}, 0
+    for name in ('cold', 'warm'):
+        times = []
+        for path in files:
+            start = time.perf_counter()
+            interface.openPaths([path])
+            if not waitFor(app, interface.coverLoader.coverLoaded):
+                timeouts += 1
+            times.append((time.perf_counter() - start) * 1000)
+        result[f'{name}MeanMs'] = sum(times) / len(times)
+        result[f'{name}P90Ms'] = percentile(times, 0.9)
+    regressions = [f'{timeouts} files never reported their cover'] if timeouts else []
+    disposePlayInterface(app, interface)
+    return result, regressions
+
+
+@benchmark
+def themeSwitch(context: Context):
+    from stylesheet import StyleSheetManager, THEMES
+    from window import SettingInterface
+
+    app, count = context.app, context.args.switches
+    window = QWidget()
+    layout = QVBoxLayout(window)
+    interface = context.playInterface('theme')
+    layout.addWidget(interface)
+    layout.addWidget(SettingInterface(window))
+    window.resize(1000, 800)
+    window.show()
+    manager = StyleSheetManager(window)
+    manager.apply(THEMES[0])
+    settle(app)
+
+    applyTimes, times = [], []
+    for i in range(count):
+        start = time.perf_counter()
+        manager.apply(THEMES[(i + 1) % len(THEMES)])
+        window.repaint()
+        times.append((time.perf_counter() - start) * 1000)
+        applyTimes.append(manager.switchTime)
+
+    result = {
+        'switches': count,
+        'meanMs': sum(times) / count,
+        'p90Ms': percentile(times, 0.9),
+        'applyMeanMs': sum(applyTimes) / count,
+    }
+    layout.removeWidget(interface)
+    interface.setParent(None)
+    disposePlayInterface(app, interface)
+    window.deleteLater()
+    settle(app)
+    return result, []
+
+
+@benchmark
+def libraryScan(context: Context):
+    from library import Library, LibraryScanner
+
+    app, files = context.app, context.scanCorpus
+    folder = os.path.dirname(os.path.dirname(files[0]))
+    library = Library(os.path.join(context.folder, 'library.db'))
+    scanner = LibraryScanner(library)
+
+    result, regressions = {'files': len(files)}, []
+    for name in ('scan', 'rescan'):
+        start = time.perf_counter()
+        scanner.scan(folder)
+        if not waitFor(app, scanner.finished, 600000):
+            regressions.append(f'{name} did not finish')
+        result[f'{name}Ms'] = (time.perf_counter() - start) * 1000
+    result['tracksPerSecond'] = len(files) / result['scanMs'] * 1000
+    if library.count() != len(files):
+        regressions.append(f'indexed {library.count()} of {len(files)} files')
+    scanner.deleteLater()
+    library.close()
+    settle(app)
+    return result, regressions
+
+
+@benchmark
+def spectrumFrames(context: Context):
+    import math
+    from array import array
+    from PySide6.QtMultimedia import QAudioBuffer
+    from window import GaplessMediaPlayer
+    from spectrum import SpectrumView, spectrumFormat, SAMPLE_RATE, FRAME_RATE
+
+    app, count = context.app, context.args.spectrum_frames
+    player = GaplessMediaPlayer()
+    view = SpectrumView(player)
+    view.show()
+    settle(app)
+    frames = SAMPLE_RATE // FRAME_RATE
+    buffers = []
+    for i in range(count):
+        samples = array('f', (0.5 * math.sin(2 * math.pi * 440 * (1 + i % 8) * n / SAMPLE_RATE) for n in range(frames)))
+        buffers.append(QAudioBuffer(samples.tobytes(), spectrumFormat()))
+
+    start = time.process_time()
+    for buffer in buffers:
+        view.appendBuffer(buffer)
+        view.updateLevels()
+        view.repaint()
+    elapsed = time.process_time() - start
+
+    result = {
+        'frames': count,
+        'meanMs': elapsed / count * 1000,
+        'corePercent': elapsed / count * FRAME_RATE * 100,
+    }
+    regressions = []
+    if result['corePercent'] > context.args.spectrum_limit:
+        regressions.append(f"spectrum uses {result['corePercent']:.1f}% of a core at {FRAME_RATE} fps")
+    view.deleteLater()
+    player.deleteLater()
+    settle(app)
+    return result, regressions
+
+
+@benchmark
+def dspBlocks(context: Context):
+    import numpy as np
+    from config import EQUALIZER_PRESETS
+    from dsp import DspChain, LATENCY
+
+    sampleRate, seconds = 44100, context.args.dsp_seconds
+    frames = np.random.default_rng(0).uniform(-0.5, 0.5, (sampleRate * seconds, 2)).astype(np.float32)
+    result, regressions = {'seconds': seconds, 'latencyMs': LATENCY * 1000}, []
+    for blockSize in (256, 512, 1024, 2048, 4096):
+        chain = DspChain(sampleRate, 2)
+        chain.setEqualizer(EQUALIZER_PRESETS['Rock'])
+        chain.setPreamp(-3)
+        start = time.process_time()
+        for offset in range(0, len(frames), blockSize):
+            chain.process(frames[offset:offset + blockSize])
+        factor = (time.process_time() - start) / seconds
+        result[f'block{blockSize}Rtf'] = factor
+        if factor > context.args.dsp_rtf_limit:
+            regressions.append(f'{blockSize}-frame blocks take {factor:.1%} of real time')
+    return result, regressions
+
+
+@benchmark
+def duplicateCandidates(context: Context):
+    import numpy as np
+    from fingerprint import candidatePairs, duplicateClusters
+
+    count, rng = context.args.duplicate_tracks, np.random.default_rng(0)
+    tracks = []
+    for i in range(count):
+        copy = i % 10 == 0 and tracks
+        source = tracks[-1] if copy else {'title': f'Song {i}', 'artist': f'Artist {i % 200}' if i % 5 else '',
+                                          'duration': float(rng.uniform(120, 420))}
+        tracks.append({**source, 'path': f'track{i}.flac', 'duration': source['duration'] + rng.uniform(-0.2, 0.2)})
+    prints = {track['path']: rng.integers(0, 1 << 24, 372, dtype=np.uint32).tobytes() for track in tracks}
+    for i in range(10, count, 10):
+        prints[f'track{i}.flac'] = prints[f'track{i - 1}.flac']
+
+    start = time.perf_counter()
+    pairs = candidatePairs(tracks)
+    candidateMs = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    clusters = duplicateClusters(pairs, prints)
+    clusterMs = (time.perf_counter() - start) * 1000
+    result = {'tracks': count, 'pairs': len(pairs), 'pairFraction': len(pairs) / (count * (count - 1) / 2),
+              'candidateMs': candidateMs, 'clusterMs': clusterMs, 'clusters': len(clusters)}
+    regressions = []
+    if len(clusters) != len(range(10, count, 10)):
+        regressions.append(f'found {len(clusters)} duplicate clusters instead of {len(range(10, count, 10))}')
+    return result, regressions
+
+
+@benchmark
+def searchKeystrokes(context: Context):
+    import random
+    from search import SearchIndex, searchEntry, trackKeywords
+
+    count, rng = context.args.search_tracks, random.Random(0)
+    tracks = []
+    for i in range(count):
+        track = {'title': f'Song {i} {rng.choice(("Love", "Night", "Road", "Blue"))}', 'artist': f'Artist {i % 900}',
+                 'album': f'Album {i % 9000}', 'path': f'/music/Artist {i % 900}/Album {i % 9000}/{i:06}.flac'}
+        tracks.append({**track, 'keywords': trackKeywords(track)})
+    index = SearchIndex()
+    start = time.perf_counter()
+    index.load([searchEntry(track) for track in tracks])
+    result, regressions = {'tracks': count, 'loadMs': (time.perf_counter() - start) * 1000}, []
+
+    times = []
+    for query in ('artist 42 album', 'night road', 'song 12345', '.flac', 'zzz'):
+        for end in range(1, len(query) + 1):
+            start = time.perf_counter()
+            results = index.search(query[:end])
+            results[:50]
+            times.append((time.perf_counter() - start) * 1000)
+    start = time.perf_counter()
+    index.update(tracks[:context.args.search_updates])
+    result['updateMs'] = (time.perf_counter() - start) * 1000
+    result['keystrokeMs'] = percentile(times, 0.5)
+    result['keystrokeP90Ms'] = percentile(times, 0.9)
+    if result['keystrokeP90Ms'] > context.args.search_limit:
+        regressions.append(f'90th percentile keystroke took {result["keystrokeP90Ms"]:.1f} ms')
+    return result, regressions
+
+
+@benchmark
+def historyStats(context: Context):
+    import random
+    from datetime import date
+    from history import History, HistoryWriter, connectHistory, writeEvents, weekOf
+
+    app, path = context.app, os.path.join(context.folder, 'history.db')
+    rng, now, days = random.Random(0), time.time(), context.args.history_years * 365
+    db = connectHistory(path)
+    for day in range(days):
+        events = []
+        for _ in range(40):
+            track = int(rng.paretovariate(1.2)) % 5000
+            events.append({'time': now - (days - day) * 86400, 'type': rng.choice(('finished', 'skip')),
+                           'path': f'track{track}.flac', 'artist': f'Artist {track % 300}', 'position': 0,
+                           'listened': rng.randrange(200000)})
+        writeEvents(db, events)
+    db.close()
+
+    history = History(path)
+    result, regressions = {'events': days * 40}, []
+    for name, since in (('week', weekOf(date.today())), ('all', 0)):
+        start = time.perf_counter()
+        history.topTracks(since)
+        history.topArtists(since)
+        history.totals(since)
+        result[f'{name}QueryMs'] = (time.perf_counter() - start) * 1000
+    history.close()
+
+    writer = HistoryWriter(path)
+    timings = []
+    for i in range(context.args.history_records):
+        start = time.perf_counter()
+        writer.record('play', f'track{i}.flac', 'Artist', 0, 0)
+        timings.append((time.perf_counter() - start) * 1e6)
+    writer.stop()
+    if not writer.wait(10000):
+        regressions.append('writer did not finish')
+    settle(app)
+    result['recordUs'] = sum(timings) / len(timings)
+    result['recordP99Us'] = percentile(timings, 0.99)
+    if result['allQueryMs'] > context.args.history_query_limit:
+        regressions.append(f'statistics took {result["allQueryMs"]:.1f} ms')
+    return result, regressions
+
+
+def compareBaseline(results: dict, path: str, tolerance: float):
+    with open(path, encoding='utf-8') as f:
+        baseline = json.load(f).get('results', {})
+    failures = {}
+    for name, result in results.items():
+        for key, value in result.items():
+            previous = baseline.get(name, {}).get(key)
+            if not previous or not isinstance(value, float):
+                continue
+            if key.endswith(('Ms', 'Us')) and value > previous * (1 + tolerance):
+                failures.setdefault(name, []).append(f'{key} rose from {previous:.3f} to {value:.3f}')
+            elif key.endswith('PerSecond') and value < previous / (1 + tolerance):
+                failures.setdefault(name, []).append(f'{key} fell from {previous:.3f} to {value:.3f}')
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description='MusePlayer benchmarks')
+    parser.add_argument('names', nargs='*', help='benchmarks to run, all by default')
+    parser.add_argument('--json', help='write results to this file')
+    parser.add_argument('--corpus', type=int, default=20, help='number of generated audio files')
+    parser.add_argument('--opens', type=int, default=1000, help='files opened by openFiles')
+    parser.add_argument('--constructions', type=int, default=200, help='play bars built by playBarConstruction')
+    parser.add_argument('--positions', type=int, default=100000, help='updates sent by positionUpdates')
+    parser.add_argument('--switches', type=int, default=20, help='theme changes made by themeSwitch')
+    parser.add_argument('--scan-files', type=int, default=1000, help='tagged files indexed by libraryScan')
+    parser.add_argument('--spectrum-frames', type=int, default=600, help='frames drawn by spectrumFrames')
+    parser.add_argument('--spectrum-limit', type=float, default=5, help='allowed spectrum CPU use in percent of a core')
+    parser.add_argument('--dsp-seconds', type=int, default=20, help='seconds of audio processed by dspBlocks')
+    parser.add_argument('--dsp-rtf-limit', type=float, default=0.25, help='allowed DSP real-time factor per block size')
+    parser.add_argument('--duplicate-tracks', type=int, default=20000, help='tracks indexed by duplicateCandidates')
+    parser.add_argument('--search-tracks', type=int, default=100000, help='tracks indexed by searchKeystrokes')
+    parser.add_argument('--search-updates', type=int, default=256, help='tracks changed by searchKeystrokes')
+    parser.add_argument('--search-limit', type=float, default=16, help='allowed keystroke search time in ms')
+    parser.add_argument('--history-years', type=int, default=3, help='years of listening simulated by historyStats')
+    parser.add_argument('--history-records', type=int, default=10000, help='events recorded by historyStats')
+    parser.add_argument('--history-query-limit', type=float, default=100, help='allowed statistics query time in ms')
+    parser.add_argument('--rss-limit', type=float, default=16, help='allowed memory growth in MiB')
+    parser.add_argument('--baseline', help='compare against results previously written with --json')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed slowdown against the baseline')
+    args = parser.parse_args()
+
+    unknown = set(args.names) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f'unknown benchmarks: {", ".join(sorted(unknown))}')
+
+    app = QApplication(sys.argv[:1])
+    folder = tempfile.mkdtemp(prefix='museplayer-benchmark-')
+    context = Context(app, folder, args)
+    results, failures = {}, {}
+    try:
+        for name in args.names or BENCHMARKS:
+            result, regressions = BENCHMARKS[name](context)
+            results[name] = result
+            if regressions:
+                failures[name] = regressions
+            print(f'{name}: ' + ', '.join(f'{k}={v:.3f}' if isinstance(v, float) else f'{k}={v}'
+                                          for k, v in result.items()))
+            for regression in regressions:
+                print(f'  REGRESSION: {regression}')
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+    if args.baseline:
+        for name, regressions in compareBaseline(results, args.baseline, args.tolerance).items():
+            failures.setdefault(name, []).extend(regressions)
+            for regression in regressions:
+                print(f'{name}: REGRESSION: {regression}')
+
+    if args.json:
+        report = {
+            'timestamp': time.time(),
+            'python': platform.python_version(),
+            'pyside': PYSIDE_VERSION,
+            'platform': platform.platform(),
+            'arguments': vars(args),
+            'results': results,
+            'regressions': failures,
+        }
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=4)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
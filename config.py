@@ -1,5 +1,59 @@
-from qfluentwidgets import qconfig, QConfig, ConfigItem, OptionsConfigItem, BoolValidator, OptionsValidator, \
-    FolderValidator
+from qfluentwidgets import qconfig, QConfig, ConfigItem, OptionsConfigItem, RangeConfigItem, BoolValidator, \
+    OptionsValidator, RangeValidator, FolderValidator, ConfigValidator
+
+EQUALIZER_BANDS = 10
+EQUALIZER_PRESETS = {
+    'Flat': [0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+    'Bass': [6, 5, 4, 2, 0, 0, 0, 0, 0, 0],
+    'Treble': [0, 0, 0, 0, 0, 0, 2, 4, 5, 6],
+    'Vocal': [-2, -2, -1, 1, 3, 3, 2, 1, 0, -1],
+    'Rock': [4, 3, 2, 0, -1, -1, 1, 2, 3, 4],
+    'Classical': [3, 2, 1, 0, 0, 0, -1, -1, 2, 3],
+    'Electronic': [5, 4, 1, 0, -2, 1, 0, 1, 4, 5],
+}
+
+
+class GainsValidator(ConfigValidator):
+    def __init__(self, count: int = EQUALIZER_BANDS, limit: float = 12):
+        self.count = count
+        self.limit = limit
+
+    def validate(self, value):
+        return isinstance(value, list) and len(value) == self.count and \
+            all(isinstance(gain, (int, float)) and abs(gain) <= self.limit for gain in value)
+
+    def correct(self, value):
+        if not isinstance(value, list) or len(value) != self.count:
+            return [0] * self.count
+        return [min(max(gain, -self.limit), self.limit) if isinstance(gain, (int, float)) else 0 for gain in value]
+
+
+class PresetsValidator(ConfigValidator):
+    def __init__(self, defaults: dict):
+        self.defaults = defaults
+        self.gainsValidator = GainsValidator()
+
+    def validate(self, value):
+        return isinstance(value, dict) and bool(value) and \
+            all(isinstance(name, str) and self.gainsValidator.validate(gains) for name, gains in value.items())
+
+    def correct(self, value):
+        if not isinstance(value, dict):
+            return dict(self.defaults)
+        presets = {name: gains for name, gains in value.items()
+                   if isinstance(name, str) and self.gainsValidator.validate(gains)}
+        return presets or dict(self.defaults)
+
+
+class PresetValidator(OptionsValidator):
+    def __init__(self):
+        super().__init__([*EQUALIZER_PRESETS, 'Custom'])
+
+    def validate(self, value):
+        return isinstance(value, str) and bool(value)
+
+    def correct(self, value):
+        return value if self.validate(value) else 'Custom'
 
 
 class Config(QConfig):
@@ -9,10 +63,32 @@ class Config(QConfig):
         "MainWindow", "EnableAcrylicBackground", False, BoolValidator())
     dpiScale = OptionsConfigItem(
         "MainWindow", "DpiScale", "Auto", OptionsValidator([1, 1.25, 1.5, 1.75, 2, "Auto"]), restart=True)
+    showSpectrum = ConfigItem(
+        "MainWindow", "ShowSpectrum", True, BoolValidator())
+    replayGain = OptionsConfigItem(
+        "Playback", "ReplayGain", "Track", OptionsValidator(["Off", "Track", "Album"]))
+    preservePitch = ConfigItem(
+        "Playback", "PreservePitch", True, BoolValidator())
+    crossfade = RangeConfigItem(
+        "Playback", "Crossfade", 0, RangeValidator(0, 12))
+    enableDsp = ConfigItem(
+        "Equalizer", "EnableDsp", False, BoolValidator())
+    preamp = RangeConfigItem(
+        "Equalizer", "Preamp", 0, RangeValidator(-12, 12))
+    equalizerGains = ConfigItem(
+        "Equalizer", "Gains", list(EQUALIZER_PRESETS['Flat']), GainsValidator())
+    equalizerPresets = ConfigItem(
+        "Equalizer", "Presets", dict(EQUALIZER_PRESETS), PresetsValidator(EQUALIZER_PRESETS))
+    equalizerPreset = OptionsConfigItem(
+        "Equalizer", "Preset", "Flat", PresetValidator())
     checkUpdateAtStartUp = ConfigItem(
         "Update", "CheckUpdateAtStartUp", True, BoolValidator())
 
 
 HELP_URL = ""
+LIBRARY_PATH = "config/library.db"
+HISTORY_PATH = "config/history.db"
+PLAYLIST_PATH = "config/playlist.json"
+CACHE_FOLDER = "cache"
 cfg = Config()
 qconfig.load('config/config.json', cfg)
@@ -0,0 +1,223 @@
+import os
+import threading
+from collections import OrderedDict
+from functools import partial
+from PySide6.QtCore import Qt, QSize, QBuffer, QByteArray, QIODevice, QObject, QThreadPool, Signal
+from PySide6.QtGui import QImage, QImageReader, QPixmap
+from config import CACHE_FOLDER
+from profiling import tracer
+from tags import coverHash, readAudio, readCover
+from cue import cueTrack
+
+
+def decodeThumbnail(device, size: int):
+    reader = QImageReader(device)
+    reader.setAutoTransform(True)
+    original = reader.size()
+    if original.isValid() and (original.width() > size or original.height() > size):
+        reader.setScaledSize(original.scaled(QSize(size, size), Qt.KeepAspectRatio))
+    image = reader.read()
+    if not image.isNull() and (image.width() > size or image.height() > size):
+        image = image.scaled(size, size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+    return image
+
+
+class CoverCache:
+    def __init__(self, folder: str = os.path.join(CACHE_FOLDER, 'covers'), size: int = 200,
+                 budget: int = 32 * 1024 * 1024):
+        self.folder = folder
+        self.size = size
+        self.budget = budget
+        self.cost = 0
+        self._pixmaps = OrderedDict()
+
+    def thumbnailPath(self, key: str):
+        return os.path.join(self.folder, f'{key}.jpg')
+
+    def contains(self, key: str):
+        return key in self._pixmaps
+
+    def get(self, key: str):
+        pixmap = self._pixmaps.get(key)
+        if pixmap is not None:
+            self._pixmaps.move_to_end(key)
+            return pixmap
+        path = self.thumbnailPath(key)
+        if not os.path.exists(path):
+            return None
+        pixmap = QPixmap(path)
+        if pixmap.isNull():
+            return None
+        self.insert(key, pixmap)
+        return pixmap
+
+    def insert(self, key: str, pixmap: QPixmap):
+        old = self._pixmaps.pop(key, None)
+        if old is not None:
+            self.cost -= self._cost(old)
+        self._pixmaps[key] = pixmap
+        self.cost += self._cost(pixmap)
+        while self.cost > self.budget and len(self._pixmaps) > 1:
+            self.cost -= self._cost(self._pixmaps.popitem(last=False)[1])
+
+    def createThumbnail(self, data: bytes, key: str):
+        buffer = QBuffer()
+        buffer.setData(QByteArray(data))
+        buffer.open(QIODevice.ReadOnly)
+        image = decodeThumbnail(buffer, self.size)
+        if not image.isNull():
+            self.save(key, image)
+        return image
+
+    def loadImage(self, data: bytes, key: str = None):
+        key = key or coverHash(data)
+        path = self.thumbnailPath(key)
+        if os.path.exists(path):
+            image = QImage(path)
+            if not image.isNull():
+                return image
+        return self.createThumbnail(data, key)
+
+    def fromData(self, data: bytes, key: str = None):
+        if not data:
+            return None
+        key = key or coverHash(data)
+        pixmap = self.get(key)
+        if pixmap is not None:
+            return pixmap
+        return self.fromImage(key, self.createThumbnail(data, key))
+
+    def fromImage(self, key: str, image: QImage):
+        if image.isNull():
+            return None
+        pixmap = QPixmap.fromImage(image)
+        self.insert(key, pixmap)
+        return pixmap
+
+    def fromFile(self, path: str):
+        pixmap = self._pixmaps.get(path)
+        if pixmap is not None:
+            self._pixmaps.move_to_end(path)
+            return pixmap
+        pixmap = QPixmap.fromImage(decodeThumbnail(path, self.size))
+        self.insert(path, pixmap)
+        return pixmap
+
+    def save(self, key: str, image: QImage):
+        os.makedirs(self.folder, exist_ok=True)
+        path = self.thumbnailPath(key)
+        temp = f'{path}.{threading.get_ident()}.tmp'
+        if image.save(temp, 'JPG', 90):
+            os.replace(temp, path)
+
+    def clear(self):
+        self._pixmaps.clear()
+        self.cost = 0
+
+    def _cost(self, pixmap: QPixmap):
+        return pixmap.width() * pixmap.height() * max(pixmap.depth(), 8) // 8
+
+
+class CoverLoader(QObject):
+    coverLoaded = Signal(str, object, object)
+    taskFinished = Signal(int, str, str, QImage, object)
+
+    def __init__(self, cache: CoverCache, lyricsLoader=None, parent=None):
+        super().__init__(parent=parent)
+        self.cache = cache
+        self.lyricsLoader = lyricsLoader
+        self.token = 0
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(2)
+        self.taskFinished.connect(self.__onTaskFinished)
+
+    def load(self, path: str):
+        self.token += 1
+        self.pool.start(partial(self.__loadCover, self.token, path))
+        return self.token
+
+    def cancel(self):
+        self.token += 1
+        self.pool.clear()
+
+    def wait(self):
+        self.pool.waitForDone()
+
+    @tracer.timed
+    def __loadCover(self, token: int, path: str):
+        if token != self.token:
+            return
+        audio = readAudio(path)
+        data = readCover(audio)
+        key, image = coverHash(data), QImage()
+        if key and not self.cache.contains(key):
+            image = self.cache.loadImage(data, key)
+        lyrics = self.lyricsLoader(path, audio) if self.lyricsLoader else None
+        self.taskFinished.emit(token, path, key, image, lyrics)
+
+    @tracer.timed
+    def __onTaskFinished(self, token: int, path: str, key: str, image: QImage, lyrics):
+        if token != self.token:
+            return
+        pixmap = None
+        if key and image.isNull():
+            pixmap = self.cache.get(key)
+        elif key:
+            pixmap = self.cache.fromImage(key, image)
+        self.coverLoaded.emit(path, pixmap, lyrics)
+
+
+class ThumbnailLoader(QObject):
+    thumbnailLoaded = Signal(str)
+    taskFinished = Signal(str, QImage)
+
+    def __init__(self, cache: CoverCache, limit: int = 64, parent=None):
+        super().__init__(parent=parent)
+        self.cache = cache
+        self.limit = limit
+        self.pending = OrderedDict()
+        self.running = set()
+        self.failed = set()
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(2)
+        self.taskFinished.connect(self.__onTaskFinished)
+
+    def request(self, key: str, path: str):
+        if key in self.running or key in self.failed:
+            return
+        self.pending[key] = path
+        self.pending.move_to_end(key)
+        while len(self.pending) > self.limit:
+            self.pending.popitem(last=False)
+        self.__startNext()
+
+    def cancel(self):
+        self.pending.clear()
+
+    def wait(self):
+        self.pool.waitForDone()
+
+    def __startNext(self):
+        while self.pending and len(self.running) < self.pool.maxThreadCount():
+            key, path = self.pending.popitem()
+            self.running.add(key)
+            self.pool.start(partial(self.__loadThumbnail, key, path))
+
+    @tracer.timed
+    def __loadThumbnail(self, key: str, path: str):
+        image = QImage(self.cache.thumbnailPath(key))
+        if image.isNull():
+            track = cueTrack(path)
+            data = readCover(readAudio(track['file'] if track else path))
+            if data:
+                image = self.cache.createThumbnail(data, key)
+        self.taskFinished.emit(key, image)
+
+    def __onTaskFinished(self, key: str, image: QImage):
+        self.running.discard(key)
+        if image.isNull():
+            self.failed.add(key)
+        else:
+            self.cache.fromImage(key, image)
+            self.thumbnailLoaded.emit(key)
+        self.__startNext()
@@ -0,0 +1,171 @@
+import os
+import re
+import logging
+from functools import lru_cache
+from tags import readAudio, readCover, coverHash, parseNumber, REPLAYGAIN_KEYS
+
+CUE_EXTENSION = '.cue'
+TEXT_ENCODINGS = ('utf-8-sig', 'gb18030', 'latin-1')
+CUE_SEPARATOR = '#'
+FRAMES_PER_SECOND = 75
+
+COMMAND_PATTERN = re.compile(r'(\S+)\s*(.*)')
+INDEX_PATTERN = re.compile(r'(\d+)\s+(\d+):(\d+):(\d+)')
+
+logger = logging.getLogger(__name__)
+
+
+def isCueFile(path: str):
+    return path.lower().endswith(CUE_EXTENSION)
+
+
+def virtualPath(cuePath: str, number: int):
+    return f'{cuePath}{CUE_SEPARATOR}{number}'
+
+
+def splitVirtualPath(path: str):
+    cuePath, separator, number = path.rpartition(CUE_SEPARATOR)
+    if separator and number.isdigit() and isCueFile(cuePath):
+        return cuePath, int(number)
+    return path, None
+
+
+def isVirtualPath(path: str):
+    return splitVirtualPath(path)[1] is not None
+
+
+def readText(path: str):
+    with open(path, 'rb') as f:
+        data = f.read()
+    for encoding in TEXT_ENCODINGS:
+        try:
+            return data.decode(encoding)
+        except UnicodeDecodeError:
+            continue
+    return data.decode('latin-1', errors='replace')
+
+
+def unquote(value: str):
+    value = value.strip()
+    if value.startswith('"'):
+        end = value.rfind('"')
+        return value[1:end] if end > 0 else value[1:]
+    return value
+
+
+def parseCue(path: str):
+    sheet = {'title': '', 'performer': '', 'tracks': [], **dict.fromkeys(REPLAYGAIN_KEYS.values())}
+    folder = os.path.dirname(path)
+    file, track = '', None
+    for line in readText(path).splitlines():
+        match = COMMAND_PATTERN.match(line.strip())
+        if not match:
+            continue
+        command, value = match.group(1).upper(), match.group(2)
+        if command == 'FILE':
+            name = unquote(value) if value.lstrip().startswith('"') else value.rsplit(' ', 1)[0]
+            file = os.path.join(folder, name).replace('\\', '/') if name else ''
+        elif command == 'TRACK':
+            number = value.split()[:1]
+            track = {'number': int(number[0]) if number and number[0].isdigit() else len(sheet['tracks']) + 1,
+                     'file': file, 'title': '', 'performer': '', 'start': None, 'end': 0.0,
+                     **dict.fromkeys(REPLAYGAIN_KEYS.values())}
+            sheet['tracks'].append(track)
+        elif command in ('TITLE', 'PERFORMER'):
+            (track if track is not None else sheet)[command.lower()] = unquote(value)
+        elif command == 'REM':
+            name, _, remark = value.partition(' ')
+            if name.lower() in REPLAYGAIN_KEYS:
+                (track if track is not None else sheet)[REPLAYGAIN_KEYS[name.lower()]] = parseNumber(remark)
+        elif command == 'INDEX' and track is not None:
+            index = INDEX_PATTERN.match(value.strip())
+            if index:
+                number, minutes, seconds, frames = map(int, index.groups())
+                if number == 1 or track['start'] is None:
+                    track['start'] = minutes * 60 + seconds + frames / FRAMES_PER_SECOND
+    sheet['tracks'] = [t for t in sheet['tracks'] if t['file'] and t['start'] is not None]
+    for track, following in zip(sheet['tracks'], sheet['tracks'][1:]):
+        if following['file'] == track['file']:
+            track['end'] = following['start']
+    return sheet
+
+
+@lru_cache(maxsize=32)
+def _loadCue(path: str, mtime: float):
+    return parseCue(path)
+
+
+def loadCue(path: str):
+    try:
+        return _loadCue(path, os.path.getmtime(path))
+    except OSError:
+        return None
+    except (ValueError, IndexError):
+        logger.warning('Skipping malformed cue sheet %s', path, exc_info=True)
+        return None
+
+
+def cueTrack(path: str):
+    cuePath, number = splitVirtualPath(path)
+    if number is None:
+        return None
+    sheet = loadCue(cuePath)
+    if sheet is None:
+        return None
+    for track in sheet['tracks']:
+        if track['number'] == number:
+            return track
+    return None
+
+
+def cueFiles(path: str):
+    sheet = loadCue(path)
+    return {track['file'] for track in sheet['tracks']} if sheet else set()
+
+
+def expandCuePaths(paths):
+    expanded = []
+    for path in paths:
+        if isCueFile(path):
+            sheet = loadCue(path)
+            if sheet:
+                expanded.extend(virtualPath(path, track['number']) for track in sheet['tracks'])
+        else:
+            expanded.append(path)
+    return expanded
+
+
+def readCueTrackInfos(path: str, stat: os.stat_result = None):
+    stat = stat or os.stat(path)
+    try:
+        sheet = parseCue(path)
+    except OSError:
+        return []
+    except (ValueError, IndexError):
+        logger.warning('Skipping malformed cue sheet %s', path, exc_info=True)
+        return []
+    infos, images = [], {}
+    for track in sheet['tracks']:
+        if track['file'] not in images:
+            audio = readAudio(track['file'])
+            length = float(getattr(getattr(audio, 'info', None), 'length', 0) or 0)
+            images[track['file']] = (length, coverHash(readCover(audio)))
+        length, cover = images[track['file']]
+        end = track['end'] or length
+        infos.append({
+            'path': virtualPath(path, track['number']),
+            'mtime': stat.st_mtime,
+            'size': stat.st_size,
+            'duration': max(end - track['start'], 0.0),
+            'title': track['title'] or f"{sheet['title']} {track['number']:02}".strip(),
+            'artist': track['performer'] or sheet['performer'],
+            'album': sheet['title'],
+            'coverHash': cover,
+            'startTime': track['start'],
+            'endTime': track['end'],
+            'trackGain': track['trackGain'],
+            'trackPeak': track['trackPeak'],
+            'albumGain': track['albumGain'] if track['albumGain'] is not None else sheet['albumGain'],
+            'albumPeak': track['albumPeak'] if track['albumPeak'] is not None else sheet['albumPeak'],
+        })
+    return infos
@@ -0,0 +1,270 @@
+import numpy as np
+from functools import lru_cache
+from PySide6.QtCore import QObject, QTimer, Signal
+from PySide6.QtMultimedia import QAudio, QAudioBuffer, QAudioBufferOutput, QAudioFormat, QAudioOutput, QAudioSink
+
+EQ_FREQUENCIES = (31, 62, 125, 250, 500, 1000, 2000, 4000, 8000, 16000)
+EQ_Q = 1.41
+EQ_TAPS = 4096
+EQ_RANGE = 12
+DEFAULT_SAMPLE_RATE = 44100
+CHANNELS = 2
+LATENCY = 0.2
+PUSH_INTERVAL = 20
+
+
+def peakingCoefficients(frequencies, gains, q: float, sampleRate: int):
+    amplitude = 10 ** (np.asarray(gains, float) / 40)
+    omega = 2 * np.pi * np.asarray(frequencies, float) / sampleRate
+    alpha = np.sin(omega) / (2 * q)
+    cosine = -2 * np.cos(omega)
+    b = np.array([1 + alpha * amplitude, cosine, 1 - alpha * amplitude])
+    a = np.array([1 + alpha / amplitude, cosine, 1 - alpha / amplitude])
+    return b, a
+
+
+class FirFilter:
+    def __init__(self, taps, channels: int):
+        self.length = len(taps)
+        self.fftSize = 1 << (4 * self.length - 1).bit_length()
+        self.blockSize = self.fftSize - self.length + 1
+        self.response = np.fft.rfft(taps, self.fftSize)[:, None]
+        self.tail = np.zeros((self.length - 1, channels))
+
+    def process(self, frames):
+        blocks = []
+        for start in range(0, len(frames), self.blockSize):
+            block = frames[start:start + self.blockSize]
+            output = np.fft.irfft(np.fft.rfft(block, self.fftSize, axis=0) * self.response, self.fftSize, axis=0)
+            output[:self.length - 1] += self.tail
+            self.tail = output[len(block):len(block) + self.length - 1].copy()
+            blocks.append(output[:len(block)])
+        return np.concatenate(blocks) if blocks else frames
+
+
+@lru_cache(maxsize=16)
+def equalizerTaps(gains: tuple, sampleRate: int, taps: int = EQ_TAPS):
+    frequencies = np.array(EQ_FREQUENCIES, float)
+    isBelowNyquist = frequencies < sampleRate * 0.45
+    b, a = peakingCoefficients(frequencies[isBelowNyquist], np.array(gains)[isBelowNyquist], EQ_Q, sampleRate)
+    size = taps * 4
+    z = np.exp(-1j * np.pi * np.arange(size // 2 + 1) / (size // 2))[:, None]
+    response = np.prod((b[0] + b[1] * z + b[2] * z * z) / (a[0] + a[1] * z + a[2] * z * z), axis=1)
+    impulse = np.fft.irfft(response, size)[:taps]
+    fade = taps // 8
+    impulse[taps - fade:] *= np.hanning(2 * fade)[fade:]
+    return impulse
+
+
+def fadeCurve(position: int, count: int, length: int, isFadeIn: bool):
+    t = np.minimum((position + np.arange(count)) / max(length, 1), 1.0) * (np.pi / 2)
+    return (np.sin(t) if isFadeIn else np.cos(t)).astype(np.float32)[:, None]
+
+
+class DspChain:
+    def __init__(self, sampleRate: int, channels: int):
+        self.sampleRate = sampleRate
+        self.channels = channels
+        self.filter = None
+        self.gains = (0.0,) * len(EQ_FREQUENCIES)
+        self.preamp = 1.0
+
+    def setEqualizer(self, gains):
+        gains = tuple(float(gain) for gain in gains)
+        if gains == self.gains:
+            return
+        self.gains = gains
+        if not any(gains):
+            self.filter = None
+            return
+        previous = self.filter
+        self.filter = FirFilter(equalizerTaps(gains, self.sampleRate), self.channels)
+        if previous is not None:
+            self.filter.tail = previous.tail
+
+    def setPreamp(self, gain: float):
+        self.preamp = 10 ** (gain / 20)
+
+    def isBypassed(self):
+        return self.filter is None and self.preamp == 1.0
+
+    def process(self, frames):
+        if self.isBypassed():
+            return frames
+        if self.filter is not None:
+            frames = self.filter.process(frames)
+        if self.preamp != 1.0:
+            frames = frames * self.preamp
+        return np.clip(frames, -1.0, 1.0).astype(np.float32)
+
+
+def stageFormat(audioOutput: QAudioOutput):
+    device = audioOutput.device()
+    sampleRate = device.preferredFormat().sampleRate() if not device.isNull() else 0
+    format = QAudioFormat()
+    format.setSampleRate(sampleRate or DEFAULT_SAMPLE_RATE)
+    format.setChannelCount(CHANNELS)
+    format.setSampleFormat(QAudioFormat.Float)
+    return format
+
+
+class DspStage(QObject):
+    bufferProcessed = Signal(QAudioBuffer)
+    fadeFinished = Signal(int)
+
+    def __init__(self, audioOutput: QAudioOutput, parent=None):
+        super().__init__(parent=parent)
+        self.audioOutput = audioOutput
+        self.format = stageFormat(audioOutput)
+        self.sampleRate = self.format.sampleRate()
+        self.maxFrames = int(LATENCY * self.sampleRate)
+        self.chain = DspChain(self.sampleRate, CHANNELS)
+        self.inputs = [QAudioBufferOutput(self.format, self), QAudioBufferOutput(self.format, self)]
+        self.inputs[0].audioBufferReceived.connect(lambda buffer: self.__onBuffer(0, buffer))
+        self.inputs[1].audioBufferReceived.connect(lambda buffer: self.__onBuffer(1, buffer))
+        self.mix = np.zeros((0, CHANNELS), np.float32)
+        self.offsets = [0, 0]
+        self.active = {0}
+        self.fades = {}
+        self.tap = None
+        self.sink = None
+        self.device = None
+        self.pending = b''
+        self.droppedFrames = 0
+        self.pushTimer = QTimer(self)
+        self.pushTimer.setInterval(PUSH_INTERVAL)
+        self.pushTimer.timeout.connect(self.__push)
+        audioOutput.volumeChanged.connect(self.__applyVolume)
+        audioOutput.mutedChanged.connect(self.__applyVolume)
+        audioOutput.deviceChanged.connect(self.__onDeviceChanged)
+
+    def isRunning(self):
+        return self.sink is not None
+
+    def start(self):
+        if self.sink is not None:
+            return
+        self.sink = QAudioSink(self.audioOutput.device(), self.format, self)
+        self.sink.setBufferSize(self.maxFrames * self.format.bytesPerFrame())
+        self.droppedFrames = 0
+        self.__applyVolume()
+        self.device = self.sink.start()
+        if self.sink.error() != QAudio.NoError:
+            self.device = None
+
+    def stop(self):
+        if self.sink is None:
+            return
+        self.pushTimer.stop()
+        self.sink.stop()
+        self.sink.deleteLater()
+        self.sink, self.device, self.pending = None, None, b''
+        self.mix = self.mix[:0]
+        self.offsets = [0, 0]
+        self.fades.clear()
+
+    def setTap(self, output: QAudioBufferOutput):
+        if self.tap is not None:
+            self.bufferProcessed.disconnect(self.tap.audioBufferReceived)
+        self.tap = output
+        if output is not None:
+            self.bufferProcessed.connect(output.audioBufferReceived)
+
+    def setEqualizer(self, gains):
+        self.chain.setEqualizer(gains)
+
+    def setPreamp(self, gain: float):
+        self.chain.setPreamp(gain)
+
+    def setCurrent(self, index: int):
+        self.__flush(isForced=True)
+        for other in self.active - {index}:
+            self.__finishInput(other)
+        self.fades.pop(index, None)
+        self.active = {index}
+        self.offsets[index] = len(self.mix)
+
+    def crossfade(self, fromIndex: int, toIndex: int, duration: int):
+        length = max(int(duration * self.sampleRate / 1000), 1)
+        self.fades[fromIndex] = (0, length, False)
+        self.fades[toIndex] = (0, length, True)
+        self.offsets[toIndex] = self.offsets[fromIndex]
+        self.active = {fromIndex, toIndex}
+
+    def __finishInput(self, index: int):
+        self.active.discard(index)
+        self.offsets[index] = 0
+        if self.fades.pop(index, None) is not None:
+            self.fadeFinished.emit(index)
+
+    def __onBuffer(self, index: int, buffer: QAudioBuffer):
+        if index not in self.active or self.sink is None or not buffer.frameCount():
+            return
+        frames = np.frombuffer(buffer.constData(), np.float32).reshape(-1, CHANNELS)
+        fade = self.fades.get(index)
+        if fade is not None:
+            position, length, isFadeIn = fade
+            frames = frames * fadeCurve(position, len(frames), length, isFadeIn)
+            self.fades[index] = (position + len(frames), length, isFadeIn)
+        if len(self.active) == 1 and not len(self.mix):
+            self.__write(self.chain.process(frames))
+        else:
+            end = self.offsets[index] + len(frames)
+            if end > len(self.mix):
+                self.mix = np.concatenate((self.mix, np.zeros((end - len(self.mix), CHANNELS), np.float32)))
+            self.mix[self.offsets[index]:end] += frames
+            self.offsets[index] = end
+            self.__flush()
+        if fade is not None and fade[0] + len(frames) >= fade[1]:
+            if fade[2]:
+                del self.fades[index]
+            else:
+                self.__finishInput(index)
+                self.__flush()
+
+    def __flush(self, isForced: bool = False):
+        offsets = [self.offsets[index] for index in self.active]
+        ready = len(self.mix) if isForced or not offsets else min(offsets)
+        if max(offsets, default=0) - ready > self.maxFrames:
+            ready = max(offsets) - self.maxFrames
+            for index in self.active:
+                self.offsets[index] = max(self.offsets[index], ready)
+        if ready <= 0:
+            return
+        frames, self.mix = self.mix[:ready], self.mix[ready:]
+        for index in self.active:
+            self.offsets[index] = max(self.offsets[index] - ready, 0)
+        self.__write(self.chain.process(frames))
+
+    def __write(self, frames):
+        frames = np.ascontiguousarray(frames, np.float32)
+        data = frames.tobytes()
+        self.bufferProcessed.emit(QAudioBuffer(data, self.format))
+        if self.device is None:
+            return
+        limit = self.maxFrames * self.format.bytesPerFrame()
+        self.pending += data
+        if len(self.pending) > limit:
+            self.droppedFrames += (len(self.pending) - limit) // self.format.bytesPerFrame()
+            self.pending = self.pending[-limit:]
+        self.__push()
+
+    def __push(self):
+        if self.device is None or not self.pending:
+            self.pushTimer.stop()
+            return
+        written = self.device.write(self.pending[:self.sink.bytesFree()])
+        self.pending = self.pending[max(written, 0):]
+        if self.pending and not self.pushTimer.isActive():
+            self.pushTimer.start()
+        elif not self.pending:
+            self.pushTimer.stop()
+
+    def __applyVolume(self):
+        if self.sink is not None:
+            self.sink.setVolume(0.0 if self.audioOutput.isMuted() else self.audioOutput.volume())
+
+    def __onDeviceChanged(self):
+        if self.sink is not None:
+            self.stop()
+            self.start()
@@ -0,0 +1,273 @@
+import os
+import re
+import math
+import time
+import logging
+import multiprocessing
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from PySide6.QtCore import QCoreApplication, QThread, Signal
+from audio import decodePcm
+from cue import cueTrack
+from search import foldText
+
+SEGMENT_DURATION = 30.0
+FRAME_DURATION = 0.16
+MIN_FREQUENCY = 80.0
+MAX_FREQUENCY = 2000.0
+SILENCE_LEVEL = 1e-3
+SMOOTHING_FRAMES = 3
+FINGERPRINT_BITS = 24
+MIN_FRAMES = 40
+MAX_SHIFT = 6
+MATCH_THRESHOLD = 0.2
+DURATION_TOLERANCE = 2.0
+BUCKET_DURATION = 1.0
+
+_application = None
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=None)
+def chromaMatrix(sampleRate: int, fftSize: int):
+    frequencies = np.fft.rfftfreq(fftSize, 1 / sampleRate)
+    isAudible = (frequencies >= MIN_FREQUENCY) & (frequencies <= MAX_FREQUENCY)
+    pitchClasses = np.round(12 * np.log2(np.maximum(frequencies, 1) / 440)).astype(int) % 12
+    matrix = np.zeros((len(frequencies), 12))
+    matrix[isAudible, pitchClasses[isAudible]] = 1.0
+    return matrix
+
+
+@lru_cache(maxsize=None)
+def analysisWindow(frameSize: int):
+    return np.hanning(frameSize)
+
+
+def readSegment(file: str, start: float = 0.0, duration: float = SEGMENT_DURATION):
+    chunks, sampleRate, position, length, offset = [], 0, 0, 0, None
+    for chunk, sampleRate in decodePcm(file):
+        first = max(round(start * sampleRate) - position, 0)
+        position += len(chunk)
+        mono = chunk[first:].mean(axis=1)
+        if offset is None:
+            loud = np.flatnonzero(np.abs(mono) > SILENCE_LEVEL)
+            if not len(loud):
+                continue
+            offset = loud[0]
+            mono = mono[offset:]
+        chunks.append(mono)
+        length += len(mono)
+        if length >= duration * sampleRate:
+            break
+    if not chunks:
+        return np.zeros(0), sampleRate
+    return np.concatenate(chunks)[:round(duration * sampleRate)], sampleRate
+
+
+def chromagram(samples, sampleRate: int):
+    frameSize = round(FRAME_DURATION * sampleRate / 2) * 2
+    fftSize = 1 << (frameSize - 1).bit_length()
+    if len(samples) < frameSize * SMOOTHING_FRAMES:
+        return np.zeros((0, 12))
+    frames = sliding_window_view(samples, frameSize)[::frameSize // 2] * analysisWindow(frameSize)
+    chroma = np.square(np.abs(np.fft.rfft(frames, fftSize, axis=1))) @ chromaMatrix(sampleRate, fftSize)
+    chroma = sliding_window_view(chroma, SMOOTHING_FRAMES, axis=0).mean(axis=2)
+    return chroma / np.maximum(chroma.sum(axis=1, keepdims=True), 1e-12)
+
+
+def fingerprintBits(chroma):
+    if len(chroma) < 2:
+        return np.zeros(0, np.uint32)
+    neighbours = chroma > np.roll(chroma, -1, axis=1)
+    rising = np.vstack((np.zeros((1, 12), bool), chroma[1:] > chroma[:-1]))
+    bits = np.hstack((neighbours, rising)).astype(np.uint32)
+    return (bits << np.arange(FINGERPRINT_BITS, dtype=np.uint32)).sum(axis=1, dtype=np.uint32)
+
+
+def fingerprintFile(file: str, start: float = 0.0, end: float = 0.0):
+    duration = min(SEGMENT_DURATION, end - start) if end > start else SEGMENT_DURATION
+    samples, sampleRate = readSegment(file, start, duration)
+    return fingerprintBits(chromagram(samples, sampleRate)).tobytes()
+
+
+def fingerprintTracks(tracks):
+    global _application
+    _application = QCoreApplication.instance() or QCoreApplication([])
+    results = []
+    for path, mtime, start, end in tracks:
+        track = cueTrack(path)
+        try:
+            data = fingerprintFile(track['file'] if track else path, float(start), float(end))
+        except Exception:
+            data = b''
+        results.append({'path': path, 'mtime': mtime, 'data': data})
+    return results
+
+
+def bitCounts(values):
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(values)
+    return np.unpackbits(values.view(np.uint8), axis=-1).reshape(*values.shape, -1).sum(axis=-1)
+
+
+def fingerprintDistance(first: bytes, second: bytes):
+    a, b = np.frombuffer(first, np.uint32), np.frombuffer(second, np.uint32)
+    count = min(len(a), len(b)) - MAX_SHIFT
+    if count < MIN_FRAMES:
+        return 1.0
+    shifted = np.vstack((sliding_window_view(a, count)[:MAX_SHIFT + 1] ^ b[:count],
+                         sliding_window_view(b, count)[1:MAX_SHIFT + 1] ^ a[:count]))
+    errors = bitCounts(shifted).sum(axis=1)
+    return float(errors.min()) / (count * FINGERPRINT_BITS)
+
+
+def metadataKey(track):
+    if not track['artist']:
+        return ''
+    return re.sub(r'\W+', '', foldText(track['title']))
+
+
+def candidatePairs(tracks):
+    keys = {track['path']: metadataKey(track) for track in tracks}
+    groups = {}
+    for track in tracks:
+        groups.setdefault(keys[track['path']], []).append(track)
+    untagged = groups.pop('', [])
+    pairs = []
+    for group in groups.values():
+        if len(group) > 1:
+            pairs.extend(durationPairs(group))
+    if untagged:
+        buckets = durationBuckets(tracks)
+        for (offset, _), bucket in buckets.items():
+            for track in bucket:
+                if keys[track['path']]:
+                    continue
+                for other in bucket:
+                    if other is track or not keys[other['path']] and other['path'] < track['path']:
+                        continue
+                    if offset and bucketOf(track) == bucketOf(other):
+                        continue
+                    pairs.append((track['path'], other['path']))
+    return pairs
+
+
+def bucketOf(track, offset: float = 0.0):
+    return math.floor(track['duration'] / BUCKET_DURATION + offset)
+
+
+def durationBuckets(tracks):
+    buckets = {}
+    for track in tracks:
+        for offset in (0.0, 0.5):
+            buckets.setdefault((offset, bucketOf(track, offset)), []).append(track)
+    return buckets
+
+
+def durationPairs(tracks):
+    tracks = sorted(tracks, key=lambda track: track['duration'])
+    for i, track in enumerate(tracks):
+        for other in tracks[i + 1:]:
+            if other['duration'] - track['duration'] > DURATION_TOLERANCE:
+                break
+            yield track['path'], other['path']
+
+
+def duplicateClusters(pairs, fingerprints: dict):
+    parents = {}
+
+    def find(path):
+        while parents.setdefault(path, path) != path:
+            parents[path] = parents[parents[path]]
+            path = parents[path]
+        return path
+
+    for first, second in pairs:
+        a, b = fingerprints.get(first), fingerprints.get(second)
+        if a and b and find(first) != find(second) and fingerprintDistance(a, b) <= MATCH_THRESHOLD:
+            parents[find(first)] = find(second)
+    clusters = {}
+    for path in parents:
+        clusters.setdefault(find(path), []).append(path)
+    return sorted((sorted(paths) for paths in clusters.values() if len(paths) > 1), key=lambda paths: paths[0])
+
+
+class DuplicateFinder(QThread):
+    progressChanged = Signal(int, int)
+    fingerprintsFound = Signal(list)
+    duplicatesFound = Signal(list)
+    canceled = Signal()
+
+    batchSize = 16
+    batchInterval = 0.5
+
+    def __init__(self, library, parent=None):
+        super().__init__(parent=parent)
+        self.library = library
+        self._tracks = []
+        self._fingerprints = {}
+        self._isCanceled = False
+        self.fingerprintsFound.connect(self._onFingerprintsFound)
+
+    def find(self):
+        if self.isRunning():
+            return False
+        self._tracks = self.library.tracks()
+        self._fingerprints = self.library.fingerprints()
+        self._isCanceled = False
+        self.start(QThread.LowPriority)
+        return True
+
+    def cancel(self):
+        self._isCanceled = True
+
+    def isCanceled(self):
+        return self._isCanceled
+
+    def run(self):
+        pairs = candidatePairs(self._tracks)
+        paths = {path for pair in pairs for path in pair}
+        pending = [(track['path'], track['mtime'], track['startTime'], track['endTime']) for track in self._tracks
+                   if track['path'] in paths and track['path'] not in self._fingerprints]
+        total = len(pending)
+        self.progressChanged.emit(0, total)
+        if pending:
+            self.__fingerprint(pending, total)
+        if self._isCanceled:
+            self.canceled.emit()
+            return
+        self.duplicatesFound.emit(duplicateClusters(pairs, self._fingerprints))
+
+    def __fingerprint(self, pending, total: int):
+        batch, done, lastEmit = [], 0, time.monotonic()
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(os.cpu_count() or 1, mp_context=context) as executor:
+            batches = [pending[i:i + self.batchSize] for i in range(0, len(pending), self.batchSize)]
+            futures = {executor.submit(fingerprintTracks, tracks): tracks for tracks in batches}
+            for future in as_completed(futures):
+                if self._isCanceled:
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    break
+                try:
+                    results = future.result()
+                except Exception:
+                    logger.warning('Skipping %d tracks after a fingerprint batch failed', len(futures[future]),
+                                   exc_info=True)
+                    results = [{'path': path, 'mtime': mtime, 'data': b''} for path, mtime, _, _ in futures[future]]
+                self._fingerprints.update((result['path'], result['data']) for result in results)
+                batch.extend(results)
+                done += len(results)
+                now = time.monotonic()
+                if now - lastEmit >= self.batchInterval:
+                    self.fingerprintsFound.emit(batch)
+                    self.progressChanged.emit(done, total)
+                    batch, lastEmit = [], now
+        if batch:
+            self.fingerprintsFound.emit(batch)
+        self.progressChanged.emit(done, total)
+
+    def _onFingerprintsFound(self, results: list):
+        self.library.setFingerprints(results)
@@ -0,0 +1,177 @@
+import os
+import time
+import queue
+import sqlite3
+from datetime import date
+from PySide6.QtCore import QThread, Signal
+from config import HISTORY_PATH
+
+PLAY_THRESHOLD = 30000
+SESSION_END_TYPES = ('finished', 'skip', 'stop')
+EVENT_COLUMNS = ('time', 'type', 'path', 'artist', 'position', 'listened')
+
+
+def weekOf(day: date):
+    return day.toordinal() - day.weekday()
+
+
+def connectHistory(path: str):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    db = sqlite3.connect(path)
+    db.row_factory = sqlite3.Row
+    db.execute('PRAGMA journal_mode=WAL')
+    db.execute('PRAGMA synchronous=NORMAL')
+    with db:
+        db.execute('''
+            CREATE TABLE IF NOT EXISTS events (
+                id INTEGER PRIMARY KEY,
+                time REAL NOT NULL,
+                type TEXT NOT NULL,
+                path TEXT NOT NULL,
+                artist TEXT NOT NULL DEFAULT '',
+                position INTEGER NOT NULL DEFAULT 0,
+                listened INTEGER NOT NULL DEFAULT 0
+            )''')
+        db.execute('''
+            CREATE TABLE IF NOT EXISTS weeklyTracks (
+                week INTEGER NOT NULL,
+                path TEXT NOT NULL,
+                plays INTEGER NOT NULL DEFAULT 0,
+                skips INTEGER NOT NULL DEFAULT 0,
+                listened INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (week, path)
+            ) WITHOUT ROWID''')
+        db.execute('''
+            CREATE TABLE IF NOT EXISTS weeklyArtists (
+                week INTEGER NOT NULL,
+                artist TEXT NOT NULL,
+                plays INTEGER NOT NULL DEFAULT 0,
+                listened INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (week, artist)
+            ) WITHOUT ROWID''')
+    return db
+
+
+def rollups(events):
+    tracks, artists = {}, {}
+    for event in events:
+        if event['type'] not in SESSION_END_TYPES:
+            continue
+        week = weekOf(date.fromtimestamp(event['time']))
+        isPlay = event['type'] == 'finished' or event['listened'] >= PLAY_THRESHOLD
+        track = tracks.setdefault((week, event['path']), [0, 0, 0])
+        track[0] += isPlay
+        track[1] += event['type'] == 'skip' and not isPlay
+        track[2] += event['listened']
+        if event['artist']:
+            artist = artists.setdefault((week, event['artist']), [0, 0])
+            artist[0] += isPlay
+            artist[1] += event['listened']
+    return tracks, artists
+
+
+def writeEvents(db, events):
+    tracks, artists = rollups(events)
+    columns = ', '.join(EVENT_COLUMNS)
+    values = ', '.join(f':{c}' for c in EVENT_COLUMNS)
+    with db:
+        db.executemany(f'INSERT INTO events ({columns}) VALUES ({values})', events)
+        db.executemany('''
+            INSERT INTO weeklyTracks (week, path, plays, skips, listened) VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(week, path) DO UPDATE SET plays = plays + excluded.plays, skips = skips + excluded.skips,
+                listened = listened + excluded.listened''',
+                       ((week, path, *counts) for (week, path), counts in tracks.items()))
+        db.executemany('''
+            INSERT INTO weeklyArtists (week, artist, plays, listened) VALUES (?, ?, ?, ?)
+            ON CONFLICT(week, artist) DO UPDATE SET plays = plays + excluded.plays,
+                listened = listened + excluded.listened''',
+                       ((week, artist, *counts) for (week, artist), counts in artists.items()))
+
+
+class History:
+    def __init__(self, path: str = HISTORY_PATH):
+        self.path = path
+        self.db = connectHistory(path)
+
+    def close(self):
+        self.db.close()
+
+    def topTracks(self, since: int = 0, limit: int = 10):
+        return self.db.execute('''
+            SELECT path, SUM(plays) AS plays, SUM(skips) AS skips, SUM(listened) AS listened FROM weeklyTracks
+            WHERE week >= ? GROUP BY path HAVING SUM(plays) > 0 ORDER BY plays DESC, listened DESC LIMIT ?''',
+                               (since, limit)).fetchall()
+
+    def topArtists(self, since: int = 0, limit: int = 10):
+        return self.db.execute('''
+            SELECT artist, SUM(plays) AS plays, SUM(listened) AS listened FROM weeklyArtists
+            WHERE week >= ? GROUP BY artist HAVING SUM(plays) > 0 ORDER BY plays DESC, listened DESC LIMIT ?''',
+                               (since, limit)).fetchall()
+
+    def totals(self, since: int = 0):
+        row = self.db.execute('SELECT SUM(plays), SUM(listened) FROM weeklyTracks WHERE week >= ?',
+                              (since,)).fetchone()
+        return row[0] or 0, row[1] or 0
+
+
+class ListeningSession:
+    def __init__(self, path: str = '', artist: str = ''):
+        self.path = path
+        self.artist = artist
+        self.isStarted = False
+        self._listened = 0.0
+        self._resumeTime = None
+
+    def resume(self):
+        self.isStarted = True
+        if self._resumeTime is None:
+            self._resumeTime = time.monotonic()
+
+    def suspend(self):
+        if self._resumeTime is not None:
+            self._listened += time.monotonic() - self._resumeTime
+            self._resumeTime = None
+
+    def listened(self):
+        current = time.monotonic() - self._resumeTime if self._resumeTime is not None else 0.0
+        return round((self._listened + current) * 1000)
+
+
+class HistoryWriter(QThread):
+    batchWritten = Signal(int)
+
+    batchInterval = 2.0
+
+    def __init__(self, path: str = HISTORY_PATH, parent=None):
+        super().__init__(parent=parent)
+        self.path = path
+        self._queue = queue.SimpleQueue()
+
+    def record(self, type: str, path: str, artist: str = '', position: int = 0, listened: int = 0):
+        self._queue.put({'time': time.time(), 'type': type, 'path': path, 'artist': artist,
+                         'position': position, 'listened': listened})
+        if not self.isRunning():
+            self.start(QThread.LowPriority)
+
+    def stop(self):
+        self._queue.put(None)
+
+    def run(self):
+        db = connectHistory(self.path)
+        try:
+            isStopped = False
+            while not isStopped:
+                events = [self._queue.get()]
+                deadline = time.monotonic() + self.batchInterval
+                while events[-1] is not None and deadline > time.monotonic():
+                    try:
+                        events.append(self._queue.get(timeout=max(deadline - time.monotonic(), 0)))
+                    except queue.Empty:
+                        break
+                isStopped = events[-1] is None
+                events = [event for event in events if event is not None]
+                if events:
+                    writeEvents(db, events)
+                    self.batchWritten.emit(len(events))
+        finally:
+            db.close()
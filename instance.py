@@ -0,0 +1,49 @@
+import os
+import sys
+import json
+import socket
+import getpass
+import tempfile
+
+SERVER_NAME = f'MusePlayer-{getpass.getuser()}'
+SERVER_PATH = rf'\\.\pipe\{SERVER_NAME}' if sys.platform == 'win32' else \
+    os.path.join(tempfile.gettempdir(), SERVER_NAME)
+
+
+def fileArguments(argv):
+    return [os.path.abspath(arg).replace('\\', '/') for arg in argv if not arg.startswith('-')]
+
+
+def encodePaths(paths: list):
+    return json.dumps(paths).encode('utf-8') + b'\n'
+
+
+def decodePaths(line: bytes):
+    try:
+        paths = json.loads(line.decode('utf-8'))
+    except ValueError:
+        return []
+    return [path for path in paths if isinstance(path, str)] if isinstance(paths, list) else []
+
+
+def sendToServer(data: bytes, timeout: float = 0.2):
+    try:
+        if sys.platform == 'win32':
+            with open(SERVER_PATH, 'wb') as pipe:
+                pipe.write(data)
+        else:
+            with socket.socket(socket.AF_UNIX) as client:
+                client.settimeout(timeout)
+                client.connect(SERVER_PATH)
+                client.sendall(data)
+    except OSError:
+        return False
+    return True
+
+
+def handOff(paths: list):
+    return sendToServer(encodePaths(paths))
+
+
+def isServerRunning():
+    return sendToServer(b'')
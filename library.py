@@ -0,0 +1,454 @@
+import os
+import time
+import logging
+import sqlite3
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from PySide6.QtCore import QObject, QThread, QTimer, QFileSystemWatcher, Signal
+from config import LIBRARY_PATH
+from tags import isAudioFile, readTrackInfos
+from cue import isCueFile, cueFiles, splitVirtualPath
+from search import SearchIndex, trackKeywords
+
+TRACK_COLUMNS = ('path', 'mtime', 'size', 'duration', 'title', 'artist', 'album', 'coverHash', 'startTime', 'endTime',
+                 'keywords', 'trackGain', 'trackPeak', 'albumGain', 'albumPeak')
+GAIN_COLUMNS = ('trackGain', 'trackPeak', 'albumGain', 'albumPeak')
+ADDED_COLUMNS = (
+    ('startTime', 'REAL NOT NULL DEFAULT 0'),
+    ('endTime', 'REAL NOT NULL DEFAULT 0'),
+    ('keywords', "TEXT NOT NULL DEFAULT ''"),
+    ('trackGain', 'REAL'),
+    ('trackPeak', 'REAL'),
+    ('albumGain', 'REAL'),
+    ('albumPeak', 'REAL'),
+    ('playbackRate', 'REAL NOT NULL DEFAULT 1'),
+)
+
+logger = logging.getLogger(__name__)
+
+
+def walkAudioFiles(folder: str, recursive: bool = True):
+    stack = [folder]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if recursive:
+                                stack.append(entry.path)
+                        elif isAudioFile(entry.name) or isCueFile(entry.name):
+                            yield entry.path.replace('\\', '/'), entry.stat()
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+
+
+class Library:
+    def __init__(self, path: str = LIBRARY_PATH):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('PRAGMA synchronous=NORMAL')
+        self.__createTables()
+        self.lyricsDb = sqlite3.connect(path, check_same_thread=False)
+        self.lyricsLock = threading.Lock()
+
+    def __createTables(self):
+        with self.db:
+            self.db.execute('''
+                CREATE TABLE IF NOT EXISTS tracks (
+                    id INTEGER PRIMARY KEY,
+                    path TEXT NOT NULL UNIQUE,
+                    mtime REAL NOT NULL,
+                    size INTEGER NOT NULL,
+                    duration REAL NOT NULL DEFAULT 0,
+                    title TEXT NOT NULL DEFAULT '',
+                    artist TEXT NOT NULL DEFAULT '',
+                    album TEXT NOT NULL DEFAULT '',
+                    coverHash TEXT NOT NULL DEFAULT ''
+                )''')
+            columns = {row['name'] for row in self.db.execute('PRAGMA table_info(tracks)')}
+            for column, definition in ADDED_COLUMNS:
+                if column not in columns:
+                    self.db.execute(f'ALTER TABLE tracks ADD COLUMN {column} {definition}')
+            if 'keywords' not in columns:
+                rows = self.db.execute('SELECT id, path, title, artist, album FROM tracks').fetchall()
+                self.db.executemany('UPDATE tracks SET keywords = ? WHERE id = ?',
+                                    ((trackKeywords(row), row['id']) for row in rows))
+            self.db.execute('CREATE INDEX IF NOT EXISTS tracksOrder ON tracks (artist, album, title, path)')
+            self.db.execute('''
+                CREATE TABLE IF NOT EXISTS lyrics (
+                    path TEXT PRIMARY KEY,
+                    mtime REAL NOT NULL,
+                    lyricsMtime REAL NOT NULL,
+                    data TEXT NOT NULL
+                )''')
+            self.db.execute('''
+                CREATE TABLE IF NOT EXISTS fingerprints (
+                    path TEXT PRIMARY KEY,
+                    mtime REAL NOT NULL,
+                    data BLOB NOT NULL
+                )''')
+
+    def close(self):
+        self.db.close()
+        self.lyricsDb.close()
+
+    def count(self):
+        return self.db.execute('SELECT COUNT(*) FROM tracks').fetchone()[0]
+
+    def tracks(self):
+        return self.db.execute('SELECT * FROM tracks ORDER BY artist, album, title, path').fetchall()
+
+    def searchEntries(self):
+        db = sqlite3.connect(self.path)
+        try:
+            return db.execute('SELECT artist, album, title, path, keywords FROM tracks '
+                              'ORDER BY artist, album, title, path').fetchall()
+        finally:
+            db.close()
+
+    def tracksByPath(self, paths):
+        paths = list(paths)
+        rows = self.db.execute(f"SELECT * FROM tracks WHERE path IN ({', '.join('?' * len(paths))})", paths)
+        return {row['path']: row for row in rows}
+
+    def track(self, path: str):
+        return self.db.execute('SELECT * FROM tracks WHERE path = ?', (path,)).fetchone()
+
+    def snapshot(self, folder: str = None, recursive: bool = True):
+        if folder:
+            prefix = folder.replace('\\', '/').rstrip('/') + '/'
+            condition = '' if recursive else " AND instr(substr(path, ?), '/') = 0"
+            params = (len(prefix), prefix) if recursive else (len(prefix), prefix, len(prefix) + 1)
+            rows = self.db.execute(f'SELECT path, mtime, size FROM tracks WHERE substr(path, 1, ?) = ?{condition}',
+                                   params)
+        else:
+            rows = self.db.execute('SELECT path, mtime, size FROM tracks')
+        return {path: (mtime, size) for path, mtime, size in rows}
+
+    def outside(self, folder: str):
+        prefix = folder.replace('\\', '/').rstrip('/') + '/'
+        rows = self.db.execute('SELECT path FROM tracks WHERE substr(path, 1, ?) != ?', (len(prefix), prefix))
+        return [path for path, in rows]
+
+    def diff(self, folder: str, known: dict = None, recursive: bool = True):
+        known = self.snapshot(folder, recursive) if known is None else dict(known)
+        entries = list(walkAudioFiles(folder, recursive))
+        sheets = [(path, stat) for path, stat in entries if isCueFile(path)]
+        images = set().union(*(cueFiles(path) for path, _ in sheets))
+        tracks = {}
+        for path in known:
+            cuePath, number = splitVirtualPath(path)
+            if number is not None:
+                tracks.setdefault(cuePath, []).append(path)
+        changed = []
+        for path, stat in sheets:
+            states = [known.pop(track) for track in tracks.get(path, ())]
+            if not states or any(state != (stat.st_mtime, stat.st_size) for state in states):
+                changed.append((path, stat))
+                known.update((track, None) for track in tracks.get(path, ()))
+        for path, stat in entries:
+            if isCueFile(path) or path in images:
+                continue
+            if known.pop(path, None) != (stat.st_mtime, stat.st_size):
+                changed.append((path, stat))
+        return changed, list(known)
+
+    def update(self, infos):
+        columns = ', '.join(TRACK_COLUMNS)
+        values = ', '.join(f':{c}' for c in TRACK_COLUMNS)
+        updates = ', '.join(f'{c} = excluded.{c}' for c in TRACK_COLUMNS[1:])
+        with self.db:
+            self.db.executemany(
+                f'INSERT INTO tracks ({columns}) VALUES ({values}) ON CONFLICT(path) DO UPDATE SET {updates}', infos)
+
+    def setGains(self, results):
+        updates = ', '.join(f'{c} = :{c}' for c in GAIN_COLUMNS)
+        with self.db:
+            self.db.executemany(f'UPDATE tracks SET {updates} WHERE path = :path', results)
+
+    def setPlaybackRate(self, path: str, rate: float):
+        with self.db:
+            self.db.execute('UPDATE tracks SET playbackRate = ? WHERE path = ?', (rate, path))
+
+    def unanalyzedAlbums(self):
+        rows = self.db.execute('''
+            SELECT path, startTime, endTime, album, trackGain IS NULL FROM tracks
+            WHERE album IN (SELECT album FROM tracks WHERE trackGain IS NULL)
+            ORDER BY path''')
+        albums = {}
+        for path, start, end, album, isPending in rows:
+            folder = os.path.dirname(splitVirtualPath(path)[0])
+            key = (folder, album) if album else (path,)
+            albums.setdefault(key, [[], False])
+            albums[key][0].append((path, start, end))
+            albums[key][1] |= bool(isPending)
+        return [tracks for tracks, isPending in albums.values() if isPending]
+
+    def lyrics(self, path: str, stamp):
+        with self.lyricsLock:
+            row = self.lyricsDb.execute('SELECT data FROM lyrics WHERE path = ? AND mtime = ? AND lyricsMtime = ?',
+                                        (path, *stamp)).fetchone()
+        return row[0] if row else None
+
+    def setLyrics(self, path: str, stamp, data: str):
+        with self.lyricsLock, self.lyricsDb:
+            self.lyricsDb.execute('INSERT OR REPLACE INTO lyrics (path, mtime, lyricsMtime, data) VALUES (?, ?, ?, ?)',
+                                  (path, *stamp, data))
+
+    def fingerprints(self):
+        rows = self.db.execute('SELECT fingerprints.path, data FROM fingerprints JOIN tracks '
+                               'ON tracks.path = fingerprints.path AND tracks.mtime = fingerprints.mtime')
+        return {path: data for path, data in rows}
+
+    def setFingerprints(self, results):
+        with self.db:
+            self.db.executemany('INSERT OR REPLACE INTO fingerprints (path, mtime, data) VALUES (:path, :mtime, :data)',
+                                results)
+
+    def remove(self, paths):
+        paths = list(paths)
+        with self.db:
+            self.db.executemany('DELETE FROM tracks WHERE path = ?', ((p,) for p in paths))
+            self.db.executemany('DELETE FROM lyrics WHERE path = ?', ((p,) for p in paths))
+            self.db.executemany('DELETE FROM fingerprints WHERE path = ?', ((p,) for p in paths))
+
+    def scan(self, folder: str):
+        changed, removed = self.diff(folder)
+        self.remove(removed)
+        self.update(readTrackInfos(changed))
+        return len(changed), len(removed)
+
+
+class LibraryScanner(QThread):
+    progressChanged = Signal(int, int)
+    tracksFound = Signal(list)
+    tracksRemoved = Signal(list)
+    foldersDeferred = Signal(list)
+    canceled = Signal()
+
+    chunkSize = 32
+    batchSize = 256
+    batchInterval = 0.2
+    poolThreshold = 128
+    settleTime = 2.0
+
+    def __init__(self, library: Library, parent=None):
+        super().__init__(parent=parent)
+        self.library = library
+        self._jobs = []
+        self._pending = []
+        self._root = None
+        self._outside = []
+        self._isCanceled = False
+        self.failedChunks = 0
+        self.tracksFound.connect(self._onTracksFound)
+        self.tracksRemoved.connect(self._onTracksRemoved)
+        self.finished.connect(self._startPending)
+
+    def scan(self, folder: str):
+        self._root = folder or None
+        return self.scanFolders([(folder, True)])
+
+    def scanFolders(self, folders, isLive: bool = False):
+        folders = [(folder, recursive, isLive) for folder, recursive in folders if folder]
+        if not folders:
+            return False
+        self._pending.extend(folders)
+        self._startPending()
+        return True
+
+    def cancel(self):
+        self._pending.clear()
+        self._isCanceled = True
+
+    def isCanceled(self):
+        return self._isCanceled
+
+    def run(self):
+        changed, removed, deferred = {}, set(self._outside), set()
+        cutoff = time.time() - self.settleTime
+        for folder, recursive, isLive, known in self._jobs:
+            entries, paths = self.library.diff(folder, known, recursive)
+            removed.update(paths)
+            for path, stat in entries:
+                if isLive and stat.st_mtime > cutoff:
+                    deferred.add(os.path.dirname(path))
+                else:
+                    changed[path] = stat
+        changed, removed = list(changed.items()), list(removed)
+        if deferred:
+            self.foldersDeferred.emit(sorted(deferred))
+        if removed:
+            self.tracksRemoved.emit(removed)
+        total = len(changed)
+        self.failedChunks = 0
+        self.progressChanged.emit(0, total)
+        chunks = [changed[i:i + self.chunkSize] for i in range(0, total, self.chunkSize)]
+        if total < self.poolThreshold:
+            self._collect((self._readChunk(len(chunk), lambda chunk=chunk: readTrackInfos(chunk)) for chunk in chunks),
+                          total)
+        elif not self._isCanceled:
+            context = multiprocessing.get_context('spawn')
+            with ProcessPoolExecutor(os.cpu_count() or 1, mp_context=context) as executor:
+                futures = {executor.submit(readTrackInfos, chunk): len(chunk) for chunk in chunks}
+                self._collect((self._readChunk(futures[f], f.result) for f in as_completed(futures)), total)
+                if self._isCanceled:
+                    executor.shutdown(wait=False, cancel_futures=True)
+        if self._isCanceled:
+            self.canceled.emit()
+
+    def _startPending(self):
+        if self.isRunning() or not self._pending:
+            return
+        jobs = {}
+        for folder, recursive, isLive in self._pending:
+            if folder in jobs:
+                recursive, isLive = recursive or jobs[folder][0], isLive and jobs[folder][1]
+            jobs[folder] = recursive, isLive
+        self._jobs = [(folder, recursive, isLive, self.library.snapshot(folder, recursive))
+                      for folder, (recursive, isLive) in jobs.items()]
+        self._outside = self.library.outside(self._root) if self._root else []
+        self._pending = []
+        self._root = None
+        self._isCanceled = False
+        self.start(QThread.LowPriority)
+
+    def _readChunk(self, count: int, read):
+        try:
+            return count, read()
+        except Exception:
+            self.failedChunks += 1
+            logger.warning('Skipping %d files after a scan chunk failed', count, exc_info=True)
+            return count, []
+
+    def _collect(self, results, total: int):
+        batch, done, lastEmit = [], 0, time.monotonic()
+        for count, infos in results:
+            if self._isCanceled:
+                break
+            batch.extend(infos)
+            done += count
+            now = time.monotonic()
+            if len(batch) >= self.batchSize or now - lastEmit >= self.batchInterval:
+                self.tracksFound.emit(batch)
+                self.progressChanged.emit(done, total)
+                batch, lastEmit = [], now
+        if batch:
+            self.tracksFound.emit(batch)
+        self.progressChanged.emit(done, total)
+
+    def _onTracksFound(self, infos: list):
+        self.library.update(infos)
+
+    def _onTracksRemoved(self, paths: list):
+        self.library.remove(paths)
+
+
+class SearchIndexLoader(QThread):
+    indexLoaded = Signal(object)
+
+    def __init__(self, library: Library, parent=None):
+        super().__init__(parent=parent)
+        self.library = library
+
+    def load(self):
+        if not self.isRunning():
+            self.start(QThread.LowPriority)
+
+    def run(self):
+        index = SearchIndex()
+        index.load(self.library.searchEntries())
+        self.indexLoaded.emit(index)
+
+
+class LibraryWatcher(QObject):
+    def __init__(self, scanner: LibraryScanner, interval: int = 1000, maxDelay: float = 5.0, parent=None):
+        super().__init__(parent=parent)
+        self.scanner = scanner
+        self.folder = ''
+        self.maxDelay = maxDelay
+        self.dirty = set()
+        self.firstChange = 0.0
+        self.watcher = QFileSystemWatcher(self)
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(interval)
+        self.timer.timeout.connect(self.flush)
+        self.watcher.directoryChanged.connect(self.__onDirectoryChanged)
+        self.scanner.foldersDeferred.connect(self.__onFoldersDeferred)
+
+    def setFolder(self, folder: str):
+        folders = self.watcher.directories()
+        if folders:
+            self.watcher.removePaths(folders)
+        self.dirty.clear()
+        self.timer.stop()
+        self.folder = folder.replace('\\', '/').rstrip('/') if folder else ''
+        if self.folder and os.path.isdir(self.folder):
+            self.watch(self.folder)
+
+    def watch(self, folder: str):
+        folders, stack = [], [folder]
+        while stack:
+            folder = stack.pop()
+            folders.append(folder)
+            try:
+                with os.scandir(folder) as entries:
+                    stack.extend(entry.path.replace('\\', '/') for entry in entries
+                                 if entry.is_dir(follow_symlinks=False))
+            except OSError:
+                continue
+        self.watcher.addPaths(folders)
+        return folders
+
+    def flush(self):
+        self.timer.stop()
+        dirty, self.dirty = self.dirty, set()
+        watched = self.watcher.directories()
+        watchedSet, children = set(watched), {}
+        for path in watched:
+            children.setdefault(os.path.dirname(path), []).append(path)
+        folders, stale = [], []
+        for folder in sorted(dirty):
+            if not os.path.isdir(folder):
+                stale.append(folder)
+                continue
+            folders.append((folder, False))
+            stale.extend(path for path in children.get(folder, ()) if not os.path.isdir(path))
+            try:
+                with os.scandir(folder) as entries:
+                    added = [path for path in (entry.path.replace('\\', '/') for entry in entries
+                                               if entry.is_dir(follow_symlinks=False)) if path not in watchedSet]
+            except OSError:
+                continue
+            for path in added:
+                watchedSet.update(self.watch(path))
+                folders.append((path, True))
+        if stale:
+            prefixes = tuple(path + '/' for path in stale)
+            self.watcher.removePaths([path for path in watched if (path + '/').startswith(prefixes)])
+            folders.extend((path, True) for path in stale)
+        self.scanner.scanFolders(folders, isLive=True)
+
+    def __markDirty(self, folders):
+        if not self.dirty:
+            self.firstChange = time.monotonic()
+        self.dirty.update(folder.replace('\\', '/').rstrip('/') for folder in folders)
+        if time.monotonic() - self.firstChange >= self.maxDelay:
+            self.flush()
+        else:
+            self.timer.start()
+
+    def __onDirectoryChanged(self, folder: str):
+        if self.folder and (folder + '/').startswith(self.folder + '/'):
+            self.__markDirty([folder])
+
+    def __onFoldersDeferred(self, folders: list):
+        self.__markDirty(folders)
@@ -0,0 +1,247 @@
+import os
+import math
+import time
+import logging
+import multiprocessing
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from PySide6.QtCore import QCoreApplication, QThread, Signal
+from audio import decodePcm
+from dsp import FirFilter
+from cue import cueTrack
+
+REFERENCE_LOUDNESS = -18.0
+ABSOLUTE_GATE = -70.0
+RELATIVE_GATE = -10.0
+SEGMENT_DURATION = 0.1
+BLOCK_SEGMENTS = 4
+CHUNK_FRAMES = 1 << 16
+
+_application = None
+
+logger = logging.getLogger(__name__)
+
+
+def biquad(b, a, x):
+    y, x1, x2, y1, y2 = [], 0.0, 0.0, 0.0, 0.0
+    for x0 in x:
+        y0 = b[0] * x0 + b[1] * x1 + b[2] * x2 - a[1] * y1 - a[2] * y2
+        x1, x2, y1, y2 = x0, x1, y0, y1
+        y.append(y0)
+    return y
+
+
+@lru_cache(maxsize=None)
+def kWeightingFir(sampleRate: int, duration: float = 0.1):
+    k = math.tan(math.pi * 1681.974450955533 / sampleRate)
+    vh = 10 ** (3.999843853973347 / 20)
+    vb = vh ** 0.4996667741545416
+    q = 0.7071752369554196
+    a0 = 1 + k / q + k * k
+    shelf = ([(vh + vb * k / q + k * k) / a0, 2 * (k * k - vh) / a0, (vh - vb * k / q + k * k) / a0],
+             [1.0, 2 * (k * k - 1) / a0, (1 - k / q + k * k) / a0])
+    k = math.tan(math.pi * 38.13547087602444 / sampleRate)
+    q = 0.5003270373238773
+    a0 = 1 + k / q + k * k
+    highPass = ([1.0, -2.0, 1.0], [1.0, 2 * (k * k - 1) / a0, (1 - k / q + k * k) / a0])
+    impulse = [1.0] + [0.0] * (int(sampleRate * duration) - 1)
+    return np.array(biquad(*highPass, biquad(*shelf, impulse)))
+
+
+def oversamplingKernel(factor: int, taps: int = 12):
+    n = np.arange(factor * taps) - (factor * taps - 1) / 2
+    h = np.sinc(n / factor) * np.kaiser(factor * taps, 8.0)
+    return (h.reshape(taps, factor) * factor / h.sum())[::-1].copy()
+
+
+def channelWeights(channels: int):
+    if channels == 6:
+        return np.array([1.0, 1.0, 1.0, 0.0, 1.41, 1.41])
+    return np.ones(channels)
+
+
+def integratedLoudness(blocks):
+    if len(blocks) == 0:
+        return None
+    loudness = -0.691 + 10 * np.log10(np.maximum(blocks, 1e-20))
+    blocks = blocks[loudness > ABSOLUTE_GATE]
+    if len(blocks) == 0:
+        return None
+    threshold = -0.691 + 10 * math.log10(blocks.mean()) + RELATIVE_GATE
+    blocks = blocks[-0.691 + 10 * np.log10(blocks) > threshold]
+    return -0.691 + 10 * math.log10(blocks.mean())
+
+
+class LoudnessMeter:
+    def __init__(self, sampleRate: int, channels: int):
+        self.segmentFrames = round(sampleRate * SEGMENT_DURATION)
+        self.weights = channelWeights(channels)
+        self.filter = FirFilter(kWeightingFir(sampleRate), channels)
+        self.kernel = oversamplingKernel(4 if sampleRate < 88200 else 2)
+        self.bound = np.abs(self.kernel).sum(axis=0).max()
+        self.history = np.zeros((len(self.kernel) - 1, channels))
+        self.remainder = np.zeros(0)
+        self.segments = []
+        self.peak = 0.0
+
+    def feed(self, frames):
+        if not len(frames):
+            return
+        power = np.square(self.filter.process(frames)) @ self.weights
+        power = np.concatenate((self.remainder, power))
+        count = len(power) // self.segmentFrames * self.segmentFrames
+        self.segments.append(power[:count].reshape(-1, self.segmentFrames).mean(axis=1))
+        self.remainder = power[count:]
+        samples = np.concatenate((self.history, frames))
+        self.__updatePeak(samples)
+        self.history = samples[len(samples) - len(self.history):]
+
+    def __updatePeak(self, samples):
+        taps = len(self.kernel)
+        windows = sliding_window_view(samples, taps, axis=0)
+        magnitudes = np.abs(samples).max(axis=1)
+        loudest = min(max(int(magnitudes.argmax()) - taps // 2, 0), len(windows) - 1)
+        self.peak = max(self.peak, float(np.abs(windows[loudest] @ self.kernel).max()))
+        counts = np.concatenate(([0], np.cumsum(magnitudes * self.bound > self.peak)))
+        candidates = np.flatnonzero(counts[taps:] > counts[:-taps])
+        if len(candidates):
+            self.peak = max(self.peak, float(np.abs(windows[candidates] @ self.kernel).max()))
+
+    def blocks(self):
+        segments = np.concatenate(self.segments) if self.segments else np.zeros(0)
+        if len(segments) < BLOCK_SEGMENTS:
+            return np.zeros(0)
+        return np.convolve(segments, np.ones(BLOCK_SEGMENTS) / BLOCK_SEGMENTS, 'valid')
+
+
+def measureFile(file: str, clips):
+    meters, frames, position, pending = [None] * len(clips), [], 0, 0
+    for chunk, sampleRate in decodePcm(file):
+        frames.append(chunk)
+        pending += len(chunk)
+        if pending < CHUNK_FRAMES:
+            continue
+        position = feedClips(meters, clips, np.concatenate(frames), position, sampleRate)
+        frames, pending = [], 0
+    if frames:
+        feedClips(meters, clips, np.concatenate(frames), position, sampleRate)
+    return meters
+
+
+def feedClips(meters, clips, frames, position: int, sampleRate: int):
+    frames = frames.astype(np.float64)
+    for i, (start, end) in enumerate(clips):
+        first = max(round(start * sampleRate) - position, 0)
+        last = min(round(end * sampleRate) - position, len(frames)) if end > start else len(frames)
+        if first < last:
+            meters[i] = meters[i] or LoudnessMeter(sampleRate, frames.shape[1])
+            meters[i].feed(frames[first:last])
+    return position + len(frames)
+
+
+def analyzeAlbum(tracks):
+    global _application
+    _application = QCoreApplication.instance() or QCoreApplication([])
+    files = {}
+    for path, start, end in tracks:
+        track = cueTrack(path)
+        file = track['file'] if track else path
+        files.setdefault(file, []).append((path, (float(start), float(end))))
+    results, albumBlocks, albumPeak = [], [], 0.0
+    for file, items in files.items():
+        try:
+            meters = measureFile(file, [clip for _, clip in items])
+        except Exception:
+            meters = [None] * len(items)
+        for (path, _), meter in zip(items, meters):
+            if meter is None:
+                continue
+            blocks = meter.blocks()
+            loudness = integratedLoudness(blocks)
+            albumBlocks.append(blocks)
+            albumPeak = max(albumPeak, meter.peak)
+            results.append({'path': path, 'trackGain': REFERENCE_LOUDNESS - loudness if loudness is not None else 0.0,
+                            'trackPeak': meter.peak})
+    loudness = integratedLoudness(np.concatenate(albumBlocks)) if albumBlocks else None
+    for result in results:
+        result['albumGain'] = REFERENCE_LOUDNESS - loudness if loudness is not None else result['trackGain']
+        result['albumPeak'] = albumPeak
+    return results
+
+
+def replayGain(track, mode: str):
+    if track is None or mode == 'Off':
+        return 0.0
+    gain, peak = track['trackGain'], track['trackPeak']
+    if mode == 'Album' and track['albumGain'] is not None:
+        gain, peak = track['albumGain'], track['albumPeak']
+    if gain is None:
+        return 0.0
+    if peak:
+        gain = min(gain, -20 * math.log10(peak))
+    return gain
+
+
+class LoudnessAnalyzer(QThread):
+    progressChanged = Signal(int, int)
+    gainsFound = Signal(list)
+    canceled = Signal()
+
+    batchInterval = 0.5
+
+    def __init__(self, library, parent=None):
+        super().__init__(parent=parent)
+        self.library = library
+        self._albums = []
+        self._isCanceled = False
+        self.gainsFound.connect(self._onGainsFound)
+
+    def analyze(self):
+        if self.isRunning():
+            return False
+        self._albums = self.library.unanalyzedAlbums()
+        self._isCanceled = False
+        self.start(QThread.LowPriority)
+        return True
+
+    def cancel(self):
+        self._isCanceled = True
+
+    def isCanceled(self):
+        return self._isCanceled
+
+    def run(self):
+        total = sum(len(album) for album in self._albums)
+        self.progressChanged.emit(0, total)
+        if not total:
+            return
+        batch, done, lastEmit = [], 0, time.monotonic()
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(os.cpu_count() or 1, mp_context=context) as executor:
+            futures = {executor.submit(analyzeAlbum, album): len(album) for album in self._albums}
+            for future in as_completed(futures):
+                if self._isCanceled:
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    break
+                try:
+                    results = future.result()
+                except Exception:
+                    logger.warning('Skipping %d tracks after an album analysis failed', futures[future], exc_info=True)
+                    results = []
+                batch.extend(results)
+                done += futures[future]
+                now = time.monotonic()
+                if now - lastEmit >= self.batchInterval:
+                    self.gainsFound.emit(batch)
+                    self.progressChanged.emit(done, total)
+                    batch, lastEmit = [], now
+        if batch:
+            self.gainsFound.emit(batch)
+        self.progressChanged.emit(done, total)
+        if self._isCanceled:
+            self.canceled.emit()
+
+    def _onGainsFound(self, results: list):
+        self.library.setGains(results)
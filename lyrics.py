@@ -0,0 +1,166 @@
+import os
+import re
+import json
+from bisect import bisect_right
+from PySide6.QtCore import Qt, QRectF
+from PySide6.QtGui import QPainter, QColor, QFont
+from PySide6.QtWidgets import QWidget
+from qfluentwidgets import isDarkTheme, themeColor
+from tags import firstTag
+from cue import readText
+
+LYRICS_EXTENSIONS = ('.lrc', '.LRC')
+LYRICS_KEYS = ('LYRICS', 'lyrics', 'UNSYNCEDLYRICS', 'unsyncedlyrics', '©lyr', 'Lyrics', 'WM/Lyrics')
+SYLT_MILLISECONDS = 2
+
+TIME_PATTERN = re.compile(r'\s*\[(\d+):(\d+)(?:[.:](\d+))?\]')
+WORD_TIME_PATTERN = re.compile(r'<\d+:\d+(?:[.:]\d+)?>')
+OFFSET_PATTERN = re.compile(r'^\s*\[offset:\s*([+-]?\d+)\s*\]', re.IGNORECASE | re.MULTILINE)
+
+
+def parseLrc(text: str):
+    offset = OFFSET_PATTERN.search(text)
+    offset = int(offset.group(1)) if offset else 0
+    lines = []
+    for line in text.splitlines():
+        times, position = [], 0
+        while match := TIME_PATTERN.match(line, position):
+            minutes, seconds, fraction = match.groups()
+            fraction = int(fraction.ljust(3, '0')[:3]) if fraction else 0
+            times.append(int(minutes) * 60000 + int(seconds) * 1000 + fraction)
+            position = match.end()
+        text = WORD_TIME_PATTERN.sub('', line[position:]).strip()
+        lines.extend((max(time - offset, 0), text) for time in times)
+    lines.sort(key=lambda line: line[0])
+    return lines
+
+
+class Lyrics:
+    def __init__(self, lines=(), isSynced: bool = True):
+        self.times = [time for time, _ in lines]
+        self.lines = [text for _, text in lines]
+        self.isSynced = isSynced
+
+    def __len__(self):
+        return len(self.lines)
+
+    @classmethod
+    def fromText(cls, text: str):
+        lines = parseLrc(text)
+        if lines:
+            return cls(lines)
+        return cls([(0, line.strip()) for line in text.strip().splitlines()], False)
+
+    @classmethod
+    def fromJson(cls, data: str):
+        data = json.loads(data)
+        return cls(data['lines'], data['synced'])
+
+    def toJson(self):
+        return json.dumps({'synced': self.isSynced, 'lines': list(zip(self.times, self.lines))}, ensure_ascii=False)
+
+    def index(self, position: int):
+        return bisect_right(self.times, position) - 1 if self.isSynced else -1
+
+    def clip(self, start: int, end: int):
+        if not self.isSynced or not (start or end):
+            return self
+        first = max(self.index(start), 0)
+        last = bisect_right(self.times, end - 1) if end else len(self.times)
+        return Lyrics([(max(time - start, 0), text) for time, text in
+                       zip(self.times[first:last], self.lines[first:last])])
+
+
+def sidecarPath(path: str):
+    base = os.path.splitext(path)[0]
+    for extension in LYRICS_EXTENSIONS:
+        if os.path.exists(base + extension):
+            return base + extension
+    return None
+
+
+def lyricsStamp(path: str):
+    sidecar = sidecarPath(path)
+    try:
+        return os.path.getmtime(path), os.path.getmtime(sidecar) if sidecar else 0.0
+    except OSError:
+        return 0.0, 0.0
+
+
+def readEmbeddedLyrics(audio):
+    tags = audio.tags if audio is not None else None
+    if not tags:
+        return None
+    for key in tags.keys():
+        frame = tags[key]
+        if key.startswith('SYLT') and frame.format == SYLT_MILLISECONDS and frame.text:
+            return Lyrics(sorted(((time, text.strip()) for text, time in frame.text), key=lambda line: line[0]))
+    for key in tags.keys():
+        if key.startswith('USLT') and tags[key].text.strip():
+            return Lyrics.fromText(tags[key].text)
+    text = firstTag(audio, LYRICS_KEYS)
+    return Lyrics.fromText(text) if text else None
+
+
+def loadLyrics(path: str, audio=None):
+    sidecar = sidecarPath(path)
+    if sidecar:
+        try:
+            return Lyrics.fromText(readText(sidecar))
+        except OSError:
+            pass
+    return readEmbeddedLyrics(audio) or Lyrics()
+
+
+class LyricsView(QWidget):
+    def __init__(self, parent=None):
+        super().__init__(parent=parent)
+        self.lyrics = None
+        self.current = -1
+        self.position = 0
+        self.lineFont = QFont(self.font())
+        self.lineFont.setPixelSize(15)
+        self.currentFont = QFont(self.lineFont)
+        self.currentFont.setPixelSize(18)
+        self.currentFont.setBold(True)
+        self.lineHeight = 36
+
+    def setLyrics(self, lyrics: Lyrics = None):
+        self.lyrics = lyrics
+        self.current = lyrics.index(self.position) if lyrics else -1
+        self.update()
+
+    def setPosition(self, position: int):
+        self.position = position
+        if not self.lyrics:
+            return
+        index = self.lyrics.index(position)
+        if index != self.current:
+            self.current = index
+            self.update()
+
+    def paintEvent(self, e):
+        if self.lyrics is None:
+            return
+        painter = QPainter(self)
+        painter.setRenderHints(QPainter.Antialiasing | QPainter.TextAntialiasing)
+        color = QColor(255, 255, 255) if isDarkTheme() else QColor(0, 0, 0)
+        if not self.lyrics:
+            color.setAlpha(110)
+            painter.setPen(color)
+            painter.setFont(self.lineFont)
+            painter.drawText(self.rect(), Qt.AlignCenter, '暂无歌词')
+            return
+        top = (self.height() - self.lineHeight) / 2 - max(self.current, 0) * self.lineHeight
+        if not self.lyrics.isSynced:
+            top = 0
+        first = max(int(-top // self.lineHeight), 0)
+        last = min(int((self.height() - top) // self.lineHeight) + 1, len(self.lyrics))
+        color.setAlpha(140)
+        for i in range(first, last):
+            isCurrent = i == self.current
+            painter.setFont(self.currentFont if isCurrent else self.lineFont)
+            painter.setPen(themeColor() if isCurrent else color)
+            text = painter.fontMetrics().elidedText(self.lyrics.lines[i], Qt.ElideRight, self.width() - 24)
+            painter.drawText(QRectF(12, top + i * self.lineHeight, self.width() - 24, self.lineHeight),
+                             Qt.AlignCenter, text)
@@ -0,0 +1,173 @@
+import os
+import json
+import random
+from enum import Enum
+from PySide6.QtCore import QObject, Signal, QTimer
+from config import PLAYLIST_PATH
+
+
+class RepeatMode(Enum):
+    NONE = 0
+    ONE = 1
+    ALL = 2
+
+
+class Playlist(QObject):
+    currentChanged = Signal(str)
+    tracksChanged = Signal()
+    modeChanged = Signal()
+
+    def __init__(self, path: str = PLAYLIST_PATH, parent=None):
+        super().__init__(parent=parent)
+        self.path = path
+        self.tracks = []
+        self.order = []
+        self.positions = []
+        self.position = -1
+        self.isShuffled = False
+        self.repeatMode = RepeatMode.NONE
+        self.saveTimer = QTimer(self)
+        self.saveTimer.setSingleShot(True)
+        self.saveTimer.setInterval(1000)
+        self.saveTimer.timeout.connect(self.save)
+        self.load()
+
+    def __len__(self):
+        return len(self.tracks)
+
+    def current(self):
+        if 0 <= self.position < len(self.order):
+            return self.tracks[self.order[self.position]]
+        return None
+
+    def currentIndex(self):
+        return self.order[self.position] if 0 <= self.position < len(self.order) else -1
+
+    def setTracks(self, paths, index: int = 0):
+        self.tracks = list(paths)
+        self.__reorder(index)
+        self.tracksChanged.emit()
+        self.setCurrentIndex(index)
+
+    def enqueue(self, paths):
+        start = len(self.tracks)
+        self.tracks.extend(paths)
+        self.order.extend(range(start, len(self.tracks)))
+        self.positions.extend(range(start, len(self.tracks)))
+        self.tracksChanged.emit()
+        self.__scheduleSave()
+        if self.position < 0 and self.tracks:
+            self.setCurrentIndex(start)
+
+    def clear(self):
+        self.tracks, self.order, self.positions = [], [], []
+        self.position = -1
+        self.tracksChanged.emit()
+        self.__scheduleSave()
+
+    def setCurrentIndex(self, index: int):
+        if not 0 <= index < len(self.tracks):
+            return None
+        self.position = self.positions[index]
+        self.__scheduleSave()
+        self.currentChanged.emit(self.current())
+        return self.current()
+
+    def peekNext(self, auto: bool = True):
+        position = self.__nextPosition(auto)
+        return self.tracks[self.order[position]] if position is not None else None
+
+    def next(self, auto: bool = False):
+        position = self.__nextPosition(auto)
+        if position is None:
+            return None
+        self.position = position
+        self.__scheduleSave()
+        self.currentChanged.emit(self.current())
+        return self.current()
+
+    def previous(self):
+        if not self.order:
+            return None
+        if self.position > 0:
+            self.position -= 1
+        elif self.repeatMode == RepeatMode.ALL:
+            self.position = len(self.order) - 1
+        self.__scheduleSave()
+        self.currentChanged.emit(self.current())
+        return self.current()
+
+    def setShuffled(self, isShuffled: bool):
+        if isShuffled == self.isShuffled:
+            return
+        self.isShuffled = isShuffled
+        self.__reorder(self.currentIndex())
+        self.modeChanged.emit()
+        self.__scheduleSave()
+
+    def setRepeatMode(self, mode: RepeatMode):
+        if mode == self.repeatMode:
+            return
+        self.repeatMode = mode
+        self.modeChanged.emit()
+        self.__scheduleSave()
+
+    def load(self):
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                state = json.load(f)
+            self.tracks = state['tracks']
+            self.order = state.get('order') or list(range(len(self.tracks)))
+            self.isShuffled = state.get('shuffle', False)
+            self.repeatMode = RepeatMode(state.get('repeat', RepeatMode.NONE.value))
+            self.position = min(state.get('position', -1), len(self.order) - 1)
+        except (OSError, ValueError, KeyError, TypeError):
+            self.tracks, self.order, self.position = [], [], -1
+        if sorted(self.order) != list(range(len(self.tracks))):
+            self.order = list(range(len(self.tracks)))
+        self.__indexPositions()
+
+    def save(self):
+        self.saveTimer.stop()
+        state = {
+            'tracks': self.tracks,
+            'order': self.order if self.isShuffled else None,
+            'position': self.position,
+            'shuffle': self.isShuffled,
+            'repeat': self.repeatMode.value,
+        }
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        temp = self.path + '.tmp'
+        with open(temp, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(temp, self.path)
+
+    def __nextPosition(self, auto: bool):
+        if not self.order:
+            return None
+        if auto and self.repeatMode == RepeatMode.ONE:
+            return self.position
+        if self.position + 1 < len(self.order):
+            return self.position + 1
+        if self.repeatMode == RepeatMode.ALL:
+            return 0
+        return None
+
+    def __reorder(self, index: int):
+        self.order = list(range(len(self.tracks)))
+        if self.isShuffled:
+            random.shuffle(self.order)
+            if 0 <= index < len(self.tracks):
+                i = self.order.index(index)
+                self.order[0], self.order[i] = self.order[i], self.order[0]
+        self.__indexPositions()
+        if 0 <= index < len(self.tracks):
+            self.position = self.positions[index]
+
+    def __indexPositions(self):
+        self.positions = [0] * len(self.order)
+        for position, index in enumerate(self.order):
+            self.positions[index] = position
+
+    def __scheduleSave(self):
+        self.saveTimer.start()
@@ -0,0 +1,181 @@
+import os
+import sys
+import json
+import time
+import threading
+from collections import deque
+from functools import wraps
+from PySide6.QtCore import Qt, QObject, QTimer, QEvent, Signal
+from PySide6.QtWidgets import QLabel
+
+
+class StartupProfiler:
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.last = self.start
+        self.phases = []
+        self.isEnabled = '--profile-startup' in sys.argv
+
+    def mark(self, phase: str):
+        now = time.perf_counter()
+        self.phases.append((phase, now - self.last))
+        self.last = now
+
+    def total(self):
+        return self.last - self.start
+
+    def report(self, file=None):
+        file = file or sys.stderr
+        width = max([len(phase) for phase, _ in self.phases] + [5])
+        for phase, elapsed in self.phases:
+            print(f'{phase:<{width}}  {elapsed * 1000:8.1f} ms', file=file)
+        print(f'{"total":<{width}}  {self.total() * 1000:8.1f} ms', file=file)
+
+
+class Tracer:
+    def __init__(self, limit: int = 500000):
+        self.start = time.perf_counter()
+        self.path = ''
+        for arg in sys.argv:
+            if arg == '--trace' or arg.startswith('--trace='):
+                self.path = arg.partition('=')[2] or 'trace.json'
+        self.isEnabled = bool(self.path)
+        self.events = deque(maxlen=limit)
+        self.threads = {}
+        self.stats = {}
+
+    def timed(self, func):
+        if not self.isEnabled:
+            return func
+        name = func.__qualname__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.complete(name, start, time.perf_counter())
+
+        return wrapper
+
+    def complete(self, name: str, start: float, end: float, category: str = 'slot'):
+        self.events.append({'name': name, 'cat': category, 'ph': 'X', 'ts': self.__micros(start),
+                            'dur': (end - start) * 1000000, 'pid': os.getpid(), 'tid': self.__thread()})
+        stat = self.stats.setdefault(name, [0, 0.0, 0.0])
+        stat[0] += 1
+        stat[1] += end - start
+        stat[2] = max(stat[2], end - start)
+
+    def counter(self, name: str, value: float):
+        self.events.append({'name': name, 'ph': 'C', 'ts': self.__micros(time.perf_counter()), 'pid': os.getpid(),
+                            'args': {name: value}})
+
+    def takeStats(self):
+        stats, self.stats = self.stats, {}
+        return stats
+
+    def save(self, path: str = None):
+        threads = [{'name': 'thread_name', 'ph': 'M', 'pid': os.getpid(), 'tid': tid, 'args': {'name': name}}
+                   for tid, name in self.threads.items()]
+        with open(path or self.path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': threads + list(self.events), 'displayTimeUnit': 'ms'}, f)
+
+    def __micros(self, moment: float):
+        return (moment - self.start) * 1000000
+
+    def __thread(self):
+        tid = threading.get_ident()
+        if tid not in self.threads:
+            self.threads[tid] = threading.current_thread().name
+        return tid
+
+
+class LagMonitor(QObject):
+    lagMeasured = Signal(float)
+
+    def __init__(self, tracer: Tracer, interval: int = 50, parent=None):
+        super().__init__(parent=parent)
+        self.tracer = tracer
+        self.interval = interval
+        self.lag = 0.0
+        self.maxLag = 0.0
+        self.last = time.perf_counter()
+        self.timer = QTimer(self)
+        self.timer.setTimerType(Qt.PreciseTimer)
+        self.timer.setInterval(interval)
+        self.timer.timeout.connect(self.__onTimeout)
+
+    def start(self):
+        self.last = time.perf_counter()
+        self.timer.start()
+
+    def stop(self):
+        self.timer.stop()
+
+    def takeMaxLag(self):
+        maxLag, self.maxLag = self.maxLag, 0.0
+        return maxLag
+
+    def __onTimeout(self):
+        now = time.perf_counter()
+        self.lag = max((now - self.last) * 1000 - self.interval, 0.0)
+        self.last = now
+        self.maxLag = max(self.maxLag, self.lag)
+        self.tracer.counter('event loop lag (ms)', self.lag)
+        if self.lag > self.interval:
+            self.tracer.complete('event loop stall', now - self.lag / 1000, now, 'lag')
+        self.lagMeasured.emit(self.lag)
+
+
+class TraceOverlay(QLabel):
+    def __init__(self, tracer: Tracer, monitor: LagMonitor, parent=None, interval: int = 500, rows: int = 6,
+                 window: int = 10):
+        super().__init__(parent=parent)
+        self.tracer = tracer
+        self.monitor = monitor
+        self.rows = rows
+        self.history = deque(maxlen=window)
+        self.timer = QTimer(self)
+        self.timer.setInterval(interval)
+        self.timer.timeout.connect(self.refresh)
+        self.setAttribute(Qt.WA_TransparentForMouseEvents)
+        self.setTextFormat(Qt.PlainText)
+        self.setStyleSheet('QLabel { background: rgba(0, 0, 0, 160); color: white; padding: 6px; '
+                           'font: 11px "Consolas", "Cascadia Mono", monospace; }')
+        parent.installEventFilter(self)
+        self.refresh()
+        self.show()
+        self.timer.start()
+
+    def refresh(self):
+        self.history.append((self.monitor.takeMaxLag(), self.tracer.takeStats()))
+        merged = {}
+        for _, stats in self.history:
+            for name, (count, total, longest) in stats.items():
+                stat = merged.setdefault(name, [0, 0.0, 0.0])
+                stat[0] += count
+                stat[1] += total
+                stat[2] = max(stat[2], longest)
+        maxLag = max(lag for lag, _ in self.history)
+        seconds = len(self.history) * self.timer.interval() / 1000
+        lines = [f'事件循环延迟 {self.monitor.lag:6.1f} ms  近 {seconds:.0f} 秒最大 {maxLag:6.1f} ms']
+        for name, (count, total, longest) in sorted(merged.items(), key=lambda item: -item[1][1])[:self.rows]:
+            name = name if len(name) <= 40 else '…' + name[-39:]
+            lines.append(f'{name:<40} {count:5}次  共 {total * 1000:7.1f} ms  最长 {longest * 1000:6.1f} ms')
+        self.setText('\n'.join(lines))
+        self.adjustSize()
+        self.__place()
+        self.raise_()
+
+    def eventFilter(self, obj, e):
+        if obj is self.parent() and e.type() == QEvent.Resize:
+            self.__place()
+        return super().eventFilter(obj, e)
+
+    def __place(self):
+        self.move(self.parent().width() - self.width() - 12, 44)
+
+
+startupProfiler = StartupProfiler()
+tracer = Tracer()
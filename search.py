@@ -0,0 +1,210 @@
+import re
+import unicodedata
+import numpy as np
+from bisect import bisect_left
+from collections.abc import Sequence
+from functools import lru_cache
+
+KEYWORD_FIELDS = ('title', 'artist', 'album', 'path')
+CJK_PATTERN = re.compile(r'[\u3400-\u9fff\uf900-\ufaff]')
+TOKEN_PATTERN = re.compile(r'\S+')
+RANK_GAP = 1e-6
+DELTA_LIMIT = 4096
+REMOVE_LIMIT = 256
+
+
+def foldText(text: str):
+    text = unicodedata.normalize('NFKD', text)
+    return ''.join(c for c in text if not unicodedata.combining(c)).casefold()
+
+
+@lru_cache(maxsize=None)
+def pinyinModule():
+    try:
+        import pypinyin
+    except ImportError:
+        return None
+    return pypinyin
+
+
+def pinyinKeywords(text: str):
+    if not CJK_PATTERN.search(text) or pinyinModule() is None:
+        return ''
+    pypinyin = pinyinModule()
+    syllables = pypinyin.lazy_pinyin(text, errors='ignore')
+    initials = pypinyin.lazy_pinyin(text, style=pypinyin.Style.FIRST_LETTER, errors='ignore')
+    return f"{' '.join(syllables)} {''.join(syllables)} {''.join(initials)}"
+
+
+def trackKeywords(track):
+    fields = [foldText(track[field] or '') for field in KEYWORD_FIELDS]
+    fields += [pinyinKeywords(track[field] or '') for field in KEYWORD_FIELDS[:-1]]
+    return '\n'.join(field for field in fields if field).replace('\0', '')
+
+
+def searchEntry(track):
+    return track['artist'], track['album'], track['title'], track['path'], track['keywords']
+
+
+class SearchResults(Sequence):
+    def __init__(self, ids, paths: list):
+        self.ids = ids
+        self.paths = paths
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(map(self.paths.__getitem__, self.ids[index].tolist()))
+        return self.paths[self.ids[index]]
+
+
+class SearchIndex:
+    def __init__(self):
+        self.entries = []
+        self._ids = {}
+        self._entriesById = []
+        self._paths = []
+        self._ranks = []
+        self._order = np.zeros(0, np.int64)
+        self._alive = np.zeros(0, bool)
+        self._tokenIds = {'': 0}
+        self._units = np.zeros(1, np.uint16)
+        self._tokenStarts = np.zeros(1, np.int64)
+        self._postingDocs = np.zeros(0, np.int32)
+        self._postingStarts = np.zeros(2, np.int64)
+        self._postingLengths = np.zeros(1, np.int64)
+        self._deltaTokens = np.zeros(0, np.int32)
+        self._deltaDocs = np.zeros(0, np.int32)
+        self._pendingTokens = []
+        self._pendingPairs = []
+        self._pendingDocs = []
+        self._matches = {}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def load(self, entries):
+        self.__init__()
+        self.entries = sorted(entries)
+        for rank, entry in enumerate(self.entries):
+            self.__add(entry, float(rank))
+        self.__commit()
+        self.__compact()
+
+    def update(self, tracks):
+        self.remove(track['path'] for track in tracks)
+        for track in tracks:
+            entry = searchEntry(track)
+            index = bisect_left(self.entries, entry)
+            self.entries.insert(index, entry)
+            self.__add(entry, self.__rankAt(index))
+        self.__commit()
+
+    def remove(self, paths):
+        ids = [id for id in (self._ids.pop(path, None) for path in paths) if id is not None]
+        if len(ids) > REMOVE_LIMIT:
+            self.entries = [entry for entry in self.entries if entry[3] in self._ids]
+        else:
+            for id in ids:
+                del self.entries[bisect_left(self.entries, self._entriesById[id])]
+        for id in ids:
+            self._entriesById[id] = None
+        self._alive[ids] = False
+        self._matches = {}
+        if len(self._entriesById) > 2 * len(self.entries) + DELTA_LIMIT:
+            self.__compact()
+
+    def search(self, text: str):
+        terms = foldText(text).split()
+        self._matches = {term: self._matches.get(term) for term in terms}
+        mask = self._alive
+        for term in terms:
+            if self._matches[term] is None:
+                self._matches[term] = self.__find(term)
+            mask = mask & self._matches[term]
+        if self._order is None:
+            self._order = np.argsort(np.array(self._ranks), kind='stable')
+        return SearchResults(self._order[mask[self._order]], self._paths)
+
+    def __add(self, entry, rank: float):
+        tokenIds, id = self._tokenIds, len(self._entriesById)
+        for token in TOKEN_PATTERN.findall(entry[4]):
+            if token not in tokenIds:
+                tokenIds[token] = len(tokenIds)
+                self._pendingTokens.append(token)
+            self._pendingPairs.append(tokenIds[token])
+            self._pendingDocs.append(id)
+        self._ids[entry[3]] = id
+        self._entriesById.append(entry)
+        self._paths.append(entry[3])
+        self._ranks.append(rank)
+
+    def __commit(self):
+        if self._pendingTokens:
+            units = np.frombuffer(''.join(token + '\0' for token in self._pendingTokens).encode('utf-16-le'), np.uint16)
+            starts = np.concatenate(([0], np.flatnonzero(units == 0)[:-1] + 1)) + len(self._units)
+            self._units = np.concatenate((self._units, units))
+            self._tokenStarts = np.concatenate((self._tokenStarts, starts))
+        self._deltaTokens = np.concatenate((self._deltaTokens, np.array(self._pendingPairs, np.int32)))
+        self._deltaDocs = np.concatenate((self._deltaDocs, np.array(self._pendingDocs, np.int32)))
+        self._alive = np.concatenate((self._alive, np.ones(len(self._entriesById) - len(self._alive), bool)))
+        self._pendingTokens, self._pendingPairs, self._pendingDocs = [], [], []
+        self._order = None
+        self._matches = {}
+        if len(self._deltaDocs) > len(self._postingDocs) // 4 + DELTA_LIMIT:
+            self.__compact()
+
+    def __compact(self):
+        tokens = np.concatenate((np.repeat(np.arange(len(self._postingLengths), dtype=np.int32), self._postingLengths),
+                                 self._deltaTokens))
+        docs = np.concatenate((self._postingDocs, self._deltaDocs))
+        isAlive = self._alive[docs]
+        tokens, docs = tokens[isAlive], docs[isAlive]
+        order = np.argsort(tokens, kind='stable')
+        self._postingDocs = docs[order]
+        self._postingStarts = np.searchsorted(tokens[order], np.arange(len(self._tokenStarts) + 1))
+        self._postingLengths = np.diff(self._postingStarts)
+        self._deltaTokens, self._deltaDocs = np.zeros(0, np.int32), np.zeros(0, np.int32)
+
+    def __rankAt(self, index: int):
+        ranks, ids, entries = self._ranks, self._ids, self.entries
+        before = ranks[ids[entries[index - 1][3]]] if index > 0 else None
+        after = ranks[ids[entries[index + 1][3]]] if index + 1 < len(entries) else None
+        if before is None:
+            return after - 1.0 if after is not None else 0.0
+        if after is None:
+            return before + 1.0
+        if after - before > RANK_GAP:
+            return (before + after) / 2
+        for rank, entry in enumerate(entries):
+            if entry[3] in ids:
+                ranks[ids[entry[3]]] = float(rank)
+        return float(index)
+
+    def __find(self, term: str):
+        tokens = self.__findTokens(term)
+        docs = np.zeros(len(self._alive), bool)
+        lengths = self._postingLengths
+        indexed = tokens[:len(lengths)]
+        matched = np.flatnonzero(indexed)
+        total = int(lengths[matched].sum())
+        if total * 8 > len(self._postingDocs):
+            docs[self._postingDocs[np.repeat(indexed, lengths)]] = True
+        elif total:
+            offsets = np.repeat(self._postingStarts[matched] - np.cumsum(lengths[matched]) + lengths[matched],
+                                lengths[matched]) + np.arange(total)
+            docs[self._postingDocs[offsets]] = True
+        docs[self._deltaDocs[tokens[self._deltaTokens]]] = True
+        return docs
+
+    def __findTokens(self, word: str):
+        units, needle = self._units, np.frombuffer(word.encode('utf-16-le'), np.uint16)
+        positions = np.flatnonzero(units == needle[0])
+        positions = positions[positions <= len(units) - len(needle)]
+        for offset in range(1, len(needle)):
+            positions = positions[units[positions + offset] == needle[offset]]
+        tokens = np.zeros(len(self._tokenStarts), bool)
+        tokens[np.searchsorted(self._tokenStarts, positions, 'right') - 1] = True
+        return tokens
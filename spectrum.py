@@ -0,0 +1,134 @@
+import numpy as np
+from PySide6.QtCore import QEvent, QRectF, QTimer, Qt
+from PySide6.QtGui import QPainter, QPainterPath
+from PySide6.QtMultimedia import QAudioBuffer, QAudioBufferOutput, QAudioFormat
+from PySide6.QtWidgets import QWidget
+from qfluentwidgets import themeColor
+
+SAMPLE_RATE = 44100
+FFT_SIZE = 2048
+RING_FRAMES = 1 << 14
+BAND_COUNT = 24
+FRAME_RATE = 30
+MIN_FREQUENCY = 50
+MAX_FREQUENCY = 16000
+FLOOR_DB = -72.0
+FALL_PER_FRAME = 0.04
+
+
+def bandEdges(count: int = BAND_COUNT, fftSize: int = FFT_SIZE, sampleRate: int = SAMPLE_RATE):
+    edges = np.round(np.geomspace(MIN_FREQUENCY, MAX_FREQUENCY, count + 1) * fftSize / sampleRate).astype(int)
+    for i in range(1, len(edges)):
+        edges[i] = max(edges[i], edges[i - 1] + 1)
+    return edges
+
+
+def spectrumFormat():
+    format = QAudioFormat()
+    format.setSampleRate(SAMPLE_RATE)
+    format.setChannelCount(1)
+    format.setSampleFormat(QAudioFormat.Float)
+    return format
+
+
+class SpectrumView(QWidget):
+    def __init__(self, player, parent=None):
+        super().__init__(parent=parent)
+        self.player = player
+        self.isActive = False
+        self.output = QAudioBufferOutput(spectrumFormat(), player)
+        self.output.audioBufferReceived.connect(self.appendBuffer)
+        self.ring = np.zeros(RING_FRAMES, np.float32)
+        self.frame = np.zeros(FFT_SIZE, np.float32)
+        self.taper = np.hanning(FFT_SIZE).astype(np.float32)
+        self.scale = self.taper.sum() / 2
+        self.edges = bandEdges()
+        self.levels = np.zeros(BAND_COUNT)
+        self.written = 0
+        self.consumed = 0
+        self.path = QPainterPath()
+        self.timer = QTimer(self)
+        self.timer.setTimerType(Qt.PreciseTimer)
+        self.timer.setInterval(1000 // FRAME_RATE)
+        self.timer.timeout.connect(self.updateLevels)
+        self.setFixedSize(180, 100)
+
+    def appendBuffer(self, buffer: QAudioBuffer):
+        channels = buffer.format().channelCount()
+        if buffer.format().sampleFormat() != QAudioFormat.Float or not channels or not buffer.frameCount():
+            return
+        frames = np.frombuffer(buffer.constData(), np.float32).reshape(-1, channels)[-RING_FRAMES:]
+        start = self.written % RING_FRAMES
+        first = min(len(frames), RING_FRAMES - start)
+        np.mean(frames[:first], axis=1, out=self.ring[start:start + first])
+        np.mean(frames[first:], axis=1, out=self.ring[:len(frames) - first])
+        self.written += len(frames)
+        if self.isActive and not self.timer.isActive():
+            self.timer.start()
+
+    def updateLevels(self):
+        if self.written != self.consumed:
+            self.consumed = self.written
+            end = self.written % RING_FRAMES
+            if end >= FFT_SIZE:
+                np.multiply(self.ring[end - FFT_SIZE:end], self.taper, out=self.frame)
+            else:
+                np.multiply(self.ring[end - FFT_SIZE:], self.taper[:FFT_SIZE - end], out=self.frame[:FFT_SIZE - end])
+                np.multiply(self.ring[:end], self.taper[FFT_SIZE - end:], out=self.frame[FFT_SIZE - end:])
+            magnitudes = np.abs(np.fft.rfft(self.frame))
+            peaks = np.maximum.reduceat(magnitudes[:self.edges[-1]], self.edges[:-1]) / self.scale
+            target = np.clip(1 - 20 * np.log10(np.maximum(peaks, 1e-9)) / FLOOR_DB, 0, 1)
+        elif not self.levels.any():
+            self.timer.stop()
+            return
+        else:
+            target = 0
+        levels = np.maximum(target, self.levels - FALL_PER_FRAME)
+        levels[levels < 1e-3] = 0
+        if not np.array_equal(levels, self.levels):
+            self.levels = levels
+            self.__buildPath()
+            self.update()
+
+    def __buildPath(self):
+        self.path = QPainterPath()
+        width = self.width() / BAND_COUNT
+        for i, level in enumerate(self.levels):
+            height = max(level * self.height(), 2)
+            self.path.addRoundedRect(QRectF(i * width + 1, self.height() - height, width - 2, height), 1.5, 1.5)
+
+    def __updateState(self):
+        isActive = self.isVisible() and not self.window().isMinimized()
+        if isActive == self.isActive:
+            return
+        self.isActive = isActive
+        self.player.setAudioBufferOutput(self.output if isActive else None)
+        if not isActive:
+            self.timer.stop()
+            self.levels[:] = 0
+            self.consumed = self.written
+            self.__buildPath()
+
+    def eventFilter(self, obj, e):
+        if e.type() == QEvent.WindowStateChange:
+            self.__updateState()
+        return super().eventFilter(obj, e)
+
+    def showEvent(self, e):
+        super().showEvent(e)
+        self.window().removeEventFilter(self)
+        self.window().installEventFilter(self)
+        self.__updateState()
+
+    def hideEvent(self, e):
+        super().hideEvent(e)
+        self.__updateState()
+
+    def resizeEvent(self, e):
+        super().resizeEvent(e)
+        self.__buildPath()
+
+    def paintEvent(self, e):
+        painter = QPainter(self)
+        painter.setRenderHints(QPainter.Antialiasing)
+        painter.fillPath(self.path, themeColor())
@@ -0,0 +1,39 @@
+import os
+import time
+from PySide6.QtCore import QObject, Signal
+from PySide6.QtWidgets import QApplication, QWidget
+
+THEMES = ('light', 'dark')
+SHEETS = ('main', 'setting_interface')
+
+
+class StyleSheetManager(QObject):
+    themeSwitched = Signal(float)
+
+    def __init__(self, widget: QWidget = None, folder: str = 'resource/qss', parent=None):
+        super().__init__(parent=parent)
+        self.widget = widget
+        self.folder = folder
+        self.theme = None
+        self.switchTime = 0.0
+        self.sheets = {theme: self.__combine(theme) for theme in THEMES}
+
+    def styleSheet(self, theme: str):
+        return self.sheets[theme]
+
+    def apply(self, theme: str):
+        if theme == self.theme:
+            return False
+        start = time.perf_counter()
+        (self.widget or QApplication.instance()).setStyleSheet(self.sheets[theme])
+        self.theme = theme
+        self.switchTime = (time.perf_counter() - start) * 1000
+        self.themeSwitched.emit(self.switchTime)
+        return True
+
+    def __combine(self, theme: str):
+        sheets = []
+        for name in SHEETS:
+            with open(os.path.join(self.folder, theme, f'{name}.qss'), encoding='utf-8') as f:
+                sheets.append(f.read())
+        return '\n\n'.join(sheets)
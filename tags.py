@@ -0,0 +1,158 @@
+import os
+import re
+import hashlib
+from search import trackKeywords
+
+AUDIO_EXTENSIONS = ('.mp3', '.aac', '.wma', '.wav', '.ogg', '.m4a', '.ape', '.flac')
+
+TITLE_KEYS = ('TIT2', '©nam', 'title', 'Title')
+ARTIST_KEYS = ('TPE1', '©ART', 'artist', 'Artist', 'Author')
+ALBUM_KEYS = ('TALB', '©alb', 'album', 'Album', 'WM/AlbumTitle')
+REPLAYGAIN_KEYS = {
+    'replaygain_track_gain': 'trackGain',
+    'replaygain_track_peak': 'trackPeak',
+    'replaygain_album_gain': 'albumGain',
+    'replaygain_album_peak': 'albumPeak',
+}
+R128_KEYS = {'r128_track_gain': 'trackGain', 'r128_album_gain': 'albumGain'}
+TAG_PREFIXES = ('txxx:', '----:com.apple.itunes:', 'wm/')
+NUMBER_PATTERN = re.compile(r'[-+]?\d+(?:\.\d*)?|[-+]?\.\d+')
+
+
+def isAudioFile(path: str):
+    return path.lower().endswith(AUDIO_EXTENSIONS)
+
+
+def firstTag(audio, keys):
+    tags = audio.tags if audio is not None else None
+    if not tags:
+        return ''
+    for key in keys:
+        try:
+            value = tags[key]
+        except (KeyError, ValueError, TypeError):
+            continue
+        if isinstance(value, list):
+            value = value[0] if value else ''
+        value = getattr(value, 'text', value)
+        if isinstance(value, list):
+            value = value[0] if value else ''
+        value = str(value).strip()
+        if value:
+            return value
+    return ''
+
+
+def readCover(audio):
+    if audio is None:
+        return None
+    pictures = getattr(audio, 'pictures', None)
+    if pictures:
+        return pictures[0].data
+    tags = audio.tags
+    if not tags:
+        return None
+    if 'covr' in tags and tags['covr']:
+        return bytes(tags['covr'][0])
+    for key in tags.keys():
+        if key.startswith('APIC'):
+            return tags[key].data
+    return None
+
+
+def coverHash(data: bytes):
+    return hashlib.sha1(data).hexdigest() if data else ''
+
+
+def parseNumber(value):
+    value = getattr(value, 'text', value)
+    if isinstance(value, list):
+        value = value[0] if value else ''
+    if isinstance(value, bytes):
+        value = value.decode('utf-8', errors='ignore')
+    match = NUMBER_PATTERN.search(str(value))
+    return float(match.group()) if match else None
+
+
+def readReplayGain(audio):
+    gains = dict.fromkeys(REPLAYGAIN_KEYS.values())
+    tags = audio.tags if audio is not None else None
+    if not tags:
+        return gains
+    r128 = {}
+    for key in tags.keys():
+        name = key.lower()
+        for prefix in TAG_PREFIXES:
+            if name.startswith(prefix):
+                name = name[len(prefix):]
+        if name not in REPLAYGAIN_KEYS and name not in R128_KEYS:
+            continue
+        try:
+            value = parseNumber(tags[key])
+        except (KeyError, ValueError, TypeError):
+            continue
+        if value is None:
+            continue
+        if name in R128_KEYS:
+            r128[R128_KEYS[name]] = value / 256 + 5
+        else:
+            gains[REPLAYGAIN_KEYS[name]] = value
+    for column, value in r128.items():
+        if gains[column] is None:
+            gains[column] = value
+    return gains
+
+
+def readAudio(path: str):
+    import mutagen
+
+    try:
+        return mutagen.File(path)
+    except Exception:
+        return None
+
+
+def readTrackInfo(path: str, stat: os.stat_result = None):
+    stat = stat or os.stat(path)
+    info = {
+        'path': path,
+        'mtime': stat.st_mtime,
+        'size': stat.st_size,
+        'duration': 0.0,
+        'title': '',
+        'artist': '',
+        'album': '',
+        'coverHash': '',
+        'startTime': 0.0,
+        'endTime': 0.0,
+        'trackGain': None,
+        'trackPeak': None,
+        'albumGain': None,
+        'albumPeak': None,
+    }
+    audio = readAudio(path)
+    if audio is None:
+        info['title'] = os.path.splitext(os.path.basename(path))[0]
+        return info
+    if audio.info is not None:
+        info['duration'] = float(getattr(audio.info, 'length', 0) or 0)
+    info['title'] = firstTag(audio, TITLE_KEYS) or os.path.splitext(os.path.basename(path))[0]
+    info['artist'] = firstTag(audio, ARTIST_KEYS)
+    info['album'] = firstTag(audio, ALBUM_KEYS)
+    info['coverHash'] = coverHash(readCover(audio))
+    info.update(readReplayGain(audio))
+    return info
+
+
+def readTrackInfos(items):
+    from cue import isCueFile, readCueTrackInfos
+
+    infos = []
+    for path, stat in items:
+        if isCueFile(path):
+            infos.extend(readCueTrackInfos(path, stat))
+        else:
+            infos.append(readTrackInfo(path, stat))
+    for info in infos:
+        info['keywords'] = trackKeywords(info)
+    return infos
@@ -0,0 +1,177 @@
+import os
+import struct
+import threading
+import numpy as np
+from PySide6.QtCore import QThread, Signal, QRectF, QLineF
+from PySide6.QtGui import QPainter, QColor, QPen
+from qfluentwidgets import Slider, isDarkTheme
+from qfluentwidgets.common.color import autoFallbackThemeColor
+from audio import decodePcm, fileKey
+from config import CACHE_FOLDER
+
+PEAK_MAGIC = b'MPPK'
+PEAK_VERSION = 1
+PEAK_HEADER = struct.Struct('<4sHHII')
+
+
+def reducePeaks(frames: np.ndarray, samplesPerPeak: int):
+    blocks = frames.reshape(-1, samplesPerPeak * frames.shape[1])
+    peaks = np.empty((len(blocks), 2), np.float32)
+    peaks[:, 0] = blocks.min(axis=1)
+    peaks[:, 1] = blocks.max(axis=1)
+    return np.clip(np.round(peaks * 127), -127, 127).astype(np.int8)
+
+
+def computePeaks(path: str, samplesPerPeak: int = 1024, isCanceled=None, batchPeaks: int = 256):
+    chunks, blocks, pending, sampleRate = [], [], 0, 0
+    for frames, sampleRate in decodePcm(path, isCanceled):
+        blocks.append(frames)
+        pending += len(frames)
+        if pending >= samplesPerPeak * batchPeaks:
+            frames = np.concatenate(blocks)
+            count = len(frames) // samplesPerPeak * samplesPerPeak
+            chunks.append(reducePeaks(frames[:count], samplesPerPeak))
+            blocks, pending = [frames[count:]], len(frames) - count
+    if isCanceled is not None and isCanceled():
+        return None, sampleRate
+    if pending:
+        frames = np.concatenate(blocks)
+        count = len(frames) // samplesPerPeak * samplesPerPeak
+        chunks.append(reducePeaks(frames[:count], samplesPerPeak))
+        if count < len(frames):
+            chunks.append(reducePeaks(frames[count:], len(frames) - count))
+    return (np.concatenate(chunks) if chunks else np.empty((0, 2), np.int8)), sampleRate
+
+
+class PeakCache:
+    def __init__(self, folder: str = os.path.join(CACHE_FOLDER, 'peaks')):
+        self.folder = folder
+
+    def peakPath(self, key: str):
+        return os.path.join(self.folder, f'{key}.peaks')
+
+    def load(self, key: str):
+        path = self.peakPath(key)
+        try:
+            with open(path, 'rb') as f:
+                magic, version, _, sampleRate, samplesPerPeak = PEAK_HEADER.unpack(f.read(PEAK_HEADER.size))
+            if magic != PEAK_MAGIC or version != PEAK_VERSION or not samplesPerPeak:
+                return None
+            if os.path.getsize(path) == PEAK_HEADER.size:
+                return np.empty((0, 2), np.int8), sampleRate / samplesPerPeak
+            peaks = np.memmap(path, dtype=np.int8, mode='r', offset=PEAK_HEADER.size).reshape(-1, 2)
+            return peaks, sampleRate / samplesPerPeak
+        except (OSError, ValueError, struct.error):
+            return None
+
+    def save(self, key: str, peaks: np.ndarray, sampleRate: int, samplesPerPeak: int):
+        os.makedirs(self.folder, exist_ok=True)
+        path = self.peakPath(key)
+        temp = path + '.tmp'
+        with open(temp, 'wb') as f:
+            f.write(PEAK_HEADER.pack(PEAK_MAGIC, PEAK_VERSION, 0, sampleRate, samplesPerPeak))
+            f.write(np.ascontiguousarray(peaks, np.int8).tobytes())
+        os.replace(temp, path)
+
+
+class WaveformLoader(QThread):
+    peaksReady = Signal(str, object, float)
+
+    samplesPerPeak = 1024
+
+    def __init__(self, cache: PeakCache = None, parent=None):
+        super().__init__(parent=parent)
+        self.cache = cache or PeakCache()
+        self._lock = threading.Lock()
+        self._pending = None
+        self._isActive = False
+
+    def load(self, path: str):
+        with self._lock:
+            self._pending = path
+            isIdle = not self._isActive
+            self._isActive = True
+        if isIdle:
+            self.wait()
+            self.start(QThread.LowPriority)
+
+    def cancel(self):
+        with self._lock:
+            self._pending = None
+
+    def isSuperseded(self):
+        return self._pending is not None
+
+    def run(self):
+        while True:
+            with self._lock:
+                path, self._pending = self._pending, None
+                if path is None:
+                    self._isActive = False
+                    return
+            try:
+                key = fileKey(path)
+            except OSError:
+                continue
+            cached = self.cache.load(key)
+            if cached is None:
+                peaks, sampleRate = computePeaks(path, self.samplesPerPeak, self.isSuperseded)
+                if peaks is None or not sampleRate:
+                    continue
+                self.cache.save(key, peaks, sampleRate, self.samplesPerPeak)
+                cached = peaks, sampleRate / self.samplesPerPeak
+            self.peaksReady.emit(path, *cached)
+
+
+class WaveformSlider(Slider):
+    def _postInit(self):
+        super()._postInit()
+        self.peaks = None
+        self._lines = []
+        self._linesWidth = -1
+
+    def setPeaks(self, peaks):
+        self.peaks = peaks if peaks is not None and len(peaks) else None
+        self._linesWidth = -1
+        self.update()
+
+    def _waveformLines(self, width: int):
+        if self._linesWidth == width:
+            return self._lines
+        self._linesWidth = width
+        self._lines = []
+        if self.peaks is None or width <= 0:
+            return self._lines
+        count = len(self.peaks)
+        if count >= width:
+            starts = np.linspace(0, count, width + 1).astype(np.int64)[:-1]
+            lows = np.minimum.reduceat(self.peaks[:, 0], starts)
+            highs = np.maximum.reduceat(self.peaks[:, 1], starts)
+        else:
+            indexes = np.arange(width) * count // width
+            lows, highs = self.peaks[indexes, 0], self.peaks[indexes, 1]
+        r = self.handle.width() / 2
+        scale = (self.height() / 2 - 2) / 127
+        self._lines = [QLineF(r + x, r - high * scale, r + x, r - low * scale + 0.5)
+                       for x, (low, high) in enumerate(zip(lows.tolist(), highs.tolist()))]
+        return self._lines
+
+    def _drawHorizonGroove(self, painter: QPainter):
+        if self.peaks is None:
+            return super()._drawHorizonGroove(painter)
+        w, r = self.width(), self.handle.width() / 2
+        lines = self._waveformLines(int(w - r * 2))
+        total = self.maximum() - self.minimum()
+        aw = (self.value() - self.minimum()) / total * (w - r * 2) if total else 0
+        painter.save()
+        painter.setPen(QPen(QColor(255, 255, 255, 115) if isDarkTheme() else QColor(0, 0, 0, 100), 1))
+        painter.setClipRect(QRectF(r + aw, 0, w, self.height()))
+        painter.drawLines(lines)
+        painter.setPen(QPen(autoFallbackThemeColor(self.lightGrooveColor, self.darkGrooveColor), 1))
+        painter.setClipRect(QRectF(0, 0, r + aw, self.height()))
+        painter.drawLines(lines)
+        painter.restore()
+
+    def resizeEvent(self, e):
+        super().resizeEvent(e)
+        self._linesWidth = -1
@@ -0,0 +1,2132 @@
+import os
+import sys
+import time
+import subprocess
+from datetime import date
+from typing import TYPE_CHECKING, Union
+from instance import SERVER_PATH, fileArguments, decodePaths, isServerRunning
+from profiling import startupProfiler, tracer, LagMonitor, TraceOverlay
+from config import cfg, HELP_URL, CACHE_FOLDER, PLAYLIST_PATH
+from library import Library, LibraryScanner, LibraryWatcher
+from history import History, HistoryWriter, ListeningSession, weekOf
+from lyrics import Lyrics, LyricsView, loadLyrics, lyricsStamp
+from dsp import DspStage, EQ_FREQUENCIES, EQ_RANGE
+from cover import CoverCache, CoverLoader, ThumbnailLoader
+from playlist import Playlist, RepeatMode
+from cue import cueTrack, expandCuePaths, isCueFile
+from tags import isAudioFile
+from stylesheet import StyleSheetManager
+from waveform import PeakCache, WaveformLoader, WaveformSlider
+from PySide6.QtCore import Qt, Signal, QSize, QPropertyAnimation, QObject, QUrl, QTimer, QAbstractTableModel, \
+    QModelIndex
+from PySide6.QtGui import QIcon, QShortcut, QKeySequence, QColor, QPainter, QActionGroup, QPixmap
+from PySide6.QtWidgets import QApplication, QWidget, QHBoxLayout, QStackedWidget, QVBoxLayout, QLabel, QFileDialog, \
+    QButtonGroup, QPushButton, QGraphicsOpacityEffect, QHeaderView, QAbstractItemView, QTableWidgetItem
+from PySide6.QtMultimedia import QMediaPlayer, QAudioOutput
+from PySide6.QtNetwork import QLocalServer, QLocalSocket
+from qframelesswindow import FramelessWindow, StandardTitleBar
+from qfluentwidgets import SettingCardGroup, SwitchSettingCard, PushSettingCard, HyperlinkCard, ScrollArea, \
+    ExpandSettingCard, ExpandLayout, Theme, InfoBar, setTheme, setThemeColor, isDarkTheme, SegmentedWidget, \
+    ExpandGroupSettingCard, RadioButton, qconfig, ColorConfigItem, FluentIconBase, \
+    TransparentDropDownPushButton, RoundMenu, CommandBar, Action, setFont, ImageLabel, FluentStyleSheet, \
+    TransparentToolButton, ToolTipFilter, Slider, CaptionLabel, Flyout, FlyoutViewBase, TableView, SearchLineEdit, \
+    ComboBoxSettingCard, RangeSettingCard, ComboBox, PushButton, MessageBoxBase, SubtitleLabel, LineEdit, TableWidget
+from qfluentwidgets.components.widgets.flyout import SlideLeftFlyoutAnimationManager
+from qfluentwidgets import FluentIcon as FIF
+
+if TYPE_CHECKING:
+    from loudness import LoudnessAnalyzer
+    from fingerprint import DuplicateFinder
+
+
+class MediaPlayerBase(QObject):
+    mediaStatusChanged = Signal(QMediaPlayer.MediaStatus)
+    playbackRateChanged = Signal(float)
+    positionChanged = Signal(int)
+    durationChanged = Signal(int)
+    sourceChanged = Signal(QUrl)
+    volumeChanged = Signal(int)
+    mutedChanged = Signal(bool)
+
+    def __init__(self, parent=None):
+        super().__init__(parent=parent)
+
+    def isPlaying(self):
+        raise NotImplementedError
+
+    def mediaStatus(self) -> QMediaPlayer.MediaStatus:
+        raise NotImplementedError
+
+    def playbackState(self) -> QMediaPlayer.PlaybackState:
+        raise NotImplementedError
+
+    def duration(self):
+        raise NotImplementedError
+
+    def position(self):
+        raise NotImplementedError
+
+    def volume(self):
+        raise NotImplementedError
+
+    def source(self) -> QUrl:
+        raise NotImplementedError
+
+    def pause(self):
+        raise NotImplementedError
+
+    def play(self):
+        raise NotImplementedError
+
+    def stop(self):
+        raise NotImplementedError
+
+    def playbackRate(self) -> float:
+        raise NotImplementedError
+
+    def setPosition(self, position: int):
+        raise NotImplementedError
+
+    def setSource(self, media: QUrl):
+        raise NotImplementedError
+
+    def setPlaybackRate(self, rate: float):
+        raise NotImplementedError
+
+    def setVolume(self, volume: int):
+        raise NotImplementedError
+
+    def setMuted(self, isMuted: bool):
+        raise NotImplementedError
+
+    def videoOutput(self) -> QObject:
+        raise NotImplementedError
+
+    def setVideoOutput(self, output: QObject) -> None:
+        raise NotImplementedError
+
+
+class MediaPlayer(QMediaPlayer):
+    sourceChanged = Signal(QUrl)
+    mutedChanged = Signal(bool)
+    volumeChanged = Signal(int)
+
+    def __init__(self, parent=None):
+        super().__init__(parent=parent)
+        self._audioOutput = QAudioOutput(parent)
+        self.setAudioOutput(self._audioOutput)
+
+    def isPlaying(self):
+        return self.playbackState() == QMediaPlayer.PlayingState
+
+    def volume(self):
+        return int(self.audioOutput().volume() * 100)
+
+    def setVolume(self, volume: int):
+        if volume == self.volume():
+            return
+        self.audioOutput().setVolume(volume / 100)
+        self.volumeChanged.emit(volume)
+
+    def isMuted(self):
+        return self.audioOutput().isMuted()
+
+    def setMuted(self, isMuted: bool):
+        if isMuted == self.audioOutput().isMuted():
+            return
+        self.audioOutput().setMuted(isMuted)
+        self.mutedChanged.emit(isMuted)
+
+
+class GaplessMediaPlayer(MediaPlayerBase):
+    trackChanged = Signal(QUrl)
+    transitionFinished = Signal(float)
+
+    def __init__(self, parent=None):
+        super().__init__(parent=parent)
+        self._audioOutput = QAudioOutput(self)
+        self._bufferOutput = None
+        self._stage = DspStage(self._audioOutput, self)
+        self._stage.fadeFinished.connect(self._onFadeFinished)
+        self._isDspEnabled = False
+        self._crossfade = 0
+        self._fadingPlayer = None
+        self._players = [QMediaPlayer(self), QMediaPlayer(self)]
+        self._current = 0
+        self._switchTime = None
+        self._clip = (0, 0)
+        self._nextClip = (0, 0)
+        self._nextUrl = QUrl()
+        self._volume = 100
+        self._gain = 0.0
+        self._nextGain = 0.0
+        self._nextRate = 1.0
+        self._isSeeking = False
+        self.transitionTime = 0.0
+        for player in self._players:
+            player.mediaStatusChanged.connect(self._onMediaStatusChanged)
+            player.positionChanged.connect(self._onPositionChanged)
+            player.durationChanged.connect(self._onDurationChanged)
+            player.sourceChanged.connect(self._onSourceChanged)
+            player.playbackRateChanged.connect(self._onPlaybackRateChanged)
+        self.player.setAudioOutput(self._audioOutput)
+
+    @property
+    def player(self) -> QMediaPlayer:
+        return self._players[self._current]
+
+    @property
+    def nextPlayer(self) -> QMediaPlayer:
+        return self._players[1 - self._current]
+
+    def audioOutput(self):
+        return self._audioOutput
+
+    def audioBufferOutput(self):
+        return self._bufferOutput
+
+    def setAudioBufferOutput(self, output):
+        self._bufferOutput = output
+        if self._isDspEnabled:
+            self._stage.setTap(output)
+        else:
+            self.player.setAudioBufferOutput(output)
+
+    def dspStage(self) -> DspStage:
+        return self._stage
+
+    def isDspEnabled(self):
+        return self._isDspEnabled
+
+    def setDspEnabled(self, isEnabled: bool):
+        if isEnabled == self._isDspEnabled:
+            return
+        self._stopFade()
+        self._isDspEnabled = isEnabled
+        if isEnabled:
+            self._stage.start()
+            self._stage.setCurrent(self._current)
+            self._stage.setTap(self._bufferOutput)
+            for player, output in zip(self._players, self._stage.inputs):
+                player.setAudioOutput(None)
+                player.setAudioBufferOutput(output)
+        else:
+            self._stage.setTap(None)
+            for player in self._players:
+                player.setAudioBufferOutput(None)
+            self.player.setAudioOutput(self._audioOutput)
+            self.player.setAudioBufferOutput(self._bufferOutput)
+            self._stage.stop()
+
+    def crossfade(self):
+        return self._crossfade
+
+    def setCrossfade(self, duration: int):
+        self._crossfade = duration
+
+    def isPlaying(self):
+        return self.player.playbackState() == QMediaPlayer.PlayingState
+
+    def mediaStatus(self) -> QMediaPlayer.MediaStatus:
+        return self.player.mediaStatus()
+
+    def playbackState(self) -> QMediaPlayer.PlaybackState:
+        return self.player.playbackState()
+
+    def duration(self):
+        start, end = self._clip
+        return max((end or self.player.duration()) - start, 0)
+
+    def position(self):
+        return max(self.player.position() - self._clip[0], 0)
+
+    def volume(self):
+        return self._volume
+
+    def gain(self):
+        return self._gain
+
+    def isMuted(self):
+        return self._audioOutput.isMuted()
+
+    def source(self) -> QUrl:
+        return self.player.source()
+
+    def nextSource(self) -> QUrl:
+        return self._nextUrl
+
+    def clip(self):
+        return self._clip
+
+    def pause(self):
+        self.player.pause()
+        if self._fadingPlayer is not None:
+            self._fadingPlayer.pause()
+
+    def play(self):
+        start, end = self._clip
+        position = self.player.position()
+        if (start or end) and (position < start or end and position >= end):
+            self._seek(start)
+        self.player.play()
+        if self._fadingPlayer is not None:
+            self._fadingPlayer.play()
+
+    def stop(self):
+        self._stopFade()
+        self.player.stop()
+
+    def playbackRate(self) -> float:
+        return self.player.playbackRate()
+
+    def setPosition(self, position: int):
+        self.player.setPosition(self._clip[0] + position)
+
+    def setSource(self, media: Union[str, QUrl], start: int = 0, end: int = 0):
+        url = self._toUrl(media)
+        self._clip = (start, end)
+        self._stopFade()
+        if url.isValid() and url == self.player.source():
+            self._seek(start)
+            self.durationChanged.emit(self.duration())
+            self.positionChanged.emit(0)
+        else:
+            self._isSeeking = bool(start)
+            self.player.setSource(url)
+
+    def setNextSource(self, media: Union[str, QUrl, None], start: int = 0, end: int = 0):
+        url = self._toUrl(media)
+        self._nextUrl, self._nextClip = url, (start, end)
+        if self._fadingPlayer is not None:
+            return
+        if self._isNextInSource():
+            url = QUrl()
+        if url != self.nextPlayer.source():
+            self.nextPlayer.setSource(url)
+        elif url.isValid() and self._canSwitch():
+            self.nextPlayer.setPosition(start)
+
+    def setPlaybackRate(self, rate: float):
+        self.player.setPlaybackRate(rate)
+
+    def setNextPlaybackRate(self, rate: float):
+        self._nextRate = rate
+        if self._fadingPlayer is None:
+            self.nextPlayer.setPlaybackRate(rate)
+
+    def pitchCompensationAvailability(self) -> QMediaPlayer.PitchCompensationAvailability:
+        return self.player.pitchCompensationAvailability()
+
+    def setPitchCompensation(self, isEnabled: bool):
+        for player in self._players:
+            if player.pitchCompensationAvailability() == QMediaPlayer.PitchCompensationAvailability.Available:
+                player.setPitchCompensation(isEnabled)
+
+    def setVolume(self, volume: int):
+        if volume == self.volume():
+            return
+        self._volume = volume
+        self._applyVolume()
+        self.volumeChanged.emit(volume)
+
+    def setGain(self, gain: float):
+        self._gain = gain
+        self._applyVolume()
+
+    def setNextGain(self, gain: float):
+        self._nextGain = gain
+
+    def setMuted(self, isMuted: bool):
+        if isMuted == self._audioOutput.isMuted():
+            return
+        self._audioOutput.setMuted(isMuted)
+        self.mutedChanged.emit(isMuted)
+
+    def videoOutput(self) -> QObject:
+        return None
+
+    def setVideoOutput(self, output: QObject) -> None:
+        pass
+
+    def _toUrl(self, media):
+        if not media:
+            return QUrl()
+        if isinstance(media, str):
+            return QUrl.fromLocalFile(media)
+        return media
+
+    def _applyVolume(self):
+        self._audioOutput.setVolume(min(self._volume / 100 * 10 ** (self._gain / 20), 1.0))
+
+    def _canSwitch(self):
+        return self._fadingPlayer is None and \
+            self.nextPlayer.mediaStatus() in (QMediaPlayer.LoadedMedia, QMediaPlayer.BufferedMedia)
+
+    def _shouldCrossfade(self, position: int):
+        if not self._isDspEnabled or not self._crossfade or self.duration() <= 2 * self._crossfade:
+            return False
+        if not self.isPlaying() or self._isNextInSource() or not self._canSwitch():
+            return False
+        end = self._clip[1] or self.player.duration()
+        return end - position <= self._crossfade * self.player.playbackRate()
+
+    def _stopFade(self):
+        if self._fadingPlayer is None:
+            return
+        player, self._fadingPlayer = self._fadingPlayer, None
+        player.setSource(QUrl())
+        self._stage.setCurrent(self._current)
+        self.nextPlayer.setPlaybackRate(self._nextRate)
+        self.setNextSource(self._nextUrl, *self._nextClip)
+
+    def _isNextInSource(self):
+        return self._nextClip != (0, 0) and self._nextUrl.isValid() and self._nextUrl == self.player.source()
+
+    def _seek(self, position: int):
+        self._isSeeking = True
+        self.player.setPosition(position)
+
+    def _switch(self, isFading: bool = False):
+        self._stopFade()
+        self._switchTime = time.perf_counter()
+        previous = self.player
+        self._current = 1 - self._current
+        self._clip, self._nextClip, self._nextUrl = self._nextClip, (0, 0), QUrl()
+        self._gain, self._nextGain = self._nextGain, 0.0
+        self._nextRate = 1.0
+        self._applyVolume()
+        self._isSeeking = bool(self._clip[0])
+        if not self._isDspEnabled:
+            self.player.setAudioOutput(self._audioOutput)
+            self.player.setAudioBufferOutput(self._bufferOutput)
+        elif isFading:
+            self._stage.crossfade(1 - self._current, self._current, self._crossfade)
+        else:
+            self._stage.setCurrent(self._current)
+        self.player.play()
+        if isFading:
+            self._fadingPlayer = previous
+        else:
+            previous.setSource(QUrl())
+        self.sourceChanged.emit(self.player.source())
+        self.playbackRateChanged.emit(self.player.playbackRate())
+        self.durationChanged.emit(self.duration())
+        self.trackChanged.emit(self.player.source())
+
+    def _advanceClip(self, isContiguous: bool):
+        self._clip, self._nextClip, self._nextUrl = self._nextClip, (0, 0), QUrl()
+        self._gain, self._nextGain = self._nextGain, 0.0
+        self._applyVolume()
+        self.player.setPlaybackRate(self._nextRate)
+        self._nextRate = 1.0
+        if not isContiguous:
+            self._seek(self._clip[0])
+        if self.player.playbackState() != QMediaPlayer.PlayingState:
+            self.player.play()
+        self.durationChanged.emit(self.duration())
+        self.trackChanged.emit(self.player.source())
+
+    def _finishClip(self):
+        if self._isNextInSource():
+            self._advanceClip(self._nextClip[0] == self._clip[1])
+        elif self._canSwitch():
+            self._switch()
+        else:
+            self.player.pause()
+            self._seek(self._clip[0])
+            self.mediaStatusChanged.emit(QMediaPlayer.EndOfMedia)
+
+    @tracer.timed
+    def _onMediaStatusChanged(self, status: QMediaPlayer.MediaStatus):
+        if self.sender() is self._fadingPlayer:
+            if status == QMediaPlayer.EndOfMedia:
+                self._stopFade()
+            return
+        if self.sender() is self.nextPlayer:
+            if status == QMediaPlayer.LoadedMedia and self._nextClip[0]:
+                self.nextPlayer.setPosition(self._nextClip[0])
+            return
+        if status == QMediaPlayer.LoadedMedia and self._isSeeking:
+            self.player.setPosition(self._clip[0])
+        if status == QMediaPlayer.EndOfMedia and self._isNextInSource():
+            self._advanceClip(False)
+        elif status == QMediaPlayer.EndOfMedia and self._canSwitch():
+            self._switch()
+        else:
+            self.mediaStatusChanged.emit(status)
+
+    def _onPositionChanged(self, position: int):
+        if self.sender() is not self.player:
+            return
+        start, end = self._clip
+        if self._isSeeking:
+            if position < start or end and position >= end:
+                return
+            self._isSeeking = False
+        if end and position >= end:
+            self._finishClip()
+            return
+        if self._shouldCrossfade(position):
+            self._switch(True)
+            return
+        if self._switchTime is not None and position > start:
+            elapsed = (time.perf_counter() - self._switchTime) * 1000
+            self.transitionTime = max(elapsed - (position - start) / self.player.playbackRate(), 0.0)
+            self._switchTime = None
+            self.transitionFinished.emit(self.transitionTime)
+        self.positionChanged.emit(position - start)
+
+    def _onDurationChanged(self, duration: int):
+        if self.sender() is self.player:
+            self.durationChanged.emit(self.duration())
+
+    def _onSourceChanged(self, url: QUrl):
+        if self.sender() is self.player:
+            self.sourceChanged.emit(url)
+
+    def _onPlaybackRateChanged(self, rate: float):
+        if self.sender() is self.player:
+            self.playbackRateChanged.emit(rate)
+
+    def _onFadeFinished(self, index: int):
+        if self._players[index] is self._fadingPlayer:
+            self._stopFade()
+
+
+class MediaPlayBarButton(TransparentToolButton):
+    def _postInit(self):
+        super()._postInit()
+        self.installEventFilter(ToolTipFilter(self, 1000))
+        self.setFixedSize(30, 30)
+        self.setIconSize(QSize(16, 16))
+
+
+class PlayButton(MediaPlayBarButton):
+    def _postInit(self):
+        super()._postInit()
+        self.setIconSize(QSize(14, 14))
+        self.setPlay(False)
+
+    def setPlay(self, isPlay: bool):
+        if isPlay:
+            self.setIcon(FIF.PAUSE_BOLD)
+            self.setToolTip(self.tr('暂停'))
+        else:
+            self.setIcon(FIF.PLAY_SOLID)
+            self.setToolTip(self.tr('播放'))
+
+
+class VolumeView(FlyoutViewBase):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.muteButton = MediaPlayBarButton(FIF.VOLUME, self)
+        self.volumeSlider = Slider(Qt.Horizontal, self)
+        self.volumeLabel = CaptionLabel('30', self)
+        self.volumeSlider.setRange(0, 100)
+        self.volumeSlider.setFixedWidth(208)
+        self.setFixedSize(295, 64)
+        h = self.height()
+        self.muteButton.move(10, h // 2 - self.muteButton.height() // 2)
+        self.volumeSlider.move(45, 21)
+
+    def setMuted(self, isMute: bool):
+        if isMute:
+            self.muteButton.setIcon(FIF.MUTE)
+            self.muteButton.setToolTip(self.tr('取消静音'))
+        else:
+            self.muteButton.setIcon(FIF.VOLUME)
+            self.muteButton.setToolTip(self.tr('静音'))
+
+    def setVolume(self, volume: int):
+        self.volumeSlider.setValue(volume)
+        self.volumeLabel.setNum(volume)
+        self.volumeLabel.adjustSize()
+        tr = self.volumeLabel.fontMetrics().boundingRect(str(volume))
+        self.volumeLabel.move(self.width() - 20 - tr.width(), self.height() // 2 - tr.height() // 2)
+
+    def paintEvent(self, e):
+        painter = QPainter(self)
+        painter.setRenderHints(QPainter.Antialiasing)
+        if isDarkTheme():
+            painter.setBrush(QColor(46, 46, 46))
+            painter.setPen(QColor(0, 0, 0, 20))
+        else:
+            painter.setBrush(QColor(248, 248, 248))
+            painter.setPen(QColor(0, 0, 0, 10))
+        painter.drawRoundedRect(self.rect().adjusted(1, 1, -1, -1), 8, 8)
+
+
+class VolumeButton(MediaPlayBarButton):
+    volumeChanged = Signal(int)
+    mutedChanged = Signal(bool)
+
+    def _postInit(self):
+        super()._postInit()
+        self.volumeView = VolumeView(self)
+        self.volumeFlyout = Flyout(self.volumeView, self.window(), False)
+        self.destroyed.connect(self.volumeFlyout.deleteLater)
+        self.setMuted(False)
+        self.volumeFlyout.hide()
+        self.volumeView.muteButton.clicked.connect(lambda: self.mutedChanged.emit(not self.isMuted))
+        self.volumeView.volumeSlider.valueChanged.connect(self.volumeChanged)
+        self.clicked.connect(self._showVolumeFlyout)
+
+    def setMuted(self, isMute: bool):
+        self.isMuted = isMute
+        self.volumeView.setMuted(isMute)
+        if isMute:
+            self.setIcon(FIF.MUTE)
+        else:
+            self.setIcon(FIF.VOLUME)
+
+    def setVolume(self, volume: int):
+        self.volumeView.setVolume(volume)
+
+    def _showVolumeFlyout(self):
+        if self.volumeFlyout.isVisible():
+            return
+        pos = SlideLeftFlyoutAnimationManager(self.volumeFlyout).position(self)
+        self.volumeFlyout.exec(pos)
+
+
+class MediaPlayBarBase(QWidget):
+    played = Signal()
+    paused = Signal()
+    finished = Signal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent=parent)
+        self.player = None
+        self._duration = 0
+        self._sliderPosition = 0
+
+        self.playButton = PlayButton(self)
+        self.volumeButton = VolumeButton(self)
+        self.progressSlider = WaveformSlider(Qt.Horizontal, self)
+        self.opacityEffect = QGraphicsOpacityEffect(self)
+        self.opacityAni = QPropertyAnimation(self.opacityEffect, b'opacity')
+        self.opacityEffect.setOpacity(1)
+        self.opacityAni.setDuration(250)
+        self.setGraphicsEffect(self.opacityEffect)
+        FluentStyleSheet.MEDIA_PLAYER.apply(self)
+        self.playButton.clicked.connect(self.togglePlayState)
+
+    def setMediaPlayer(self, player: MediaPlayerBase):
+        volume, isMuted = 30, False
+        if self.player is not None:
+            volume, isMuted = self.player.volume(), self.volumeButton.isMuted
+            self.__disconnectMediaPlayer()
+        self.player = player
+        self.player.durationChanged.connect(self._onDurationChanged)
+        self.player.positionChanged.connect(self._onPositionChanged)
+        self.player.mediaStatusChanged.connect(self._onMediaStatusChanged)
+        self.player.volumeChanged.connect(self.volumeButton.setVolume)
+        self.player.mutedChanged.connect(self.volumeButton.setMuted)
+        self.progressSlider.sliderMoved.connect(self.player.setPosition)
+        self.progressSlider.clicked.connect(self.player.setPosition)
+        self.volumeButton.volumeChanged.connect(self.player.setVolume)
+        self.volumeButton.mutedChanged.connect(self.player.setMuted)
+        self.player.setVolume(volume)
+        self.player.setMuted(isMuted)
+
+    def __disconnectMediaPlayer(self):
+        self.player.durationChanged.disconnect(self._onDurationChanged)
+        self.player.positionChanged.disconnect(self._onPositionChanged)
+        self.player.mediaStatusChanged.disconnect(self._onMediaStatusChanged)
+        self.player.volumeChanged.disconnect(self.volumeButton.setVolume)
+        self.player.mutedChanged.disconnect(self.volumeButton.setMuted)
+        self.progressSlider.sliderMoved.disconnect(self.player.setPosition)
+        self.progressSlider.clicked.disconnect(self.player.setPosition)
+        self.volumeButton.volumeChanged.disconnect(self.player.setVolume)
+        self.volumeButton.mutedChanged.disconnect(self.player.setMuted)
+
+    def setSource(self, source: Union[str, QUrl], start: int = 0, end: int = 0):
+        self._sliderPosition = 0
+        self.progressSlider.setValue(0)
+        if start or end:
+            self.player.setSource(source, start, end)
+        else:
+            self.player.setSource(source)
+
+    def fadeIn(self):
+        self.opacityAni.setStartValue(self.opacityEffect.opacity())
+        self.opacityAni.setEndValue(1)
+        self.opacityAni.start()
+
+    def fadeOut(self):
+        self.opacityAni.setStartValue(self.opacityEffect.opacity())
+        self.opacityAni.setEndValue(0)
+        self.opacityAni.start()
+
+    def play(self):
+        self.player.play()
+        self.playButton.setPlay(True)
+        self.played.emit()
+
+    def pause(self):
+        self.player.pause()
+        self.playButton.setPlay(False)
+        self.paused.emit()
+
+    def stop(self):
+        self.player.stop()
+
+    def setVolume(self, volume: int):
+        self.player.setVolume(volume)
+
+    def setPosition(self, position: int):
+        self.player.setPosition(position)
+
+    def _onDurationChanged(self, duration: int):
+        self._duration = duration
+        self.progressSlider.setMaximum(duration)
+
+    def _onPositionChanged(self, position: int):
+        if self.progressSlider.isSliderDown():
+            return
+        if abs(position - self._sliderPosition) * self.progressSlider.grooveLength < self._duration:
+            return
+        self._sliderPosition = position
+        self.progressSlider.setValue(position)
+
+    def _onMediaStatusChanged(self, status):
+        if status == QMediaPlayer.EndOfMedia:
+            self.finished.emit()
+        self.playButton.setPlay(self.player.isPlaying())
+
+    @tracer.timed
+    def togglePlayState(self):
+        if self.player.isPlaying():
+            self.player.pause()
+        else:
+            self.player.play()
+        isPlaying = self.player.isPlaying()
+        self.playButton.setPlay(isPlaying)
+        (self.played if isPlaying else self.paused).emit()
+
+    def paintEvent(self, e):
+        painter = QPainter(self)
+        painter.setRenderHints(QPainter.Antialiasing)
+        if isDarkTheme():
+            painter.setBrush(QColor(46, 46, 46))
+            painter.setPen(QColor(0, 0, 0, 20))
+        else:
+            painter.setBrush(QColor(248, 248, 248))
+            painter.setPen(QColor(0, 0, 0, 10))
+        painter.drawRoundedRect(self.rect().adjusted(1, 1, -1, -1), 8, 8)
+
+
+class StandardMediaPlayBar(MediaPlayBarBase):
+    previousRequested = Signal()
+    nextRequested = Signal()
+
+    def __init__(self, parent=None, player: MediaPlayerBase = None):
+        super().__init__(parent)
+        self._initialPlayer = player
+        self.vBoxLayout = QVBoxLayout(self)
+        self.timeLayout = QHBoxLayout()
+        self.buttonLayout = QHBoxLayout()
+        self.leftButtonContainer = QWidget()
+        self.centerButtonContainer = QWidget()
+        self.rightButtonContainer = QWidget()
+        self.leftButtonLayout = QHBoxLayout(self.leftButtonContainer)
+        self.centerButtonLayout = QHBoxLayout(self.centerButtonContainer)
+        self.rightButtonLayout = QHBoxLayout(self.rightButtonContainer)
+        self.skipBackButton = MediaPlayBarButton(FIF.SKIP_BACK, self)
+        self.skipForwardButton = MediaPlayBarButton(FIF.SKIP_FORWARD, self)
+        self.previousButton = MediaPlayBarButton(FIF.PAGE_LEFT, self)
+        self.nextButton = MediaPlayBarButton(FIF.PAGE_RIGHT, self)
+        self.currentTimeLabel = CaptionLabel('0:00:00', self)
+        self.remainTimeLabel = CaptionLabel('0:00:00', self)
+        self._second = -1
+        self.__initWidgets()
+
+    def __initWidgets(self):
+        self.setFixedHeight(102)
+        self.vBoxLayout.setSpacing(6)
+        self.vBoxLayout.setContentsMargins(5, 9, 5, 9)
+        self.vBoxLayout.addWidget(self.progressSlider, 1, Qt.AlignTop)
+        self.vBoxLayout.addLayout(self.timeLayout)
+        self.timeLayout.setContentsMargins(10, 0, 10, 0)
+        self.timeLayout.addWidget(self.currentTimeLabel, 0, Qt.AlignLeft)
+        self.timeLayout.addWidget(self.remainTimeLabel, 0, Qt.AlignRight)
+        self.vBoxLayout.addStretch(1)
+        self.vBoxLayout.addLayout(self.buttonLayout, 1)
+        self.buttonLayout.setContentsMargins(0, 0, 0, 0)
+        self.leftButtonLayout.setContentsMargins(4, 0, 0, 0)
+        self.centerButtonLayout.setContentsMargins(0, 0, 0, 0)
+        self.rightButtonLayout.setContentsMargins(0, 0, 4, 0)
+        self.rightButtonLayout.addWidget(self.volumeButton, 0, Qt.AlignRight)
+        self.centerButtonLayout.addWidget(self.previousButton)
+        self.centerButtonLayout.addWidget(self.skipBackButton)
+        self.centerButtonLayout.addWidget(self.playButton)
+        self.centerButtonLayout.addWidget(self.skipForwardButton)
+        self.centerButtonLayout.addWidget(self.nextButton)
+        self.previousButton.setToolTip(self.tr('上一首'))
+        self.nextButton.setToolTip(self.tr('下一首'))
+        self.buttonLayout.addWidget(self.leftButtonContainer, 0, Qt.AlignLeft)
+        self.buttonLayout.addWidget(self.centerButtonContainer, 0, Qt.AlignHCenter)
+        self.buttonLayout.addWidget(self.rightButtonContainer, 0, Qt.AlignRight)
+        self.setMediaPlayer(self._initialPlayer or MediaPlayer(self))
+        self.skipBackButton.clicked.connect(lambda: self.skipBack(10000))
+        self.skipForwardButton.clicked.connect(lambda: self.skipForward(30000))
+        self.previousButton.clicked.connect(self.previousRequested)
+        self.nextButton.clicked.connect(self.nextRequested)
+
+    def setSource(self, source: Union[str, QUrl], start: int = 0, end: int = 0):
+        super().setSource(source, start, end)
+        self._second = -1
+        self.currentTimeLabel.setText(self._formatTime(0))
+        self.remainTimeLabel.setText(self._formatTime(0))
+
+    def skipBack(self, ms: int):
+        self.player.setPosition(self.player.position() - ms)
+
+    def skipForward(self, ms: int):
+        self.player.setPosition(self.player.position() + ms)
+
+    def _onDurationChanged(self, duration: int):
+        super()._onDurationChanged(duration)
+        self._second = -1
+
+    @tracer.timed
+    def _onPositionChanged(self, position: int):
+        super()._onPositionChanged(position)
+        second = position // 1000
+        if second == self._second:
+            return
+        self._second = second
+        self.currentTimeLabel.setText(self._formatTime(position))
+        self.remainTimeLabel.setText(self._formatTime(max(self._duration - position, 0)))
+
+    def _formatTime(self, time: int):
+        m, s = divmod(int(time) // 1000, 60)
+        h, m = divmod(m, 60)
+        return f'{h}:{m:02}:{s:02}'
+
+
+class LazyDropDownPushButton(TransparentDropDownPushButton):
+    menuFactory = None
+
+    def setMenuFactory(self, factory):
+        self.menuFactory = factory
+
+    def _showMenu(self):
+        if self.menu() is None and self.menuFactory is not None:
+            self.setMenu(self.menuFactory())
+        super()._showMenu()
+
+
+class PlayInterface(QWidget):
+    playbackRates = (0.5, 0.75, 1.0, 1.25, 1.5, 1.75, 2.0, 2.5, 3.0)
+
+    def __init__(self, coverCache: CoverCache, peakCache: PeakCache, library: Library = None,
+                 history: HistoryWriter = None, playlistPath: str = PLAYLIST_PATH, parent=None):
+        super().__init__(parent=parent)
+        self.coverCache = coverCache
+        self.library = library
+        self.history = history
+        self.session = ListeningSession()
+        self.coverLoader = CoverLoader(coverCache, self.readLyrics, self)
+        self.coverLoader.coverLoaded.connect(self.__onCoverLoaded)
+        self.waveformLoader = WaveformLoader(peakCache, self)
+        self.waveformLoader.peaksReady.connect(self.__onPeaksReady)
+        self.FileDirectory = ''
+        self.playlist = Playlist(playlistPath, parent=self)
+        self.player = GaplessMediaPlayer(self)
+        self.player.trackChanged.connect(self.__onTrackChanged)
+        self.player.playbackRateChanged.connect(self.__onPlaybackRateChanged)
+        self.player.setPitchCompensation(cfg.preservePitch.value)
+        for item in (cfg.enableDsp, cfg.preamp, cfg.equalizerGains, cfg.crossfade):
+            item.valueChanged.connect(self.__applyDspSettings)
+        self.__applyDspSettings()
+        self.speedButton = None
+        self.speedActions = {}
+        cfg.replayGain.valueChanged.connect(self.__onReplayGainChanged)
+        self.vBoxLayout = QVBoxLayout(self)
+        self.hBoxLayout = QHBoxLayout(self)
+        self.commandBar = CommandBar(self)
+        self.addButtonAdd(FIF.ADD, '打开')
+        self.hBoxLayout.addWidget(self.commandBar, 0)
+        self.commandBar.setToolButtonStyle(Qt.ToolButtonTextBesideIcon)
+        self.commandBar.addSeparator()
+        self.commandBar.addWidget(self.createDropDownButtonRepeat())
+        self.shuffleAction = Action(FIF.ROTATE, '随机', triggered=self.setShuffled, checkable=True)
+        self.shuffleAction.setChecked(self.playlist.isShuffled)
+        self.commandBar.addAction(self.shuffleAction)
+        self.commandBar.addWidget(self.createDropDownButtonSpeed())
+        self.commandBar.addSeparator()
+        self.addButtonInfo(FIF.INFO, '属性')
+        self.addButtonShare(FIF.SHARE, '分享')
+        self.standardPlayBar = StandardMediaPlayBar(self, self.player)
+        self.standardPlayBar.previousRequested.connect(self.playPrevious)
+        self.standardPlayBar.nextRequested.connect(self.playNext)
+        self.standardPlayBar.played.connect(self.__onPlayed)
+        self.standardPlayBar.paused.connect(self.__onPaused)
+        self.standardPlayBar.finished.connect(self.__onFinished)
+        self.lyricsView = LyricsView(self)
+        self.player.positionChanged.connect(self.lyricsView.setPosition)
+        self.imgLabel = ImageLabel(self)
+        self.setCover()
+        self.spectrumView = None
+        self.hoLayout = QHBoxLayout(self)
+        self.hoLayout.setContentsMargins(0, 0, 0, 0)
+        self.hoLayout.addWidget(self.imgLabel)
+        self.hoLayout.addWidget(self.standardPlayBar)
+        self.setSpectrumVisible(cfg.showSpectrum.value)
+        cfg.showSpectrum.valueChanged.connect(self.setSpectrumVisible)
+        self.standardPlayBar.volumeButton.setVolume(100)
+        self.vBoxLayout.addWidget(self.commandBar)
+        self.vBoxLayout.addWidget(self.lyricsView, 1)
+        self.vBoxLayout.addLayout(self.hoLayout)
+
+    def setSpectrumVisible(self, isVisible: bool):
+        if self.spectrumView is None:
+            if not isVisible:
+                return
+            from spectrum import SpectrumView
+            self.spectrumView = SpectrumView(self.player, self)
+            self.hoLayout.insertWidget(1, self.spectrumView)
+        self.spectrumView.setVisible(isVisible)
+
+    def setLibrary(self, library: Library):
+        self.library = library
+
+    def addButtonAdd(self, icon, text):
+        action = Action(icon, text, self)
+        action.triggered.connect(lambda: self.filePick())
+        self.commandBar.addAction(action)
+
+    def addButtonInfo(self, icon, text):
+        action = Action(icon, text, self)
+        action.triggered.connect(lambda: print(text))
+        self.commandBar.addAction(action)
+
+    def addButtonShare(self, icon, text):
+        action = Action(icon, text, self)
+        action.triggered.connect(lambda: self.OpenWith())
+        self.commandBar.addAction(action)
+
+    def createDropDownButtonRepeat(self):
+        button = LazyDropDownPushButton('循环', self, FIF.SYNC)
+        button.setMenuFactory(self.createMenuRepeat)
+        button.setFixedHeight(34)
+        setFont(button, 12)
+        return button
+
+    def createMenuRepeat(self):
+        menu = RoundMenu(parent=self)
+        group = QActionGroup(menu)
+        for mode, text in ((RepeatMode.NONE, '不循环'), (RepeatMode.ONE, '单曲循环'), (RepeatMode.ALL, '列表循环')):
+            action = Action(text, checkable=True, triggered=lambda checked, m=mode: self.setRepeatMode(m))
+            action.setChecked(self.playlist.repeatMode == mode)
+            group.addAction(action)
+            menu.addAction(action)
+        return menu
+
+    def createDropDownButtonSpeed(self):
+        self.speedButton = LazyDropDownPushButton('倍速', self, FIF.SPEED_HIGH)
+        self.speedButton.setMenuFactory(self.createMenuSpeed)
+        self.speedButton.setFixedHeight(34)
+        setFont(self.speedButton, 12)
+        return self.speedButton
+
+    def createMenuSpeed(self):
+        menu = RoundMenu(parent=self)
+        group = QActionGroup(menu)
+        for rate in self.playbackRates:
+            action = Action(f'{rate:g} ⨯', checkable=True, triggered=lambda checked, r=rate: self.setPlaybackRate(r))
+            action.setChecked(rate == self.player.playbackRate())
+            group.addAction(action)
+            menu.addAction(action)
+            self.speedActions[rate] = action
+        menu.addSeparator()
+        availability = self.player.pitchCompensationAvailability()
+        pitchAction = Action('保持音调', checkable=True, triggered=self.setPitchCompensation)
+        pitchAction.setChecked(availability == QMediaPlayer.PitchCompensationAvailability.AlwaysOn or
+                               availability == QMediaPlayer.PitchCompensationAvailability.Available and
+                               cfg.preservePitch.value)
+        pitchAction.setEnabled(availability == QMediaPlayer.PitchCompensationAvailability.Available)
+        menu.addAction(pitchAction)
+        return menu
+
+    def setPlaybackRate(self, rate: float):
+        self.player.setPlaybackRate(rate)
+        if self.library is not None and self.FileDirectory:
+            self.library.setPlaybackRate(self.FileDirectory, rate)
+
+    def setPitchCompensation(self, isEnabled: bool):
+        cfg.set(cfg.preservePitch, isEnabled)
+        self.player.setPitchCompensation(isEnabled)
+
+    def setRepeatMode(self, mode: RepeatMode):
+        self.playlist.setRepeatMode(mode)
+        self.preloadNext()
+
+    def setShuffled(self, isShuffled: bool):
+        self.playlist.setShuffled(isShuffled)
+        self.preloadNext()
+
+    def OpenWith(self):
+        args = ["C:\\Windows\\System32\\OpenWith.exe", self.trackSource(self.FileDirectory)[0].replace("/", "\\")]
+        subprocess.run(args, shell=True)
+
+    @tracer.timed
+    def filePick(self):
+        paths = QFileDialog.getOpenFileNames(self, "打开文件", cfg.musicFolder.value,
+                                             "音频文件 (*.mp3 *.acc *.wma *.wav *.ogg *.m4a *.ape *.flac *.cue);;所有文件 (*.*)")[
+            0]
+        self.openPaths(paths)
+
+    @tracer.timed
+    def openPaths(self, paths: list):
+        if paths:
+            self.playPaths(expandCuePaths(paths))
+
+    def playPaths(self, paths: list, index: int = 0):
+        self.playlist.setTracks(paths, index)
+        self.playCurrent()
+
+    def enqueue(self, paths: list):
+        isIdle = self.playlist.current() is None
+        self.playlist.enqueue(paths)
+        if isIdle:
+            self.playCurrent()
+        else:
+            self.preloadNext()
+
+    def playCurrent(self):
+        path = self.playlist.current()
+        if path:
+            self.openFile(path)
+
+    def playNext(self):
+        if self.playlist.next():
+            self.playCurrent()
+
+    def playPrevious(self):
+        if self.playlist.previous():
+            self.playCurrent()
+
+    def restore(self):
+        path = self.playlist.current()
+        if path:
+            self.startSession(path)
+            self.player.setGain(self.trackGain(path))
+            self.player.setPlaybackRate(self.trackRate(path))
+            self.standardPlayBar.setSource(*self.trackSource(path))
+            self.showTrack(path)
+            self.preloadNext()
+
+    @tracer.timed
+    def openFile(self, path: str):
+        self.startSession(path)
+        self.player.setGain(self.trackGain(path))
+        self.player.setPlaybackRate(self.trackRate(path))
+        self.standardPlayBar.setSource(*self.trackSource(path))
+        self.standardPlayBar.play()
+        self.showTrack(path)
+        self.preloadNext()
+
+    def preloadNext(self):
+        path = self.playlist.peekNext()
+        self.player.setNextGain(self.trackGain(path))
+        self.player.setNextPlaybackRate(self.trackRate(path))
+        self.player.setNextSource(*self.trackSource(path))
+
+    def startSession(self, path: str):
+        if self.session.isStarted:
+            self.endSession('skip')
+        track = self.library.track(path) if path and self.library is not None else None
+        self.session = ListeningSession(path, track['artist'] if track is not None else '')
+
+    def endSession(self, type: str):
+        self.session.suspend()
+        self.recordEvent(type)
+        self.session = ListeningSession(self.session.path, self.session.artist)
+
+    def recordEvent(self, type: str):
+        if self.history is not None and self.session.path:
+            self.history.record(type, self.session.path, self.session.artist, self.player.position(),
+                                self.session.listened())
+
+    def trackGain(self, path: str):
+        if not path or self.library is None:
+            return 0.0
+        from loudness import replayGain
+        return replayGain(self.library.track(path), cfg.replayGain.value)
+
+    def trackRate(self, path: str):
+        track = self.library.track(path) if path and self.library is not None else None
+        return track['playbackRate'] if track is not None else 1.0
+
+    def trackSource(self, path: str):
+        track = cueTrack(path) if path else None
+        if track is None:
+            return path, 0, 0
+        return track['file'], round(track['start'] * 1000), round(track['end'] * 1000)
+
+    def showTrack(self, path: str):
+        self.FileDirectory = path
+        source, start, end = self.trackSource(path)
+        self.lyricsView.setLyrics(None)
+        self.coverLoader.load(source)
+        self.standardPlayBar.progressSlider.setPeaks(None)
+        self.waveformLoader.load(source)
+
+    def __onPlaybackRateChanged(self, rate: float):
+        if self.speedButton is not None:
+            self.speedButton.setText('倍速' if rate == 1 else f'{rate:g} ⨯')
+        if rate in self.speedActions:
+            self.speedActions[rate].setChecked(True)
+
+    def __onReplayGainChanged(self):
+        self.player.setGain(self.trackGain(self.FileDirectory))
+        self.player.setNextGain(self.trackGain(self.playlist.peekNext()))
+
+    def __applyDspSettings(self):
+        stage = self.player.dspStage()
+        stage.setEqualizer(cfg.equalizerGains.value)
+        stage.setPreamp(cfg.preamp.value)
+        self.player.setCrossfade(cfg.crossfade.value * 1000)
+        self.player.setDspEnabled(cfg.enableDsp.value)
+
+    def readLyrics(self, source: str, audio):
+        if self.library is None:
+            return loadLyrics(source, audio)
+        stamp = lyricsStamp(source)
+        data = self.library.lyrics(source, stamp)
+        if data is not None:
+            return Lyrics.fromJson(data)
+        lyrics = loadLyrics(source, audio)
+        self.library.setLyrics(source, stamp, lyrics.toJson())
+        return lyrics
+
+    @tracer.timed
+    def __onCoverLoaded(self, path: str, pixmap, lyrics: Lyrics):
+        self.setCover(pixmap)
+        source, start, end = self.trackSource(self.FileDirectory)
+        if path == source and lyrics is not None:
+            self.lyricsView.setLyrics(lyrics.clip(start, end))
+
+    @tracer.timed
+    def __onPeaksReady(self, path: str, peaks, peakRate: float):
+        source, start, end = self.trackSource(self.FileDirectory)
+        if path == source:
+            first, last = round(start / 1000 * peakRate), round(end / 1000 * peakRate)
+            self.standardPlayBar.progressSlider.setPeaks(peaks[first:last or None])
+
+    def __onTrackChanged(self, url: QUrl):
+        self.endSession('finished')
+        self.playlist.next(auto=True)
+        self.startSession(self.playlist.current())
+        self.showTrack(self.playlist.current())
+        self.preloadNext()
+        if self.player.isPlaying():
+            self.__onPlayed()
+
+    def __onPlayed(self):
+        self.session.resume()
+        self.recordEvent('play')
+
+    def __onPaused(self):
+        self.session.suspend()
+        self.recordEvent('pause')
+
+    def __onFinished(self):
+        self.endSession('finished')
+        if self.playlist.next(auto=True):
+            self.playCurrent()
+
+    def setCover(self, pixmap: QPixmap = None):
+        if pixmap is None:
+            if isDarkTheme():
+                pixmap = self.coverCache.fromFile('./resource/img/AlbumDark.png')
+            else:
+                pixmap = self.coverCache.fromFile('./resource/img/AlbumLight.png')
+        self.imgLabel.setImage(pixmap)
+        self.imgLabel.setBorderRadius(10, 10, 10, 10)
+        self.imgLabel.setFixedSize(100, 100)
+
+
+class LibraryModel(QAbstractTableModel):
+    pageSize = 64
+    pageLimit = 16
+    fields = ('title', 'artist', 'album', 'duration')
+    roles = {int(Qt.DisplayRole): 'display', int(Qt.DecorationRole): 'decoration', int(Qt.ToolTipRole): 'toolTip'}
+
+    def __init__(self, library: Library, thumbnailLoader: ThumbnailLoader, iconSize: int = 32, parent=None):
+        super().__init__(parent)
+        self.library = library
+        self.thumbnailLoader = thumbnailLoader
+        self.iconSize = iconSize
+        self.headers = ['标题', '艺术家', '专辑', '时长']
+        self.paths = []
+        self.groupTitles = {}
+        self._pages = {}
+        self.thumbnailLoader.thumbnailLoaded.connect(self.__onThumbnailLoaded)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.paths)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.headers)
+
+    def headerData(self, section: int, orientation: Qt.Orientation, role: int = Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.headers[section]
+        return None
+
+    def flags(self, index: QModelIndex):
+        if index.row() in self.groupTitles:
+            return Qt.ItemIsEnabled
+        return super().flags(index)
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole):
+        if index.row() in self.groupTitles:
+            return self.groupTitles[index.row()] if role == Qt.DisplayRole and index.column() == 0 else None
+        if role not in self.roles:
+            return None
+        track = self.track(index.row())
+        if track is None:
+            return None
+        role, column = self.roles[role], index.column()
+        if role == 'decoration':
+            return self.thumbnail(track) if column == 0 else None
+        if role == 'toolTip':
+            return track['path']
+        if column == 3:
+            m, s = divmod(int(track['duration']), 60)
+            return f'{m}:{s:02}'
+        return track[self.fields[column]]
+
+    def setPaths(self, paths: list, groupTitles: dict = None):
+        self.beginResetModel()
+        self.paths = paths
+        self.groupTitles = groupTitles or {}
+        self._pages.clear()
+        self.endResetModel()
+
+    def track(self, row: int):
+        if not 0 <= row < len(self.paths):
+            return None
+        page, offset = divmod(row, self.pageSize)
+        tracks = self._pages.pop(page, None)
+        if tracks is None:
+            paths = self.paths[page * self.pageSize:(page + 1) * self.pageSize]
+            rows = self.library.tracksByPath(paths)
+            tracks = [rows.get(path) for path in paths]
+            if len(self._pages) >= self.pageLimit:
+                del self._pages[next(iter(self._pages))]
+        self._pages[page] = tracks
+        return tracks[offset]
+
+    def thumbnail(self, track):
+        key = track['coverHash']
+        if not key:
+            return None
+        cache = self.thumbnailLoader.cache
+        if cache.contains(key):
+            pixmap = cache.get(key)
+            pixmap.setDevicePixelRatio(max(pixmap.width(), pixmap.height()) / self.iconSize)
+            return pixmap
+        self.thumbnailLoader.request(key, track['path'])
+        return None
+
+    def __onThumbnailLoaded(self, key: str):
+        if self.paths:
+            self.dataChanged.emit(self.index(0, 0), self.index(len(self.paths) - 1, 0), [Qt.DecorationRole])
+
+
+class ListInterface(QWidget):
+    playRequested = Signal(list, int)
+    enqueueRequested = Signal(list)
+
+    def __init__(self, library: Library, scanner: LibraryScanner, analyzer: 'LoudnessAnalyzer',
+                 finder: 'DuplicateFinder', parent=None):
+        from search import SearchIndex
+        from library import SearchIndexLoader
+        super().__init__(parent=parent)
+        self.library = library
+        self.scanner = scanner
+        self.analyzer = analyzer
+        self.finder = finder
+        self.searchIndex = SearchIndex()
+        self.searchLoader = SearchIndexLoader(library, parent=self)
+        self.pendingChanges = None
+        self.thumbnailCache = CoverCache(os.path.join(CACHE_FOLDER, 'thumbnails'), 64, 4 * 1024 * 1024)
+        self.thumbnailLoader = ThumbnailLoader(self.thumbnailCache, parent=self)
+        self.model = LibraryModel(library, self.thumbnailLoader, parent=self)
+        self.vBoxLayout = QVBoxLayout(self)
+        self.hBoxLayout = QHBoxLayout()
+        self.commandBar = CommandBar(self)
+        self.scanAction = Action(FIF.SYNC, '扫描', triggered=self.rescan)
+        self.cancelAction = Action(FIF.CANCEL, '停止', triggered=self.scanner.cancel, enabled=False)
+        self.enqueueAction = Action(FIF.ADD_TO, '加入队列', triggered=self.enqueueSelection)
+        self.analyzeAction = Action(FIF.MIX_VOLUMES, '响度分析', triggered=self.analyzer.analyze)
+        self.duplicateAction = Action(FIF.COPY, '查找重复', triggered=self.finder.find)
+        self.countLabel = CaptionLabel(self)
+        self.searchLineEdit = SearchLineEdit(self)
+        self.refreshTimer = QTimer(self)
+        self.tableView = TableView(self)
+        self.__initWidget()
+        self.reload()
+
+    @property
+    def paths(self):
+        return self.model.paths
+
+    def __initWidget(self):
+        self.commandBar.setToolButtonStyle(Qt.ToolButtonTextBesideIcon)
+        self.commandBar.addAction(self.scanAction)
+        self.commandBar.addAction(self.cancelAction)
+        self.commandBar.addAction(self.enqueueAction)
+        self.commandBar.addAction(self.analyzeAction)
+        self.commandBar.addAction(self.duplicateAction)
+        self.commandBar.addSeparator()
+        self.commandBar.addWidget(self.countLabel)
+        self.searchLineEdit.setPlaceholderText('搜索标题、艺术家、专辑或路径')
+        self.searchLineEdit.setFixedWidth(240)
+        self.searchLineEdit.textChanged.connect(self.refresh)
+        self.searchLoader.indexLoaded.connect(self.__onIndexLoaded)
+        self.refreshTimer.setSingleShot(True)
+        self.refreshTimer.setInterval(300)
+        self.refreshTimer.timeout.connect(self.refresh)
+        self.tableView.setModel(self.model)
+        self.tableView.setIconSize(QSize(32, 32))
+        self.tableView.setWordWrap(False)
+        self.tableView.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.tableView.horizontalHeader().setSectionResizeMode(3, QHeaderView.Fixed)
+        self.tableView.horizontalHeader().resizeSection(3, 72)
+        self.tableView.verticalHeader().hide()
+        self.tableView.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.tableView.verticalHeader().setDefaultSectionSize(40)
+        self.tableView.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.tableView.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.tableView.doubleClicked.connect(lambda index: self.playRow(index.row()))
+        self.hBoxLayout.addWidget(self.commandBar, 1)
+        self.hBoxLayout.addWidget(self.searchLineEdit)
+        self.vBoxLayout.setContentsMargins(0, 0, 0, 0)
+        self.vBoxLayout.addLayout(self.hBoxLayout)
+        self.vBoxLayout.addWidget(self.tableView)
+        self.scanner.started.connect(self.__onScanStarted)
+        self.scanner.progressChanged.connect(self.__onScanProgressChanged)
+        self.scanner.tracksFound.connect(self.__onTracksFound)
+        self.scanner.tracksRemoved.connect(self.__onTracksRemoved)
+        self.scanner.finished.connect(self.__onScanFinished)
+        self.analyzer.started.connect(self.__onAnalysisStarted)
+        self.analyzer.progressChanged.connect(self.__onAnalysisProgressChanged)
+        self.analyzer.finished.connect(self.__onAnalysisFinished)
+        self.finder.started.connect(self.__onFindStarted)
+        self.finder.progressChanged.connect(self.__onFindProgressChanged)
+        self.finder.duplicatesFound.connect(self.__onDuplicatesFound)
+        self.finder.finished.connect(self.__onFindFinished)
+        if self.scanner.isRunning():
+            self.__onScanStarted()
+        if self.analyzer.isRunning():
+            self.__onAnalysisStarted()
+        if self.finder.isRunning():
+            self.__onFindStarted()
+
+    def reload(self):
+        self.pendingChanges = []
+        self.setCountText('加载中...')
+        self.searchLoader.load()
+
+    def refresh(self):
+        self.refreshTimer.stop()
+        paths = self.searchIndex.search(self.searchLineEdit.text())
+        self.setPaths(paths)
+        if self.scanner.isRunning() or self.analyzer.isRunning() or self.finder.isRunning():
+            return
+        if self.pendingChanges is not None:
+            self.setCountText('加载中...')
+        elif len(paths) == len(self.searchIndex):
+            self.setCountText(f'{len(paths)} 首')
+        else:
+            self.setCountText(f'{len(paths)}/{len(self.searchIndex)} 首')
+
+    def setPaths(self, paths: list, groupTitles: dict = None):
+        self.model.setPaths(paths, groupTitles)
+        self.tableView.clearSpans()
+        for row in self.model.groupTitles:
+            self.tableView.setSpan(row, 0, 1, self.model.columnCount())
+
+    def rescan(self):
+        self.scanner.scan(cfg.musicFolder.value)
+
+    def playRow(self, row: int):
+        if row in self.model.groupTitles:
+            return
+        paths = [path for i, path in enumerate(self.paths[:]) if i not in self.model.groupTitles]
+        self.playRequested.emit(paths, row - sum(i < row for i in self.model.groupTitles))
+
+    def enqueueSelection(self):
+        rows = sorted(index.row() for index in self.tableView.selectionModel().selectedRows())
+        paths = [self.paths[row] for row in rows if row not in self.model.groupTitles]
+        if paths:
+            self.enqueueRequested.emit(paths)
+
+    def setCountText(self, text: str):
+        self.countLabel.setText(text)
+        self.countLabel.adjustSize()
+
+    def __onScanStarted(self):
+        self.scanAction.setEnabled(False)
+        self.cancelAction.setEnabled(True)
+        self.setCountText('扫描中...')
+
+    def __onScanProgressChanged(self, done: int, total: int):
+        if total:
+            self.setCountText(f'扫描中 {done}/{total}')
+
+    def __onIndexLoaded(self, index):
+        for method, args in self.pendingChanges:
+            getattr(index, method)(args)
+        self.searchIndex, self.pendingChanges = index, None
+        self.refresh()
+
+    def __onTracksFound(self, infos: list):
+        self.searchIndex.update(infos)
+        if self.pendingChanges is not None:
+            self.pendingChanges.append(('update', infos))
+        self.refreshTimer.start()
+
+    def __onTracksRemoved(self, paths: list):
+        self.searchIndex.remove(paths)
+        if self.pendingChanges is not None:
+            self.pendingChanges.append(('remove', paths))
+        self.refreshTimer.start()
+
+    def __onScanFinished(self):
+        self.scanAction.setEnabled(True)
+        self.cancelAction.setEnabled(False)
+        self.refresh()
+
+    def __onAnalysisStarted(self):
+        self.analyzeAction.setEnabled(False)
+        self.setCountText('响度分析中...')
+
+    def __onAnalysisProgressChanged(self, done: int, total: int):
+        if total:
+            self.setCountText(f'响度分析 {done}/{total}')
+
+    def __onAnalysisFinished(self):
+        self.analyzeAction.setEnabled(True)
+        if not self.scanner.isRunning():
+            self.refresh()
+
+    def __onFindStarted(self):
+        self.duplicateAction.setEnabled(False)
+        self.setCountText('查找重复中...')
+
+    def __onFindProgressChanged(self, done: int, total: int):
+        if total:
+            self.setCountText(f'指纹计算 {done}/{total}')
+
+    def __onDuplicatesFound(self, clusters: list):
+        if not clusters:
+            self.refresh()
+            self.setCountText('未发现重复')
+            return
+        self.refreshTimer.stop()
+        paths, groupTitles = [], {}
+        for i, cluster in enumerate(clusters, 1):
+            groupTitles[len(paths)] = f'重复组 {i} · {len(cluster)} 首'
+            paths.append('')
+            paths.extend(cluster)
+        self.setPaths(paths, groupTitles)
+        self.setCountText(f'{len(clusters)} 组重复')
+
+    def __onFindFinished(self):
+        self.duplicateAction.setEnabled(True)
+        if self.finder.isCanceled() and not self.scanner.isRunning():
+            self.refresh()
+
+
+class StatsInterface(QWidget):
+    playRequested = Signal(list, int)
+
+    def __init__(self, library: Library, history: History, writer: HistoryWriter, parent=None):
+        super().__init__(parent=parent)
+        self.library = library
+        self.history = history
+        self.writer = writer
+        self.paths = []
+        self.vBoxLayout = QVBoxLayout(self)
+        self.hBoxLayout = QHBoxLayout()
+        self.tableLayout = QHBoxLayout()
+        self.periodComboBox = ComboBox(self)
+        self.summaryLabel = CaptionLabel(self)
+        self.trackTable = TableWidget(self)
+        self.artistTable = TableWidget(self)
+        self.__initWidget()
+
+    def __initWidget(self):
+        for text, period in (('本周', 'week'), ('近四周', 'month'), ('今年', 'year'), ('全部', 'all')):
+            self.periodComboBox.addItem(text, userData=period)
+        self.periodComboBox.currentIndexChanged.connect(self.refresh)
+        self.__initTable(self.trackTable, ['标题', '艺术家', '播放', '时长'])
+        self.__initTable(self.artistTable, ['艺术家', '播放', '时长'])
+        self.trackTable.doubleClicked.connect(lambda index: self.playRequested.emit(self.paths, index.row()))
+        self.hBoxLayout.setContentsMargins(0, 0, 0, 0)
+        self.hBoxLayout.addWidget(self.periodComboBox)
+        self.hBoxLayout.addWidget(self.summaryLabel, 1)
+        self.tableLayout.addWidget(self.trackTable, 3)
+        self.tableLayout.addWidget(self.artistTable, 2)
+        self.vBoxLayout.setContentsMargins(0, 0, 0, 0)
+        self.vBoxLayout.addLayout(self.hBoxLayout)
+        self.vBoxLayout.addLayout(self.tableLayout, 1)
+        self.writer.batchWritten.connect(self.__onBatchWritten)
+
+    def __initTable(self, table: TableWidget, headers: list):
+        table.setColumnCount(len(headers))
+        table.setHorizontalHeaderLabels(headers)
+        table.setWordWrap(False)
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        for column in range(len(headers) - 2, len(headers)):
+            table.horizontalHeader().setSectionResizeMode(column, QHeaderView.ResizeToContents)
+        table.verticalHeader().hide()
+        table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        table.setSelectionBehavior(QAbstractItemView.SelectRows)
+
+    def since(self):
+        period, today = self.periodComboBox.currentData(), date.today()
+        if period == 'week':
+            return weekOf(today)
+        if period == 'month':
+            return weekOf(today) - 21
+        if period == 'year':
+            return weekOf(today.replace(month=1, day=1))
+        return 0
+
+    def refresh(self):
+        since = self.since()
+        tracks = self.history.topTracks(since)
+        rows = self.library.tracksByPath([track['path'] for track in tracks])
+        self.paths = [track['path'] for track in tracks]
+        self.__fillTable(self.trackTable, [
+            (rows[track['path']]['title'] if track['path'] in rows else os.path.basename(track['path']),
+             rows[track['path']]['artist'] if track['path'] in rows else '', track['plays'], track['listened'])
+            for track in tracks])
+        self.__fillTable(self.artistTable, [(artist['artist'], artist['plays'], artist['listened'])
+                                            for artist in self.history.topArtists(since)])
+        plays, listened = self.history.totals(since)
+        self.summaryLabel.setText(f'{plays} 次播放 · {self.formatListened(listened)}')
+
+    def formatListened(self, listened: int):
+        hours, minutes = divmod(listened // 60000, 60)
+        return f'{hours} 小时 {minutes} 分' if hours else f'{minutes} 分'
+
+    def __fillTable(self, table: TableWidget, rows: list):
+        table.setRowCount(len(rows))
+        for row, values in enumerate(rows):
+            *texts, plays, listened = values
+            for column, text in enumerate((*texts, str(plays), self.formatListened(listened))):
+                table.setItem(row, column, QTableWidgetItem(text))
+
+    def __onBatchWritten(self):
+        if self.isVisible():
+            self.refresh()
+
+    def showEvent(self, e):
+        super().showEvent(e)
+        self.refresh()
+
+
+class CustomColorSettingCard(ExpandGroupSettingCard):
+    colorChanged = Signal(QColor)
+
+    def __init__(self, configItem: ColorConfigItem, icon: Union[str, QIcon, FluentIconBase], title: str, content=None,
+                 parent=None, enableAlpha=False):
+        super().__init__(icon, title, content, parent=parent)
+        self.enableAlpha = enableAlpha
+        self.configItem = configItem
+        self.defaultColor = QColor(configItem.defaultValue)
+        self.customColor = QColor(qconfig.get(configItem))
+        self.choiceLabel = QLabel(self)
+        self.radioWidget = QWidget(self.view)
+        self.radioLayout = QVBoxLayout(self.radioWidget)
+        self.defaultRadioButton = RadioButton(self.tr('默认'), self.radioWidget)
+        self.customRadioButton = RadioButton(self.tr('自定义'), self.radioWidget)
+        self.buttonGroup = QButtonGroup(self)
+        self.customColorWidget = QWidget(self.view)
+        self.customColorLayout = QHBoxLayout(self.customColorWidget)
+        self.customLabel = QLabel(self.tr('自定义'), self.customColorWidget)
+        self.chooseColorButton = QPushButton(self.tr('选择颜色'), self.customColorWidget)
+        self.__initWidget()
+
+    def __initWidget(self):
+        self.__initLayout()
+        if self.defaultColor != self.customColor:
+            self.customRadioButton.setChecked(True)
+            self.chooseColorButton.setEnabled(True)
+        else:
+            self.defaultRadioButton.setChecked(True)
+            self.chooseColorButton.setEnabled(False)
+        self.choiceLabel.setText(self.buttonGroup.checkedButton().text())
+        self.choiceLabel.adjustSize()
+        self.chooseColorButton.setObjectName('chooseColorButton')
+        self.buttonGroup.buttonClicked.connect(self.__onRadioButtonClicked)
+        self.chooseColorButton.clicked.connect(self.__showColorDialog)
+
+    def __initLayout(self):
+        self.addWidget(self.choiceLabel)
+
+        self.radioLayout.setSpacing(19)
+        self.radioLayout.setAlignment(Qt.AlignTop)
+        self.radioLayout.setContentsMargins(48, 18, 0, 18)
+        self.buttonGroup.addButton(self.customRadioButton)
+        self.buttonGroup.addButton(self.defaultRadioButton)
+        self.radioLayout.addWidget(self.customRadioButton)
+        self.radioLayout.addWidget(self.defaultRadioButton)
+        self.radioLayout.setSizeConstraint(QVBoxLayout.SetMinimumSize)
+
+        self.customColorLayout.setContentsMargins(48, 18, 44, 18)
+        self.customColorLayout.addWidget(self.customLabel, 0, Qt.AlignLeft)
+        self.customColorLayout.addWidget(self.chooseColorButton, 0, Qt.AlignRight)
+        self.customColorLayout.setSizeConstraint(QHBoxLayout.SetMinimumSize)
+
+        self.viewLayout.setSpacing(0)
+        self.viewLayout.setContentsMargins(0, 0, 0, 0)
+        self.addGroupWidget(self.radioWidget)
+        self.addGroupWidget(self.customColorWidget)
+
+    def __onRadioButtonClicked(self, button: RadioButton):
+        if button.text() == self.choiceLabel.text():
+            return
+        self.choiceLabel.setText(button.text())
+        self.choiceLabel.adjustSize()
+        if button is self.defaultRadioButton:
+            self.chooseColorButton.setDisabled(True)
+            qconfig.set(self.configItem, self.defaultColor)
+            if self.defaultColor != self.customColor:
+                self.colorChanged.emit(self.defaultColor)
+        else:
+            self.chooseColorButton.setDisabled(False)
+            qconfig.set(self.configItem, self.customColor)
+            if self.defaultColor != self.customColor:
+                self.colorChanged.emit(self.customColor)
+
+    def __showColorDialog(self):
+        from qfluentwidgets import ColorDialog
+
+        w = ColorDialog(qconfig.get(self.configItem), self.tr('选择颜色'), self.window(), self.enableAlpha)
+        w.colorChanged.connect(self.__onCustomColorChanged)
+        w.exec()
+
+    def __onCustomColorChanged(self, color):
+        qconfig.set(self.configItem, color)
+        self.customColor = QColor(color)
+        self.colorChanged.emit(color)
+
+
+class PresetNameDialog(MessageBoxBase):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.titleLabel = SubtitleLabel(self.tr('保存预设'), self)
+        self.nameLineEdit = LineEdit(self)
+        self.nameLineEdit.setPlaceholderText(self.tr('预设名称'))
+        self.nameLineEdit.setClearButtonEnabled(True)
+        self.viewLayout.addWidget(self.titleLabel)
+        self.viewLayout.addWidget(self.nameLineEdit)
+        self.yesButton.setText(self.tr('保存'))
+        self.cancelButton.setText(self.tr('取消'))
+        self.widget.setMinimumWidth(320)
+
+    def validate(self):
+        return bool(self.nameLineEdit.text().strip())
+
+
+class EqualizerSettingCard(ExpandGroupSettingCard):
+    presetTexts = {'Flat': '平直', 'Bass': '低音增强', 'Treble': '高音增强', 'Vocal': '人声', 'Rock': '摇滚',
+                   'Classical': '古典', 'Electronic': '电子', 'Custom': '自定义'}
+
+    def __init__(self, icon: Union[str, QIcon, FluentIconBase], title: str, content=None, parent=None):
+        super().__init__(icon, title, content, parent=parent)
+        self.presetComboBox = ComboBox(self)
+        self.saveButton = PushButton(self.tr('保存预设'), self)
+        self.bandWidget = QWidget(self.view)
+        self.bandLayout = QHBoxLayout(self.bandWidget)
+        self.sliders = []
+        self.isSettingSliders = False
+        self.__initWidget()
+
+    def __initWidget(self):
+        self.addWidget(self.presetComboBox)
+        self.addWidget(self.saveButton)
+        self.bandLayout.setContentsMargins(48, 18, 44, 18)
+        self.bandLayout.setSpacing(12)
+        for frequency in EQ_FREQUENCIES:
+            column = QVBoxLayout()
+            slider = Slider(Qt.Vertical, self.bandWidget)
+            slider.setRange(-EQ_RANGE, EQ_RANGE)
+            slider.setFixedHeight(140)
+            slider.valueChanged.connect(self.__onSliderValueChanged)
+            label = CaptionLabel(f'{frequency:g}' if frequency < 1000 else f'{frequency / 1000:g}k', self.bandWidget)
+            column.addWidget(slider, 0, Qt.AlignHCenter)
+            column.addWidget(label, 0, Qt.AlignHCenter)
+            self.bandLayout.addLayout(column)
+            self.sliders.append(slider)
+        self.addGroupWidget(self.bandWidget)
+        self.__loadPresets()
+        self.__setSliderValues(cfg.equalizerGains.value)
+        self.presetComboBox.currentIndexChanged.connect(self.__onPresetChanged)
+        self.saveButton.clicked.connect(self.__savePreset)
+
+    def __loadPresets(self):
+        self.presetComboBox.blockSignals(True)
+        self.presetComboBox.clear()
+        for name in [*cfg.equalizerPresets.value, 'Custom']:
+            self.presetComboBox.addItem(self.tr(self.presetTexts.get(name, name)), userData=name)
+        preset = cfg.equalizerPreset.value
+        if preset not in cfg.equalizerPresets.value:
+            gains = [round(gain) for gain in cfg.equalizerGains.value]
+            preset = next((name for name, values in cfg.equalizerPresets.value.items() if values == gains), 'Custom')
+        self.presetComboBox.setCurrentIndex(max(self.presetComboBox.findData(preset), 0))
+        self.presetComboBox.blockSignals(False)
+
+    def gains(self):
+        return [-slider.value() for slider in self.sliders]
+
+    def __setSliderValues(self, gains):
+        self.isSettingSliders = True
+        for slider, gain in zip(self.sliders, gains):
+            slider.setValue(-round(gain))
+        self.isSettingSliders = False
+
+    def __onPresetChanged(self, index: int):
+        name = self.presetComboBox.itemData(index)
+        cfg.set(cfg.equalizerPreset, name)
+        if name in cfg.equalizerPresets.value:
+            gains = list(cfg.equalizerPresets.value[name])
+            self.__setSliderValues(gains)
+            cfg.set(cfg.equalizerGains, gains)
+
+    def __onSliderValueChanged(self):
+        if self.isSettingSliders:
+            return
+        cfg.set(cfg.equalizerGains, self.gains())
+        index = self.presetComboBox.findData('Custom')
+        if self.presetComboBox.currentIndex() != index:
+            self.presetComboBox.blockSignals(True)
+            self.presetComboBox.setCurrentIndex(index)
+            self.presetComboBox.blockSignals(False)
+            cfg.set(cfg.equalizerPreset, 'Custom')
+
+    def __savePreset(self):
+        dialog = PresetNameDialog(self.window())
+        if not dialog.exec():
+            return
+        name = dialog.nameLineEdit.text().strip()
+        presets = dict(cfg.equalizerPresets.value)
+        presets[name] = self.gains()
+        cfg.set(cfg.equalizerPresets, presets)
+        cfg.set(cfg.equalizerPreset, name)
+        self.__loadPresets()
+
+
+class SettingInterface(ScrollArea):
+    acrylicEnableChanged = Signal(bool)
+    musicFolderChanged = Signal(list)
+
+    def __init__(self, parent=None):
+        super().__init__(parent=parent)
+        self.scrollWidget = QWidget()
+        self.expandLayout = ExpandLayout(self.scrollWidget)
+        self.personalGroup = SettingCardGroup(self.tr('设置'), self.scrollWidget)
+        self.enableAcrylicCard = SwitchSettingCard(
+            FIF.TRANSPARENT,
+            self.tr("透明效果"),
+            self.tr("窗口和表面显示半透明"),
+            configItem=cfg.enableAcrylicBackground,
+            parent=self.personalGroup)
+        self.themeColorCard = CustomColorSettingCard(
+            cfg.themeColor,
+            FIF.PALETTE,
+            self.tr('主题色'),
+            self.tr('更改应用主题色'),
+            self.personalGroup)
+        self.musicFolderCard = PushSettingCard(
+            self.tr('选择文件夹'),
+            FIF.MUSIC_FOLDER,
+            self.tr("音乐文件夹"),
+            cfg.get(cfg.musicFolder),
+            self.personalGroup)
+        self.replayGainCard = ComboBoxSettingCard(
+            cfg.replayGain,
+            FIF.MIX_VOLUMES,
+            self.tr('音量标准化'),
+            self.tr('按 ReplayGain 响度信息调整播放音量'),
+            texts=[self.tr('关闭'), self.tr('单曲'), self.tr('专辑')],
+            parent=self.personalGroup)
+        self.showSpectrumCard = SwitchSettingCard(
+            FIF.MARKET,
+            self.tr('频谱'),
+            self.tr('在封面旁显示实时频谱'),
+            configItem=cfg.showSpectrum,
+            parent=self.personalGroup)
+        self.audioGroup = SettingCardGroup(self.tr('音效'), self.scrollWidget)
+        self.enableDspCard = SwitchSettingCard(
+            FIF.MIX_VOLUMES,
+            self.tr('音效处理'),
+            self.tr('启用均衡器、前级增益和交叉淡入淡出'),
+            configItem=cfg.enableDsp,
+            parent=self.audioGroup)
+        self.crossfadeCard = RangeSettingCard(
+            cfg.crossfade,
+            FIF.SYNC,
+            self.tr('交叉淡入淡出'),
+            self.tr('切换曲目时淡入淡出的秒数，0 为关闭'),
+            self.audioGroup)
+        self.preampCard = RangeSettingCard(
+            cfg.preamp,
+            FIF.VOLUME,
+            self.tr('前级增益'),
+            self.tr('均衡器之前的增益 (dB)，提升频段时可调低以避免削波'),
+            self.audioGroup)
+        self.equalizerCard = EqualizerSettingCard(
+            FIF.MUSIC,
+            self.tr('均衡器'),
+            self.tr('调整 31 Hz 到 16 kHz 的十个频段'),
+            self.audioGroup)
+        self.aboutGroup = SettingCardGroup(self.tr('关于'), self.scrollWidget)
+        self.helpCard = HyperlinkCard(
+            HELP_URL,
+            self.tr('打开帮助'),
+            FIF.HELP,
+            self.tr('帮助'),
+            self.tr('获取提示与帮助'),
+            self.aboutGroup)
+        self.aboutCard = ExpandSettingCard(
+            FIF.INFO,
+            self.tr('关于'),
+            self.tr('MusePlayer'),
+            self.aboutGroup)
+        self.aboutCard.viewLayout.addWidget(
+            QLabel("MusePlayer (v1.1.0)\nCopyright © 2024 BUG STUDIO. All rights reserved."))
+        self.__initWidget()
+
+    def __initWidget(self):
+        self.resize(1000, 800)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.setViewportMargins(0, 20, 0, 20)
+        self.setWidget(self.scrollWidget)
+        self.setWidgetResizable(True)
+        self.scrollWidget.setObjectName('scrollWidget')
+        self.__initLayout()
+        self.__connectSignalToSlot()
+
+    def __initLayout(self):
+        self.personalGroup.addSettingCard(self.enableAcrylicCard)
+        self.personalGroup.addSettingCard(self.themeColorCard)
+        self.personalGroup.addSettingCard(self.musicFolderCard)
+        self.personalGroup.addSettingCard(self.replayGainCard)
+        self.personalGroup.addSettingCard(self.showSpectrumCard)
+        self.audioGroup.addSettingCard(self.enableDspCard)
+        self.audioGroup.addSettingCard(self.crossfadeCard)
+        self.audioGroup.addSettingCard(self.preampCard)
+        self.audioGroup.addSettingCard(self.equalizerCard)
+        self.aboutGroup.addSettingCard(self.helpCard)
+        self.aboutGroup.addSettingCard(self.aboutCard)
+        self.expandLayout.setSpacing(28)
+        self.expandLayout.setContentsMargins(60, 10, 60, 0)
+        self.expandLayout.addWidget(self.personalGroup)
+        self.expandLayout.addWidget(self.audioGroup)
+        self.expandLayout.addWidget(self.aboutGroup)
+
+    def __showRestartTooltip(self):
+        InfoBar.warning(
+            '',
+            self.tr('重启后生效'),
+            parent=self.window())
+
+    def __onMusicFolderCardClicked(self):
+        folder = QFileDialog.getExistingDirectory(self, self.tr("选择文件夹"), "./")
+        if not folder or cfg.get(cfg.musicFolder) == folder:
+            return
+        cfg.set(cfg.musicFolder, folder)
+        self.musicFolderCard.setContent(folder)
+
+    def __connectSignalToSlot(self):
+        cfg.appRestartSig.connect(self.__showRestartTooltip)
+        self.musicFolderCard.clicked.connect(self.__onMusicFolderCardClicked)
+        self.enableAcrylicCard.checkedChanged.connect(self.acrylicEnableChanged)
+        self.themeColorCard.colorChanged.connect(setThemeColor)
+
+
+class InstanceServer(QObject):
+    filesReceived = Signal(list)
+
+    def __init__(self, parent=None):
+        super().__init__(parent=parent)
+        self.server = QLocalServer(self)
+        self.server.setSocketOptions(QLocalServer.UserAccessOption)
+        self.server.newConnection.connect(self.__onNewConnection)
+
+    def listen(self):
+        if isServerRunning():
+            return False
+        QLocalServer.removeServer(SERVER_PATH)
+        return self.server.listen(SERVER_PATH)
+
+    def __onNewConnection(self):
+        while self.server.hasPendingConnections():
+            socket = self.server.nextPendingConnection()
+            socket.readyRead.connect(lambda socket=socket: self.__read(socket))
+            socket.disconnected.connect(socket.deleteLater)
+            self.__read(socket)
+
+    def __read(self, socket: QLocalSocket):
+        while socket.canReadLine():
+            self.filesReceived.emit(decodePaths(bytes(socket.readLine())))
+
+
+class Window(FramelessWindow):
+    firstPainted = Signal()
+    startupFinished = Signal()
+
+    def __init__(self):
+        super().__init__()
+        self.isPainted = False
+        self.isStarted = False
+        self.pendingPaths = []
+        self.lazyInterfaces = {}
+        self.styleSheetManager = StyleSheetManager(self, parent=self)
+        self.setQss()
+        self.setTitleBar(StandardTitleBar(self))
+        self.vBoxLayout = QVBoxLayout(self)
+        self.library = None
+        self.scanner = None
+        self.watcher = None
+        self.analyzer = None
+        self.finder = None
+        self.historyWriter = HistoryWriter(parent=self)
+        self.coverCache = CoverCache()
+        self.peakCache = PeakCache()
+        startupProfiler.mark('styles and caches')
+        self.playInterface = PlayInterface(self.coverCache, self.peakCache, history=self.historyWriter, parent=self)
+        self.listInterface = None
+        self.statsInterface = None
+        self.settingInterface = None
+        startupProfiler.mark('play interface')
+        self.vBoxLayout.setContentsMargins(0, 0, 0, 0)
+        self.pivot = SegmentedWidget(self)
+        self.stackedWidget = QStackedWidget(self)
+        self.veBoxLayout = QVBoxLayout(self)
+        self.addSubInterface(self.playInterface, 'playInterface', '播放')
+        self.addLazySubInterface(self.createListInterface, 'listInterface', '列表')
+        self.addLazySubInterface(self.createStatsInterface, 'statsInterface', '统计')
+        self.addLazySubInterface(self.createSettingInterface, 'settingInterface', '设置')
+        self.veBoxLayout.addWidget(self.pivot)
+        self.veBoxLayout.addWidget(self.stackedWidget)
+        self.veBoxLayout.setContentsMargins(30, 10, 30, 30)
+        self.stackedWidget.setCurrentWidget(self.playInterface)
+        self.pivot.setCurrentItem(self.playInterface.objectName())
+        self.pivot.currentItemChanged.connect(self.switchTo)
+        self.PivotLayout = QHBoxLayout(self)
+        self.PivotLayout.addWidget(self.pivot)
+        self.PivotLayout.setContentsMargins(100, 0, 100, 0)
+        self.vBoxLayout.addWidget(self.titleBar)
+        self.vBoxLayout.addLayout(self.PivotLayout)
+        self.vBoxLayout.addWidget(self.stackedWidget)
+        self.vBoxLayout.setAlignment(Qt.AlignCenter)
+        self.setWindowIcon(QIcon("./resource/img/icon.png"))
+        self.setWindowTitle("MusePlayer")
+        self.resize(730, 260)
+        desktop = QApplication.screens()[0].size()
+        self.move(desktop.width() // 2 - self.width() // 2, desktop.height() // 2 - self.height() // 2)
+        self.titleBar.raise_()
+        cfg.themeChanged.connect(self.__onThemeChanged)
+        cfg.musicFolder.valueChanged.connect(self.__onMusicFolderChanged)
+        self.firstPainted.connect(lambda: QTimer.singleShot(0, self.__onStartupFinished))
+        self.KeyOpen()
+        self.KeyPlayAndPause()
+        self.KeySetting()
+        self.KeyPage1()
+        self.KeyPage2()
+        self.KeyPage3()
+        self.KeyPage4()
+
+    def KeyOpen(self):
+        shortcut = QShortcut(QKeySequence("Ctrl+O"), self)
+        shortcut.activated.connect(lambda: self.playInterface.filePick())
+
+    def KeyPlayAndPause(self):
+        shortcut = QShortcut(QKeySequence("Space"), self)
+        shortcut.activated.connect(lambda: self.playInterface.standardPlayBar.togglePlayState())
+
+    def KeySetting(self):
+        shortcut = QShortcut(QKeySequence("Ctrl+,"), self)
+        shortcut.activated.connect(lambda: self.pivot.setCurrentItem('settingInterface'))
+
+    def KeyPage1(self):
+        shortcut = QShortcut(QKeySequence("Ctrl+1"), self)
+        shortcut.activated.connect(lambda: self.pivot.setCurrentItem(self.playInterface.objectName()))
+
+    def KeyPage2(self):
+        shortcut = QShortcut(QKeySequence("Ctrl+2"), self)
+        shortcut.activated.connect(lambda: self.pivot.setCurrentItem('listInterface'))
+
+    def KeyPage3(self):
+        shortcut = QShortcut(QKeySequence("Ctrl+3"), self)
+        shortcut.activated.connect(lambda: self.pivot.setCurrentItem('statsInterface'))
+
+    def KeyPage4(self):
+        shortcut = QShortcut(QKeySequence("Ctrl+4"), self)
+        shortcut.activated.connect(lambda: self.pivot.setCurrentItem('settingInterface'))
+
+    def playTracks(self, paths: list, index: int):
+        self.playInterface.playPaths(paths, index)
+        self.pivot.setCurrentItem(self.playInterface.objectName())
+
+    def loadLibrary(self):
+        if self.library is None:
+            self.library = Library()
+            self.scanner = LibraryScanner(self.library, self)
+            self.watcher = LibraryWatcher(self.scanner, parent=self)
+            self.playInterface.setLibrary(self.library)
+        return self.library
+
+    def createListInterface(self):
+        from loudness import LoudnessAnalyzer
+        from fingerprint import DuplicateFinder
+        self.loadLibrary()
+        self.analyzer = LoudnessAnalyzer(self.library, self)
+        self.finder = DuplicateFinder(self.library, self)
+        self.listInterface = ListInterface(self.library, self.scanner, self.analyzer, self.finder, self)
+        self.listInterface.playRequested.connect(self.playTracks)
+        self.listInterface.enqueueRequested.connect(self.playInterface.enqueue)
+        return self.listInterface
+
+    def createStatsInterface(self):
+        self.loadLibrary()
+        self.statsInterface = StatsInterface(self.library, History(), self.historyWriter, self)
+        self.statsInterface.playRequested.connect(self.playTracks)
+        return self.statsInterface
+
+    def createSettingInterface(self):
+        self.settingInterface = SettingInterface(self)
+        return self.settingInterface
+
+    def addSubInterface(self, widget: QWidget, objectName, text):
+        widget.setObjectName(objectName)
+        self.stackedWidget.addWidget(widget)
+        self.pivot.addItem(routeKey=objectName, text=text)
+
+    def addLazySubInterface(self, factory, objectName, text):
+        placeholder = QWidget(self)
+        self.lazyInterfaces[objectName] = (placeholder, factory)
+        self.addSubInterface(placeholder, objectName, text)
+
+    def switchTo(self, objectName: str):
+        if objectName in self.lazyInterfaces:
+            placeholder, factory = self.lazyInterfaces.pop(objectName)
+            widget = factory()
+            index = self.stackedWidget.indexOf(placeholder)
+            self.stackedWidget.removeWidget(placeholder)
+            placeholder.setParent(None)
+            widget.setObjectName(objectName)
+            self.stackedWidget.insertWidget(index, widget)
+            self.stackedWidget.setCurrentWidget(widget)
+        else:
+            self.stackedWidget.setCurrentWidget(self.findChild(QWidget, objectName))
+
+    @tracer.timed
+    def setQss(self):
+        self.styleSheetManager.apply('dark' if isDarkTheme() else 'light')
+
+    def paintEvent(self, e):
+        super().paintEvent(e)
+        if not self.isPainted:
+            self.isPainted = True
+            self.firstPainted.emit()
+
+    def openArguments(self, paths: list):
+        self.pendingPaths.extend(path for path in paths if os.path.isfile(path) and
+                                 (isAudioFile(path) or isCueFile(path)))
+        if not self.isStarted:
+            return
+        self.__openPendingPaths()
+        if self.isMinimized():
+            self.showNormal()
+        self.raise_()
+        self.activateWindow()
+
+    def __openPendingPaths(self):
+        paths, self.pendingPaths = expandCuePaths(self.pendingPaths), []
+        if paths:
+            self.playInterface.enqueue(paths)
+            self.pivot.setCurrentItem(self.playInterface.objectName())
+
+    def __onStartupFinished(self):
+        self.loadLibrary()
+        startupProfiler.mark('library')
+        self.playInterface.restore()
+        self.isStarted = True
+        self.__openPendingPaths()
+        self.watcher.setFolder(cfg.musicFolder.value)
+        self.scanner.scan(cfg.musicFolder.value)
+        self.startupFinished.emit()
+
+    def __onMusicFolderChanged(self, folder: str):
+        self.loadLibrary()
+        self.scanner.cancel()
+        self.watcher.setFolder(folder)
+        self.scanner.scan(folder)
+
+    def __onThemeChanged(self, theme: Theme):
+        setTheme(theme)
+        self.setQss()
+
+    def closeEvent(self, e):
+        self.playInterface.playlist.save()
+        if self.playInterface.session.isStarted:
+            self.playInterface.endSession('stop')
+        self.historyWriter.stop()
+        for worker in (self.scanner, self.analyzer, self.finder):
+            if worker is not None:
+                worker.cancel()
+        self.playInterface.waveformLoader.cancel()
+        self.playInterface.coverLoader.cancel()
+        if self.listInterface:
+            self.listInterface.thumbnailLoader.cancel()
+        for worker in (self.scanner, self.analyzer, self.finder):
+            if worker is not None:
+                worker.wait()
+        self.historyWriter.wait()
+        self.playInterface.waveformLoader.wait()
+        self.playInterface.coverLoader.wait()
+        if self.listInterface:
+            self.listInterface.thumbnailLoader.wait()
+            self.listInterface.searchLoader.wait()
+        super().closeEvent(e)
+
+
+def main():
+    startupProfiler.mark('imports')
+    if cfg.get(cfg.dpiScale) == "Auto":
+        QApplication.setHighDpiScaleFactorRoundingPolicy(Qt.HighDpiScaleFactorRoundingPolicy.PassThrough)
+    else:
+        os.environ["QT_ENABLE_HIGHDPI_SCALING"] = "0"
+        os.environ["QT_SCALE_FACTOR"] = str(cfg.get(cfg.dpiScale))
+    app = QApplication(sys.argv)
+    startupProfiler.mark('application')
+    w = Window()
+    startupProfiler.mark('window')
+    instanceServer = InstanceServer(w)
+    instanceServer.filesReceived.connect(w.openArguments)
+    instanceServer.listen()
+    w.openArguments(fileArguments(sys.argv[1:]))
+    w.firstPainted.connect(lambda: startupProfiler.mark('first paint'))
+    if startupProfiler.isEnabled:
+        w.startupFinished.connect(startupProfiler.report)
+        w.styleSheetManager.themeSwitched.connect(lambda ms: print(f'theme switch  {ms:8.1f} ms', file=sys.stderr))
+    if tracer.isEnabled:
+        lagMonitor = LagMonitor(tracer, parent=w)
+        lagMonitor.start()
+        traceOverlay = TraceOverlay(tracer, lagMonitor, w)
+        app.aboutToQuit.connect(tracer.save)
+    w.show()
+    startupProfiler.mark('show')
+    app.exec()